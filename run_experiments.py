@@ -10,6 +10,8 @@ if str(src_path) not in sys.path:
 
 from pipeline_runner import run_full_pipeline
 from metrics.evaluation_runner import run_full_evaluation
+from query_decomp.query_analyzer import QueryAnalyzer
+from query_decomp.query_store import QueryLogStore
 
 # --- Configuration ---
 
@@ -54,6 +56,9 @@ PROJECT_ROOT = Path(__file__).resolve().parent
 QUERIES_FILE = PROJECT_ROOT / "src" / "test_queries.json"
 SUMMARY_DIR = PROJECT_ROOT / "results" / "experiment_summaries"
 SUMMARY_PATH = SUMMARY_DIR / "live_summary_no_qdecomp.json"
+QUERY_LOG_PATH = PROJECT_ROOT / "results" / "query_logs" / "query_analyses.json"
+# Overlap download, processing and indexing per paper instead of running them as barriers
+STREAMING_INGESTION = True
 
 
 def summarize_and_save(all_results: dict, output_path: Path):
@@ -107,14 +112,27 @@ def summarize_and_save(all_results: dict, output_path: Path):
         
     print(f"\nLive summary and raw results saved to: {output_path}")
 
-def run_single_experiment(config: dict, query: str, project_root: Path) -> tuple[str, dict | None]:
+def precompute_query_analyses(queries: list, store: QueryLogStore) -> None:
+    """Decomposes all queries concurrently up front so each pipeline run starts from a stored analysis."""
+    if all(config.get("use_ablation_query_decomp", False) for config in ABLATION_CONFIGS):
+        print("All configurations skip query decomposition. Nothing to precompute.")
+        return
+
+    print(f"\n--- Precomputing query analyses ({len(store)} already in {store.store_path}) ---")
+    try:
+        QueryAnalyzer().analyze_queries(queries, store=store)
+    except Exception as e:
+        print(f"Warning: Batch query decomposition failed. Queries will be decomposed lazily. Error: {e}")
+
+
+def run_single_experiment(config: dict, query: str, project_root: Path, query_store: QueryLogStore = None) -> tuple[str, dict | None]:
     """
     Worker function to run a single experiment for a given config and query.
     This function is designed to be executed in a separate thread.
     """
     try:
         print(f"--- [START] Running query for '{config['name']}': '{query[:40]}...'")
-        run_timestamp = run_full_pipeline(query, config, project_root)
+        run_timestamp = run_full_pipeline(query, config, project_root, query_store=query_store, streaming=STREAMING_INGESTION)
         
         if run_timestamp:
             metrics = run_full_evaluation(run_timestamp, project_root)
@@ -138,6 +156,9 @@ def main():
         queries = json.load(f)["queries"]
     
     print(f"Loaded {len(queries)} test queries.")
+
+    query_store = QueryLogStore(QUERY_LOG_PATH)
+    precompute_query_analyses(queries, query_store)
     
     all_results = {config["name"]: [] for config in ABLATION_CONFIGS}
     if SUMMARY_PATH.exists():
@@ -166,7 +187,7 @@ def main():
             
             print(f"\n--- Running configuration '{config_name}' for query {i+1}/{len(queries)} ---")
             try:
-                run_timestamp = run_full_pipeline(query, config, PROJECT_ROOT)
+                run_timestamp = run_full_pipeline(query, config, PROJECT_ROOT, query_store=query_store, streaming=STREAMING_INGESTION)
                 
                 if run_timestamp:
                     metrics = run_full_evaluation(run_timestamp, PROJECT_ROOT)
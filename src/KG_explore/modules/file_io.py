@@ -1,5 +1,6 @@
 import json
 import os
+import time
 import requests
 
 def load_json_file(file_path):
@@ -29,41 +30,190 @@ def save_data_to_json(data, output_file):
     except Exception as e:
         print(f"Error saving data to JSON file '{output_file}': {e}")
 
-def download_pdf(title, paper_id, pdf_url, download_dir, sanitize_func):
+# --- PDF download safeguards ---
+MAX_PDF_BYTES = 50 * 1024 * 1024   # Larger files are rejected to protect the processing stage
+PDF_MAGIC = b"%PDF"
+PDF_MAGIC_WINDOW = 1024            # The PDF header may be preceded by a few junk bytes
+ACCEPTED_CONTENT_TYPES = ("application/pdf", "application/x-pdf", "application/octet-stream", "binary/octet-stream")
+
+
+class InvalidPDFError(Exception):
+    """Raised when a download is not a usable PDF (wrong type, bad header or too large)."""
+
+
+def is_valid_pdf_file(file_path):
+    """Checks that a file on disk starts with the PDF magic bytes."""
+    try:
+        with open(file_path, 'rb') as f:
+            return PDF_MAGIC in f.read(PDF_MAGIC_WINDOW)
+    except OSError:
+        return False
+
+
+def _check_content_type(response):
+    content_type = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+    if content_type and content_type not in ACCEPTED_CONTENT_TYPES:
+        raise InvalidPDFError(f"unexpected Content-Type '{content_type}'")
+
+
+def _response_validator(response):
+    """The strong ETag or else the Last-Modified date of a response, usable in an If-Range header."""
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _read_validator(validator_path):
+    try:
+        with open(validator_path, 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def _discard_partial(part_path):
+    for path in (part_path, part_path + ".validator"):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def download_pdf(title, paper_id, pdf_url, download_dir, sanitize_func, session=None, timeout=(10, 30), max_seconds=None, store=None,
+                 max_bytes=MAX_PDF_BYTES):
     """
     Downloads a paper from a URL and saves it to a directory using a sanitized title.
 
+    The download is streamed into a '.part' file, which is resumed with an HTTP Range
+    request if a previous attempt was interrupted. The ETag or Last-Modified date of the
+    first response is kept in a '.part.validator' file and sent as If-Range, so a file
+    that changed on the server is downloaded again instead of spliced. Only after the Content-Type, the
+    '%PDF' magic bytes and the size cap have been checked is it atomically renamed
+    to its final path, so a truncated or non-PDF file is never mistaken for a finished one.
+
     Args:
         title (str): The title of the paper.
         paper_id (str): The unique ID of the paper, for logging.
         pdf_url (str): The direct URL to the PDF file.
         download_dir (str): The directory to save the PDF in.
         sanitize_func (function): Function to sanitize the filename.
+        session (requests.Session, optional): Shared session for connection reuse.
+        timeout (float or tuple): Connect/read timeout passed to requests.
+        max_seconds (float, optional): Abort the download if it takes longer than this overall.
+        store (PDFStore, optional): Global PDF store. It is consulted before downloading
+            and receives every new download, leaving a link in download_dir.
+        max_bytes (int): Size cap for a single PDF.
+
+    Returns:
+        dict: The outcome with keys 'paper_id', 'status' ('ok', 'cached', 'failed' or 'skipped'),
+              'bytes', 'seconds', 'path' and 'error'.
     """
+    result = {"paper_id": paper_id, "status": "skipped", "bytes": 0, "seconds": 0.0, "path": None, "error": None}
+
     if not pdf_url:
         print(f"    -> No PDF URL provided for paper {paper_id} ('{title}'). Skipping download.")
-        return
+        result["error"] = "no_url"
+        return result
 
     filename = sanitize_func(paper_id) + ".pdf"
     file_path = os.path.join(download_dir, filename)
+    part_path = file_path + ".part"
+    validator_path = part_path + ".validator"
+    result["path"] = file_path
 
     if os.path.exists(file_path):
-        print(f"    -> Paper '{filename}' already downloaded. Skipping.")
-        return
+        if is_valid_pdf_file(file_path):
+            print(f"    -> Paper '{filename}' already downloaded. Skipping.")
+            result["bytes"] = os.path.getsize(file_path)
+            result["error"] = "exists"
+            return result
+        print(f"    -> Existing file '{filename}' is not a valid PDF. Downloading again.")
+        os.remove(file_path)
 
+    if store is not None:
+        entry = store.link_into(paper_id, file_path)
+        if entry is not None:
+            print(f"    -> Paper '{filename}' found in PDF store. Linked without downloading.")
+            result["status"] = "cached"
+            result["bytes"] = entry["bytes"]
+            return result
+
+    start = time.monotonic()
     try:
-        print(f"    -> Downloading '{filename}' from {pdf_url}")
-        response = requests.get(pdf_url, stream=True, timeout=30)
+        os.makedirs(download_dir, exist_ok=True) # Ensure directory exists
+        resume_from = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        validator = _read_validator(validator_path) if resume_from else None
+        if resume_from and validator is None:
+            # Without a validator there is no way to tell whether the file changed since.
+            _discard_partial(part_path)
+            resume_from = 0
+        headers = {"Range": f"bytes={resume_from}-", "If-Range": validator} if resume_from else {}
+
+        print(f"    -> Downloading '{filename}' from {pdf_url}" + (f" (resuming at {resume_from} bytes)" if resume_from else ""))
+        getter = session.get if session is not None else requests.get
+        response = getter(pdf_url, stream=True, timeout=timeout, headers=headers)
+
+        if resume_from and response.status_code == 416:
+            # The server cannot satisfy the range; the partial file is stale.
+            response.close()
+            _discard_partial(part_path)
+            resume_from = 0
+            response = getter(pdf_url, stream=True, timeout=timeout)
         response.raise_for_status()
+        _check_content_type(response)
 
-        os.makedirs(download_dir, exist_ok=True) # Ensure directory exists
-        with open(file_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
+        if resume_from and response.status_code != 206:
+            # The file changed (If-Range failed) or the server ignores ranges: it sends the whole file.
+            resume_from = 0
+        if not resume_from:
+            new_validator = _response_validator(response)
+            if new_validator:
+                with open(validator_path, 'w', encoding='utf-8') as f:
+                    f.write(new_validator)
+            elif os.path.exists(validator_path):
+                os.remove(validator_path)
+
+        content_length = response.headers.get("Content-Length")
+        if content_length and content_length.isdigit() and resume_from + int(content_length) > max_bytes:
+            raise InvalidPDFError(f"file size {resume_from + int(content_length)} exceeds cap of {max_bytes} bytes")
+
+        written = resume_from
+        with open(part_path, 'ab' if resume_from else 'wb') as f:
+            for chunk in response.iter_content(chunk_size=65536):
                 f.write(chunk)
-        
+                written += len(chunk)
+                if written > max_bytes:
+                    raise InvalidPDFError(f"file exceeds cap of {max_bytes} bytes")
+                if max_seconds is not None and time.monotonic() - start > max_seconds:
+                    raise TimeoutError(f"download exceeded {max_seconds}s")
+
+        if not is_valid_pdf_file(part_path):
+            raise InvalidPDFError("response does not start with the %PDF magic bytes")
+
+        os.replace(part_path, file_path)
+        if os.path.exists(validator_path):
+            os.remove(validator_path)
+        result["bytes"] = written
+
+        if store is not None:
+            store.add(paper_id, file_path, source_url=pdf_url)
+
+        result["status"] = "ok"
         print(f"    -> Successfully saved to {file_path}")
 
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, TimeoutError) as e:
+        # Transient failure: keep the '.part' file so the next attempt can resume it.
+        result["status"] = "failed"
+        result["error"] = str(e)
         print(f"    -> FAILED to download paper {paper_id} ('{title}'): {e}")
+    except InvalidPDFError as e:
+        result["status"] = "failed"
+        result["error"] = str(e)
+        print(f"    -> REJECTED download for paper {paper_id} ('{title}'): {e}")
+        _discard_partial(part_path)
     except Exception as e:
-        print(f"    -> An unexpected error occurred during download for {paper_id} ('{title}'): {e}")
\ No newline at end of file
+        result["status"] = "failed"
+        result["error"] = str(e)
+        print(f"    -> An unexpected error occurred during download for {paper_id} ('{title}'): {e}")
+
+    result["seconds"] = round(time.monotonic() - start, 3)
+    return result
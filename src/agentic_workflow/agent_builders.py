@@ -1,8 +1,15 @@
 import os
 import json
+from functools import lru_cache
 from pathlib import Path
 import chromadb
 
+from data_indexing.chunking import load_parent_section
+from data_indexing.embeddings import get_embedding_function
+from data_indexing.indexer import SHARED_COLLECTION_NAME, run_flag
+from data_indexing.lexical_index import BM25Index, bm25_index_path, reciprocal_rank_fusion
+from data_indexing.numpy_index import NumpyVectorIndex, numpy_index_dir
+from paper_processing.bundle import open_run_bundle
 from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel
 from langchain_mistralai import ChatMistralAI
@@ -14,6 +21,13 @@ CHROMA_PERSIST_DIR = Path(__file__).resolve().parent.parent.parent / "chroma_db"
 CHROMA_COLLECTION_BASE_NAME = "lit_review_papers"
 PROMPTS_PATH = Path(__file__).parent / "prompts.json"
 NUM_DOCS_TO_RETRIEVE = 3 # Top N documents to retrieve for each debater
+# Chunks are sized for the embedder, so a hit is expanded to the section it came from.
+PARENT_SECTION_RETRIEVAL = True
+CANDIDATES_PER_DOC = 3 # Extra chunk candidates, since several hits often share a parent section
+PROCESSED_PAPERS_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "processed_papers"
+# Dense hits are fused with the run's BM25 ranking (reciprocal rank fusion), so queries that
+# hinge on rare technical terms still surface the passages that contain them.
+HYBRID_RETRIEVAL = True
 
 # Load all prompts
 with open(PROMPTS_PATH, 'r') as f:
@@ -21,41 +35,151 @@ with open(PROMPTS_PATH, 'r') as f:
 
 # --- Tool for Data Retrieval ---
 
-def get_retriever_tool(run_timestamp: str):
+def expand_to_parent_sections(documents: list, metadatas: list, run_timestamp: str) -> list:
     """
-    Creates a retriever function for a specific ChromaDB collection.
+    Replaces each retrieved chunk with the full section it belongs to, keeping the ranking
+    and returning each section only once. Chunks without a stored section are kept as-is.
     """
+    processed_dir = PROCESSED_PAPERS_DIR / f"lit_review_papers_{run_timestamp}"
+    bundle = open_run_bundle(processed_dir)
+    expanded, seen = [], set()
+    try:
+        for doc, metadata in zip(documents, metadatas or [{}] * len(documents)):
+            metadata = metadata or {}
+            paper_id, section = metadata.get("paper_id"), metadata.get("section")
+            # Chunks indexed before sections were recorded are deduplicated by their text.
+            key = (paper_id, section) if paper_id and section else (None, doc)
+            if key in seen:
+                continue
+            seen.add(key)
+            parent = load_parent_section(processed_dir, paper_id, section, bundle=bundle) if key[0] else None
+            title = metadata.get("title")
+            text = parent or doc
+            expanded.append(f"[{title}]\n{text}" if title else text)
+            if len(expanded) >= NUM_DOCS_TO_RETRIEVE:
+                break
+    finally:
+        if bundle is not None:
+            bundle.close()
+    return expanded
+
+
+@lru_cache(maxsize=1)
+def get_chroma_client() -> chromadb.PersistentClient:
+    """One Chroma client per process, shared by all retriever tools."""
+    return chromadb.PersistentClient(path=str(CHROMA_PERSIST_DIR))
+
+
+def _open_collection(client: chromadb.PersistentClient, name: str):
+    # Opening directly avoids listing every collection in the database.
+    try:
+        return client.get_collection(name=name, embedding_function=get_embedding_function())
+    except Exception:
+        return None
+
+
+def resolve_run_collection(client: chromadb.PersistentClient, run_timestamp: str) -> tuple:
+    """
+    Finds the collection holding a run's chunks.
+
+    Returns (collection, where): the shared collection with a filter on the run's flag,
+    or the run's own collection for runs indexed before the shared collection existed.
+    Returns (None, None) if the run has not been indexed.
+    """
+    shared = _open_collection(client, SHARED_COLLECTION_NAME)
+    if shared is not None:
+        where = {run_flag(run_timestamp): True}
+        if shared.get(where=where, limit=1, include=[])["ids"]:
+            return shared, where
+
+    collection = _open_collection(client, f"{CHROMA_COLLECTION_BASE_NAME}_{run_timestamp}")
+    return (collection, None) if collection is not None else (None, None)
+
+
+def fuse_with_bm25(collection, query: str, results: dict, bm25_index: BM25Index, n_results: int) -> tuple:
+    """
+    Re-ranks dense query results together with the BM25 ranking of the run.
+
+    Lexical hits that the dense search missed are fetched from the collection by id.
+
+    Returns:
+        tuple: (documents, metadatas) of the top `n_results` fused hits.
+    """
+    dense_ids = results.get("ids", [[]])[0]
+    hits = dict(zip(dense_ids, zip(results.get("documents", [[]])[0], results.get("metadatas", [[]])[0])))
+    lexical_ids = [chunk_id for chunk_id, _ in bm25_index.search(query, k=n_results)]
+    fused_ids = reciprocal_rank_fusion([dense_ids, lexical_ids])[:n_results]
+
+    missing = [chunk_id for chunk_id in fused_ids if chunk_id not in hits]
+    if missing:
+        fetched = collection.get(ids=missing, include=["documents", "metadatas"])
+        hits.update(zip(fetched["ids"], zip(fetched["documents"], fetched["metadatas"])))
+    fused_ids = [chunk_id for chunk_id in fused_ids if chunk_id in hits]
+    return [hits[chunk_id][0] for chunk_id in fused_ids], [hits[chunk_id][1] for chunk_id in fused_ids]
+
+
+def get_retriever_tool(run_timestamp: str, parent_sections: bool = PARENT_SECTION_RETRIEVAL,
+                       hybrid: bool = HYBRID_RETRIEVAL):
+    """
+    Creates a retriever function for the chunks of a specific run.
+    With `parent_sections`, matching chunks are returned as their full parent section.
+    With `hybrid`, dense results are fused with the run's BM25 index, if it has one.
+    """
+    bm25_index = None
+    bm25_path = bm25_index_path(run_timestamp)
+    if hybrid and bm25_path.exists():
+        # Loaded once per debate; the index of a run is small.
+        bm25_index = BM25Index.load(bm25_path)
+    elif hybrid:
+        print(f"No BM25 index found for run '{run_timestamp}'. Using dense retrieval only.")
+
+    # Runs indexed with the 'numpy' backend are searched in-process, without a Chroma client.
+    numpy_index = NumpyVectorIndex.load(numpy_index_dir(run_timestamp)) \
+        if NumpyVectorIndex.exists(numpy_index_dir(run_timestamp)) else None
+    # The run's collection is resolved on the first query and reused for the rest of the debate.
+    resolved = {}
+
     def retrieve_from_chroma(query: str) -> str:
         """
         Retrieves relevant documents from the ChromaDB collection for the given run.
         """
         print(f"Retrieving documents for query: '{query}'")
         try:
-            client = chromadb.PersistentClient(path=str(CHROMA_PERSIST_DIR))
-            collection_name = f"{CHROMA_COLLECTION_BASE_NAME}_{run_timestamp}"
-
-            # Check if the collection exists before trying to access it
-            existing_collections = [c.name for c in client.list_collections()]
-            if collection_name not in existing_collections:
+            if numpy_index is not None:
+                collection, where = numpy_index, None
+            elif resolved:
+                collection, where = resolved["collection"], resolved["where"]
+            else:
+                # Check that the run was indexed before trying to query it
+                collection, where = resolve_run_collection(get_chroma_client(), run_timestamp)
+                if collection is not None:
+                    resolved.update(collection=collection, where=where)
+            if collection is None:
                 error_msg = (
-                    f"ChromaDB collection '{collection_name}' not found. "
+                    f"No indexed chunks found for run '{run_timestamp}' in ChromaDB. "
                     f"Please ensure you have run the data indexing workflow ('src/data_indexing/indexer.py') "
                     f"for the timestamp '{run_timestamp}' before running the debate."
                 )
                 print(f"Error: {error_msg}")
                 return error_msg
             
-            collection = client.get_collection(name=collection_name)
-            
+            n_results = NUM_DOCS_TO_RETRIEVE * (CANDIDATES_PER_DOC if parent_sections else 1)
             results = collection.query(
                 query_texts=[query],
-                n_results=NUM_DOCS_TO_RETRIEVE
+                n_results=n_results,
+                where=where,
             )
-            
-            documents = results.get("documents", [[]])[0]
+
+            if bm25_index is not None:
+                documents, metadatas = fuse_with_bm25(collection, query, results, bm25_index, n_results)
+            else:
+                documents, metadatas = results.get("documents", [[]])[0], results.get("metadatas", [[]])[0]
             if not documents:
                 return "No relevant documents found in the database."
 
+            if parent_sections:
+                documents = expand_to_parent_sections(documents, metadatas, run_timestamp)
+
             # Format the documents for context
             formatted_docs = "\n\n".join(
                 [f"--- Document {i+1} ---\n{doc}" for i, doc in enumerate(documents)]
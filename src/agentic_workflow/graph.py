@@ -2,7 +2,7 @@ import os
 from pathlib import Path
 import stat
 from langgraph.graph import StateGraph, END
-from langchain_mistralai import ChatMistralAI
+from llm_backends.chat_models import get_chat_model
 from dotenv import load_dotenv
 import streamlit as st
 
@@ -18,7 +18,7 @@ PERSONA_POOL_MIN = 5
 PERSONA_POOL_MAX = 10
 
 # Initialize the LLM
-llm = ChatMistralAI(api_key=os.getenv("MISTRAL_API_KEY"), model="mistral-medium-latest", temperature = 0.7)
+llm = get_chat_model(model="mistral-medium-latest", temperature=0.7)
 
 # --- Graph Node Functions ---
 
@@ -0,0 +1,180 @@
+"""
+Compares the legacy 10,000-character chunking with the token-aware, section-aware chunker.
+
+For the processed papers of one run, both strategies are indexed into a throwaway
+Chroma database. The script reports build time, index size, how much of the stored
+text actually falls inside the embedder's window, and the retrieval hit rate for
+sentences sampled from the papers. Example:
+
+    python src/data_indexing/benchmark_chunking.py --run-timestamp 20250809_094825 --top-k 3
+"""
+import argparse
+import json
+import random
+import re
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+src_path = Path(__file__).resolve().parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+import chromadb
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from data_indexing.chunking import EMBEDDING_MAX_TOKENS, chunk_processed_paper, count_tokens
+from paper_processing.bundle import open_run_bundle
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+BENCHMARK_DIR = PROJECT_ROOT / "results" / "benchmarks"
+ADD_BATCH_SIZE = 500
+
+# The splitter used by the indexer before token-aware chunking.
+LEGACY_TEXT_SPLITTER = RecursiveCharacterTextSplitter(
+    chunk_size=10000,
+    chunk_overlap=2000,
+    length_function=len,
+    is_separator_regex=False,
+)
+
+
+def load_processed_papers(run_timestamp: str) -> dict:
+    """Returns paper_id -> processed content for a run, from its bundle or per-paper JSON files."""
+    processed_dir = PROJECT_ROOT / "data" / "processed_papers" / f"lit_review_papers_{run_timestamp}"
+    bundle = open_run_bundle(processed_dir)
+    if bundle is not None:
+        with bundle:
+            return {paper_id: content for paper_id, content in bundle}
+
+    papers = {}
+    for json_path in sorted(processed_dir.glob("*.json")):
+        with open(json_path, 'r', encoding='utf-8') as f:
+            papers[json_path.stem] = json.load(f)
+    return papers
+
+
+def legacy_chunks(processed_data: dict) -> list:
+    full_text = ""
+    for section_title, paragraphs in processed_data.items():
+        if isinstance(paragraphs, list):
+            full_text += f"\n\n--- {section_title.upper()} ---\n\n" + " ".join(paragraphs)
+    return [{"text": text, "section": None} for text in LEGACY_TEXT_SPLITTER.split_text(full_text.strip())]
+
+
+STRATEGIES = {
+    "legacy_10000_chars": legacy_chunks,
+    "token_sections": chunk_processed_paper,
+}
+
+
+def sample_queries(papers: dict, per_paper: int, seed: int = 0) -> list:
+    """Samples sentences of 8-40 words from each paper as (query, paper_id, section) triples."""
+    rng = random.Random(seed)
+    queries = []
+    for paper_id, processed_data in sorted(papers.items()):
+        candidates = []
+        for section_title, paragraphs in processed_data.items():
+            if not isinstance(paragraphs, list):
+                continue
+            for paragraph in paragraphs:
+                for sentence in re.split(r"(?<=[.!?])\s+", paragraph):
+                    if 8 <= len(sentence.split()) <= 40:
+                        candidates.append((sentence, paper_id, section_title))
+        queries.extend(rng.sample(candidates, min(per_paper, len(candidates))))
+    return queries
+
+
+def directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file())
+
+
+def benchmark_strategy(name: str, papers: dict, queries: list, top_k: int) -> dict:
+    chunker = STRATEGIES[name]
+    start = time.perf_counter()
+    documents, metadatas, ids = [], [], []
+    for paper_id, processed_data in papers.items():
+        for chunk_idx, piece in enumerate(chunker(processed_data)):
+            documents.append(piece["text"])
+            metadatas.append({"paper_id": paper_id, "section": piece["section"] or ""})
+            ids.append(f"{paper_id}_chunk_{chunk_idx}")
+    chunk_seconds = time.perf_counter() - start
+
+    token_counts = [count_tokens(doc) for doc in documents]
+    db_dir = Path(tempfile.mkdtemp(prefix=f"chunk_bench_{name}_"))
+    try:
+        client = chromadb.PersistentClient(path=str(db_dir))
+        collection = client.get_or_create_collection(name=f"bench_{name}")
+        start = time.perf_counter()
+        for i in range(0, len(documents), ADD_BATCH_SIZE):
+            collection.add(documents=documents[i:i + ADD_BATCH_SIZE], metadatas=metadatas[i:i + ADD_BATCH_SIZE],
+                           ids=ids[i:i + ADD_BATCH_SIZE])
+        index_seconds = time.perf_counter() - start
+
+        paper_hits, section_hits = 0, 0
+        start = time.perf_counter()
+        for query, paper_id, section in queries:
+            result = collection.query(query_texts=[query], n_results=min(top_k, len(documents)))
+            hits = result.get("metadatas", [[]])[0]
+            paper_hits += any(hit.get("paper_id") == paper_id for hit in hits)
+            section_hits += any(hit.get("paper_id") == paper_id and hit.get("section") == section for hit in hits)
+        query_seconds = time.perf_counter() - start
+        size_bytes = directory_size(db_dir)
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+    total_tokens = sum(token_counts)
+    return {
+        "chunks": len(documents),
+        "stored_chars": sum(len(doc) for doc in documents),
+        "stored_tokens": total_tokens,
+        # Share of stored tokens inside the embedder's window; the rest never affects ranking.
+        "embedded_token_share": round(sum(min(t, EMBEDDING_MAX_TOKENS) for t in token_counts) / total_tokens, 3)
+        if total_tokens else 0.0,
+        "max_chunk_tokens": max(token_counts) if token_counts else 0,
+        "chunk_seconds": round(chunk_seconds, 3),
+        "build_seconds": round(index_seconds, 3),
+        "index_bytes": size_bytes,
+        "query_seconds": round(query_seconds, 3),
+        "paper_hit_rate": round(paper_hits / len(queries), 3) if queries else None,
+        "section_hit_rate": round(section_hits / len(queries), 3) if queries and name != "legacy_10000_chars" else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chunking strategies on the processed papers of a run.")
+    parser.add_argument("--run-timestamp", required=True, help="Run whose processed papers are used.")
+    parser.add_argument("--queries-per-paper", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=3)
+    parser.add_argument("--output", type=Path, default=None, help="Where to save the JSON report.")
+    args = parser.parse_args()
+
+    papers = load_processed_papers(args.run_timestamp)
+    if not papers:
+        print(f"No processed papers found for run '{args.run_timestamp}'.")
+        return
+    queries = sample_queries(papers, args.queries_per_paper)
+    print(f"Benchmarking chunking on {len(papers)} papers with {len(queries)} sampled queries (top-{args.top_k}).\n")
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "run_timestamp": args.run_timestamp,
+        "papers": len(papers),
+        "queries": len(queries),
+        "top_k": args.top_k,
+        "strategies": {name: benchmark_strategy(name, papers, queries, args.top_k) for name in STRATEGIES},
+    }
+    print(json.dumps(report["strategies"], indent=4))
+
+    output_path = args.output or BENCHMARK_DIR / f"chunking_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    print(f"\nBenchmark report saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
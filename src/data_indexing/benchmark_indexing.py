@@ -0,0 +1,208 @@
+"""
+Benchmarks the indexing stage phase by phase on a fixed local corpus.
+
+The corpus is a finished run: its literature review report and processed papers.
+The real indexing path (`index_run`: `iter_run_chunks` / `build_paper_chunks`, then
+`ingest_chunk_stream` into Chroma or `index_run_numpy`, then `build_run_bm25_index`)
+is replayed into a throwaway Chroma, numpy and BM25 directory with a fresh embedding
+service. The indexing functions are wrapped with timers to split the wall time into
+reading processed content, chunking, embedding, writing the vector index (for
+Chroma, the content-hash diff and the batched writes) and building the BM25 index.
+The report gives chunks/second, bytes/chunk, embedding throughput, peak RSS and the
+final index size. Reports are saved as JSON and tagged with the git commit, so
+indexer changes can be compared. Example:
+
+    python src/data_indexing/benchmark_indexing.py --run-timestamp 20250809_094825 --backend chroma
+"""
+import argparse
+import json
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import ExitStack, contextmanager
+from datetime import datetime
+from pathlib import Path
+
+src_path = Path(__file__).resolve().parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from data_indexing import embeddings, indexer, lexical_index, numpy_index
+from data_indexing.benchmark_chunking import directory_size
+from data_indexing.chunking import count_tokens
+from data_indexing.embeddings import EmbeddingCache, EmbeddingService
+from data_indexing.indexer import VECTOR_BACKENDS
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+BENCHMARK_DIR = PROJECT_ROOT / "results" / "benchmarks"
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+@contextmanager
+def patched(module, name, value):
+    """Replaces a module attribute for the duration of the block."""
+    original = getattr(module, name)
+    setattr(module, name, value)
+    try:
+        yield
+    finally:
+        setattr(module, name, original)
+
+
+class PhaseTimer:
+    """Accumulates the wall time spent inside wrapped functions, per phase."""
+
+    def __init__(self):
+        self.seconds = {}
+        self.chunks = 0
+        self.text_bytes = 0
+        self.embedded_tokens = 0
+
+    def _add(self, phase: str, seconds: float) -> None:
+        self.seconds[phase] = self.seconds.get(phase, 0.0) + seconds
+
+    def timed(self, phase: str, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._add(phase, time.perf_counter() - start)
+        return wrapper
+
+    def timed_encode(self, encode):
+        """Times an `EmbeddingService.encode`, counting the tokens it was given outside the timer."""
+        timed_encode = self.timed("embed", encode)
+
+        def wrapper(texts):
+            vectors = timed_encode(texts)
+            self.embedded_tokens += sum(count_tokens(text) for text in texts)
+            return vectors
+        return wrapper
+
+    def timed_chunk_stream(self, iter_run_chunks):
+        """Times the chunk stream one chunk at a time, as the writer pulls it."""
+        def wrapper(*args, **kwargs):
+            stream = iter_run_chunks(*args, **kwargs)
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(stream)
+                except StopIteration:
+                    return
+                finally:
+                    self._add("stream", time.perf_counter() - start)
+                self.chunks += 1
+                self.text_bytes += len(item[0].encode("utf-8"))
+                yield item
+        return wrapper
+
+
+def run_benchmark(run_timestamp: str, backend: str, use_cache: bool, work_dir: Path) -> dict:
+    report_path = PROJECT_ROOT / "results" / "final_reports" / f"lit_review_report_{run_timestamp}.json"
+    with open(report_path, 'r', encoding='utf-8') as f:
+        papers = json.load(f).get("discovered_papers", [])
+
+    # Embeddings go through a fresh service (without the persistent cache unless asked), so
+    # encoder throughput is measured; every store the stage writes is redirected to work_dir.
+    service = EmbeddingService(cache=EmbeddingCache(work_dir / "embeddings.sqlite3") if use_cache else None)
+    store_dir = work_dir / "index"
+    timer = PhaseTimer()
+    with ExitStack() as stack:
+        for module, name, value in [
+            (embeddings, "get_embedding_service", lambda: service),
+            (numpy_index, "get_embedding_service", lambda: service),
+            (indexer, "CHROMA_PERSIST_DIR", store_dir / "chroma"),
+            (numpy_index, "NUMPY_INDEX_DIR", store_dir / "vector_index"),
+            (lexical_index, "LEXICAL_INDEX_DIR", store_dir / "lexical_index"),
+            (indexer, "load_paper_content", timer.timed("read", indexer.load_paper_content)),
+            (indexer, "iter_run_chunks", timer.timed_chunk_stream(indexer.iter_run_chunks)),
+            (indexer, "build_run_bm25_index", timer.timed("bm25", indexer.build_run_bm25_index)),
+        ]:
+            stack.enter_context(patched(module, name, value))
+        service.encode = timer.timed_encode(service.encode)
+
+        start = time.perf_counter()
+        indexer.index_run(run_timestamp, backend=backend)
+        total_seconds = time.perf_counter() - start
+    service.close()
+
+    if not timer.chunks:
+        return {"skipped": "no chunks"}
+    seconds = timer.seconds
+    read, stream = seconds.get("read", 0.0), seconds.get("stream", 0.0)
+    embed, bm25 = seconds.get("embed", 0.0), seconds.get("bm25", 0.0)
+    # Chunking is what the stream spends beyond reading; writing is what is left of the
+    # stage (for Chroma: fetching stored metadata, upserts, updates and deletes).
+    phases = {"read": read, "chunk": stream - read, "embed": embed,
+              "write": total_seconds - stream - embed - bm25, "bm25": bm25}
+
+    index_bytes = directory_size(store_dir)
+    return {
+        "papers": len(papers),
+        "chunks": timer.chunks,
+        "phase_seconds": {phase: round(seconds, 4) for phase, seconds in phases.items()},
+        "total_seconds": round(total_seconds, 4),
+        "chunks_per_second": round(timer.chunks / total_seconds, 2) if total_seconds else None,
+        "text_bytes_per_chunk": round(timer.text_bytes / timer.chunks, 1),
+        "index_bytes_per_chunk": round(index_bytes / timer.chunks, 1),
+        "embedding": {
+            "chunks_per_second": round((service.stats["hits"] + service.stats["encoded"]) / embed, 2) if embed else None,
+            "tokens_per_second": round(timer.embedded_tokens / embed, 1) if embed else None,
+            "cache_hits": service.stats["hits"],
+            "encoded": service.stats["encoded"],
+        },
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "index_bytes": index_bytes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the indexing stage on a finished run.")
+    parser.add_argument("--run-timestamp", required=True, help="Run whose report and processed papers form the corpus.")
+    parser.add_argument("--backend", choices=VECTOR_BACKENDS, default="chroma")
+    parser.add_argument("--use-cache", action="store_true",
+                        help="Embed through a (fresh) persistent cache, to include its overhead.")
+    parser.add_argument("--output", type=Path, default=None, help="Where to save the JSON report.")
+    args = parser.parse_args()
+
+    work_dir = Path(tempfile.mkdtemp(prefix="index_bench_"))
+    try:
+        results = run_benchmark(args.run_timestamp, args.backend, args.use_cache, work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": git_commit(),
+        "run_timestamp": args.run_timestamp,
+        "backend": args.backend,
+        "use_cache": args.use_cache,
+        "results": results,
+    }
+    print(json.dumps(report, indent=4))
+
+    output_path = args.output or BENCHMARK_DIR / f"index_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    print(f"\nBenchmark report saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
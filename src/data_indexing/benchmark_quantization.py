@@ -0,0 +1,126 @@
+"""
+Measures what quantized vector storage saves and what it costs in recall.
+
+For each run, the chunks are embedded once and indexed with float32, float16 and
+int8 vectors. Each quantized index is compared with the exact float32 index on
+vector memory, disk size, query latency and recall@k (share of the exact top-k it
+returns), before and after full-precision rescoring. The disk size includes the
+float32 file kept for rescoring, so quantized indexes save memory but use more disk.
+Example:
+
+    python src/data_indexing/benchmark_quantization.py --run-timestamps 20250809_094825 --top-k 9
+"""
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+src_path = Path(__file__).resolve().parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from data_indexing.benchmark_chunking import directory_size, load_processed_papers, sample_queries
+from data_indexing.benchmark_vector_backends import run_chunks
+from data_indexing.embeddings import get_embedding_service
+from data_indexing.numpy_index import QUANTIZATIONS, NumpyVectorIndex
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+PROCESSED_PAPERS_DIR = PROJECT_ROOT / "data" / "processed_papers"
+BENCHMARK_DIR = PROJECT_ROOT / "results" / "benchmarks"
+
+
+def available_runs() -> list:
+    return sorted(p.name.replace("lit_review_papers_", "") for p in PROCESSED_PAPERS_DIR.glob("lit_review_papers_*")
+                  if p.is_dir())
+
+
+def recall_at_k(hits: list, exact: list) -> float:
+    return round(statistics.mean(
+        len(set(found) & set(truth)) / len(truth) for found, truth in zip(hits, exact) if truth
+    ), 4)
+
+
+def benchmark_run(run_timestamp: str, queries_per_paper: int, top_k: int) -> dict:
+    papers = load_processed_papers(run_timestamp)
+    documents, metadatas, ids = run_chunks(papers)
+    queries = [query for query, _, _ in sample_queries(papers, queries_per_paper)]
+    if not documents or not queries:
+        return {"skipped": "not enough text"}
+
+    service = get_embedding_service()
+    embeddings = service.encode(documents)
+    query_embeddings = service.encode(queries)
+
+    work_dir = Path(tempfile.mkdtemp(prefix="quant_bench_"))
+    results = {}
+    exact = None
+    try:
+        for quantization in QUANTIZATIONS:
+            index_dir = work_dir / quantization
+            NumpyVectorIndex.build(index_dir, documents, metadatas, ids, embedding_service=service,
+                                   embeddings=embeddings, quantization=quantization)
+            index = NumpyVectorIndex.load(index_dir, embedding_service=service)
+
+            start = time.perf_counter()
+            hits = index.query(query_embeddings=query_embeddings, n_results=top_k)["ids"]
+            query_seconds = time.perf_counter() - start
+            approximate_hits = index.query(query_embeddings=query_embeddings, n_results=top_k, rescore=False)["ids"]
+            if exact is None:
+                exact = hits
+            results[quantization] = {
+                "vector_bytes": index.vector_bytes(),
+                "index_bytes": directory_size(index_dir),
+                "mean_query_ms": round(query_seconds * 1000 / len(queries), 3),
+                "recall_at_k_before_rescoring": recall_at_k(approximate_hits, exact),
+                "recall_at_k": recall_at_k(hits, exact),
+            }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline, baseline_disk = results["none"]["vector_bytes"], results["none"]["index_bytes"]
+    for stats in results.values():
+        stats["vector_memory_saved"] = round(1 - stats["vector_bytes"] / baseline, 3) if baseline else 0.0
+        # Positive: the index takes more disk than the float32 one (the rescoring file is included).
+        stats["disk_delta"] = round(stats["index_bytes"] / baseline_disk - 1, 3) if baseline_disk else 0.0
+    return {"chunks": len(documents), "queries": len(queries), "quantizations": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quantized vector storage against float32.")
+    parser.add_argument("--run-timestamps", nargs="+", default=None,
+                        help="Runs to evaluate (default: every run with processed papers).")
+    parser.add_argument("--queries-per-paper", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=9)
+    parser.add_argument("--output", type=Path, default=None, help="Where to save the JSON report.")
+    args = parser.parse_args()
+
+    runs = args.run_timestamps or available_runs()
+    if not runs:
+        print(f"No processed runs found under '{PROCESSED_PAPERS_DIR}'.")
+        return
+
+    report = {"timestamp": datetime.now().isoformat(), "top_k": args.top_k, "runs": {}}
+    print(f"{'run':18s} {'storage':8s} {'bytes':>10s} {'saved':>6s} {'disk +/-':>8s} {'recall@k':>9s} "
+          f"{'unrescored':>10s} {'ms/query':>9s}")
+    for run_timestamp in runs:
+        run_report = benchmark_run(run_timestamp, args.queries_per_paper, args.top_k)
+        report["runs"][run_timestamp] = run_report
+        for quantization, stats in run_report.get("quantizations", {}).items():
+            print(f"{run_timestamp:18s} {quantization:8s} {stats['vector_bytes']:10d} {stats['vector_memory_saved']:6.2f} "
+                  f"{stats['disk_delta']:+8.2f} {stats['recall_at_k']:9.4f} {stats['recall_at_k_before_rescoring']:10.4f} "
+                  f"{stats['mean_query_ms']:9.3f}")
+
+    output_path = args.output or BENCHMARK_DIR / f"quantization_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    print(f"\nBenchmark report saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+"""
+Compares Chroma with the in-process numpy index on the chunks of one run.
+
+Both backends get the same precomputed embeddings, so the numbers isolate the
+storage and search cost: build time, query latency, cold-start time (opening the
+index and answering the first query) and on-disk size. The overlap of the top-k
+results shows that exact search returns what HNSW returns. Example:
+
+    python src/data_indexing/benchmark_vector_backends.py --run-timestamp 20250809_094825 --top-k 9
+"""
+import argparse
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+src_path = Path(__file__).resolve().parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+import chromadb
+
+from data_indexing.benchmark_chunking import directory_size, load_processed_papers, sample_queries
+from data_indexing.chunking import chunk_processed_paper
+from data_indexing.embeddings import get_embedding_service
+from data_indexing.numpy_index import NumpyVectorIndex
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+BENCHMARK_DIR = PROJECT_ROOT / "results" / "benchmarks"
+ADD_BATCH_SIZE = 500
+
+
+def run_chunks(papers: dict) -> tuple:
+    documents, metadatas, ids = [], [], []
+    for paper_id, processed_data in papers.items():
+        for chunk_idx, piece in enumerate(chunk_processed_paper(processed_data)):
+            documents.append(piece["text"])
+            metadatas.append({"paper_id": paper_id, "section": piece["section"]})
+            ids.append(f"{paper_id}_chunk_{chunk_idx}")
+    return documents, metadatas, ids
+
+
+def latency_stats(seconds: list) -> dict:
+    millis = sorted(s * 1000 for s in seconds)
+    return {
+        "mean_ms": round(statistics.mean(millis), 3),
+        "p50_ms": round(millis[len(millis) // 2], 3),
+        "p95_ms": round(millis[min(len(millis) - 1, int(len(millis) * 0.95))], 3),
+    }
+
+
+def benchmark_chroma(db_dir: Path, documents, metadatas, ids, embeddings, query_embeddings, top_k: int) -> tuple:
+    start = time.perf_counter()
+    client = chromadb.PersistentClient(path=str(db_dir))
+    collection = client.get_or_create_collection(name="bench_vectors", metadata={"hnsw:space": "cosine"})
+    for i in range(0, len(ids), ADD_BATCH_SIZE):
+        collection.add(documents=documents[i:i + ADD_BATCH_SIZE], metadatas=metadatas[i:i + ADD_BATCH_SIZE],
+                       ids=ids[i:i + ADD_BATCH_SIZE], embeddings=embeddings[i:i + ADD_BATCH_SIZE].tolist())
+    build_seconds = time.perf_counter() - start
+    del client, collection
+
+    # Cold start: a new client opening the persisted collection and answering one query.
+    start = time.perf_counter()
+    collection = chromadb.PersistentClient(path=str(db_dir)).get_collection(name="bench_vectors")
+    collection.query(query_embeddings=[query_embeddings[0].tolist()], n_results=top_k)
+    cold_seconds = time.perf_counter() - start
+
+    latencies, results = [], []
+    for query_vector in query_embeddings:
+        start = time.perf_counter()
+        result = collection.query(query_embeddings=[query_vector.tolist()], n_results=top_k)
+        latencies.append(time.perf_counter() - start)
+        results.append(result["ids"][0])
+    return {"build_seconds": round(build_seconds, 4), "cold_start_seconds": round(cold_seconds, 4),
+            "query": latency_stats(latencies), "index_bytes": directory_size(db_dir)}, results
+
+
+def benchmark_numpy(index_dir: Path, documents, metadatas, ids, embeddings, query_embeddings, top_k: int) -> tuple:
+    start = time.perf_counter()
+    NumpyVectorIndex.build(index_dir, documents, metadatas, ids, embeddings=embeddings)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = NumpyVectorIndex.load(index_dir)
+    index.query(query_embeddings=query_embeddings[:1], n_results=top_k)
+    cold_seconds = time.perf_counter() - start
+
+    latencies, results = [], []
+    for query_vector in query_embeddings:
+        start = time.perf_counter()
+        result = index.query(query_embeddings=[query_vector], n_results=top_k)
+        latencies.append(time.perf_counter() - start)
+        results.append(result["ids"][0])
+    return {"build_seconds": round(build_seconds, 4), "cold_start_seconds": round(cold_seconds, 4),
+            "query": latency_stats(latencies), "index_bytes": directory_size(index_dir)}, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Chroma against the numpy vector index on one run.")
+    parser.add_argument("--run-timestamp", required=True, help="Run whose processed papers are used.")
+    parser.add_argument("--queries-per-paper", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=9)
+    parser.add_argument("--output", type=Path, default=None, help="Where to save the JSON report.")
+    args = parser.parse_args()
+
+    papers = load_processed_papers(args.run_timestamp)
+    if not papers:
+        print(f"No processed papers found for run '{args.run_timestamp}'.")
+        return
+    documents, metadatas, ids = run_chunks(papers)
+    queries = [query for query, _, _ in sample_queries(papers, args.queries_per_paper)]
+    if not documents or not queries:
+        print("Not enough text to benchmark.")
+        return
+
+    service = get_embedding_service()
+    start = time.perf_counter()
+    embeddings = service.encode(documents)
+    embed_seconds = time.perf_counter() - start
+    query_embeddings = service.encode(queries)
+    print(f"Benchmarking {len(documents)} chunks from {len(papers)} papers with {len(queries)} queries "
+          f"(top-{args.top_k}).\n")
+
+    work_dir = Path(tempfile.mkdtemp(prefix="vector_bench_"))
+    try:
+        chroma_stats, chroma_results = benchmark_chroma(work_dir / "chroma", documents, metadatas, ids,
+                                                        embeddings, query_embeddings, args.top_k)
+        numpy_stats, numpy_results = benchmark_numpy(work_dir / "numpy", documents, metadatas, ids,
+                                                     embeddings, query_embeddings, args.top_k)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    overlap = statistics.mean(len(set(a) & set(b)) / len(a) for a, b in zip(chroma_results, numpy_results) if a)
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "run_timestamp": args.run_timestamp,
+        "chunks": len(documents),
+        "queries": len(queries),
+        "top_k": args.top_k,
+        "embedding_seconds": round(embed_seconds, 3),
+        "backends": {"chroma": chroma_stats, "numpy": numpy_stats},
+        # Share of Chroma's (approximate) top-k that the exact numpy search also returns.
+        "top_k_overlap": round(overlap, 3),
+    }
+    print(json.dumps(report["backends"], indent=4))
+    print(f"Top-{args.top_k} overlap: {report['top_k_overlap']}")
+
+    output_path = args.output or BENCHMARK_DIR / f"vector_backend_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    print(f"\nBenchmark report saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
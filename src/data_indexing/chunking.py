@@ -0,0 +1,125 @@
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from paper_processing.bundle import open_run_bundle
+
+# --- Configuration ---
+# Chroma's default embedding function is all-MiniLM-L6-v2, which truncates its input at
+# 256 word pieces. Chunks are sized in those tokens so that every stored token is embedded.
+EMBEDDING_TOKENIZER_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+EMBEDDING_MAX_TOKENS = 256
+CHUNK_TOKENS = 240              # Leaves room for the [CLS]/[SEP] special tokens
+CHUNK_OVERLAP_TOKENS = 32
+FALLBACK_SECTION = "Abstract + TLDR"
+MAX_PARENT_SECTION_CHARS = 6000 # Cap on a parent section returned to the debate agents
+
+
+@lru_cache(maxsize=1)
+def _get_tokenizer():
+    """Loads the embedder's tokenizer, or returns None if it is unavailable (e.g. offline)."""
+    try:
+        from transformers import AutoTokenizer
+
+        return AutoTokenizer.from_pretrained(EMBEDDING_TOKENIZER_NAME)
+    except Exception as e:
+        print(f"Warning: Could not load tokenizer '{EMBEDDING_TOKENIZER_NAME}'. Estimating token counts. Error: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Counts the word pieces the embedding model sees for a text (without special tokens)."""
+    tokenizer = _get_tokenizer()
+    if tokenizer is not None:
+        return len(tokenizer.encode(text, add_special_tokens=False))
+    # WordPiece splits punctuation off and long words into several pieces; ~1.3 pieces per word.
+    return int(len(re.findall(r"\w+|[^\w\s]", text)) * 1.3) + 1
+
+
+def _make_splitter(chunk_tokens: int, overlap_tokens: int) -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_tokens,
+        chunk_overlap=min(overlap_tokens, chunk_tokens // 2),
+        length_function=count_tokens,
+        separators=["\n\n", "\n", ". ", " ", ""],
+        is_separator_regex=False,
+    )
+
+
+def chunk_section(section_title: str, text: str, chunk_tokens: int = CHUNK_TOKENS,
+                  overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> list:
+    """
+    Splits one section into chunks that fit the embedding window.
+
+    Each chunk is prefixed with the section title, which is counted against the
+    token budget, so the embedder knows where a passage comes from.
+    """
+    header = f"{section_title}: "
+    budget = max(chunk_tokens - count_tokens(header), 16)
+    return [header + piece for piece in _make_splitter(budget, overlap_tokens).split_text(text.strip()) if piece.strip()]
+
+
+def chunk_processed_paper(processed_data: dict, chunk_tokens: int = CHUNK_TOKENS,
+                          overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> list:
+    """
+    Chunks a processed paper section by section; no chunk spans two sections.
+
+    Args:
+        processed_data (dict): Section title -> list of paragraphs, as written by the processor.
+        chunk_tokens (int): Maximum tokens per chunk, including the section header.
+        overlap_tokens (int): Overlap between consecutive chunks of a section.
+
+    Returns:
+        list: Dicts with 'text', 'section' and 'section_index' (position of the section in the paper).
+    """
+    chunks = []
+    for section_index, (section_title, paragraphs) in enumerate(processed_data.items()):
+        if not isinstance(paragraphs, list) or not paragraphs:
+            continue
+        for text in chunk_section(section_title, "\n\n".join(paragraphs), chunk_tokens, overlap_tokens):
+            chunks.append({"text": text, "section": section_title, "section_index": section_index})
+    return chunks
+
+
+def chunk_fallback_text(text: str, chunk_tokens: int = CHUNK_TOKENS, overlap_tokens: int = CHUNK_OVERLAP_TOKENS) -> list:
+    """Chunks the title/abstract/TLDR text used for papers without a processed PDF."""
+    return [{"text": piece, "section": FALLBACK_SECTION, "section_index": 0}
+            for piece in _make_splitter(chunk_tokens, overlap_tokens).split_text(text) if piece.strip()]
+
+
+def load_parent_section(processed_papers_dir: Path, paper_id: str, section_title: str,
+                        max_chars: int = MAX_PARENT_SECTION_CHARS, bundle=None) -> Optional[str]:
+    """
+    Returns the full text of the section a chunk came from, for parent-section retrieval.
+
+    Reads the run bundle (or an open `bundle` reader), falling back to the per-paper JSON
+    of older runs. Returns None if the section is not available, e.g. for fallback chunks.
+    """
+    processed_papers_dir = Path(processed_papers_dir)
+    processed_data = None
+    own_bundle = None
+    try:
+        if bundle is None:
+            bundle = own_bundle = open_run_bundle(processed_papers_dir)
+        if bundle is not None:
+            processed_data = bundle.get(paper_id)
+    finally:
+        if own_bundle is not None:
+            own_bundle.close()
+
+    if processed_data is None:
+        json_path = processed_papers_dir / f"{paper_id}.json"
+        if not json_path.exists():
+            return None
+        with open(json_path, 'r', encoding='utf-8') as f:
+            processed_data = json.load(f)
+
+    paragraphs = processed_data.get(section_title)
+    if not isinstance(paragraphs, list) or not paragraphs:
+        return None
+    text = f"{section_title}\n\n" + "\n\n".join(paragraphs)
+    return text if len(text) <= max_chars else text[:max_chars].rsplit(" ", 1)[0] + " ..."
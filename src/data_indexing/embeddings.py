@@ -0,0 +1,165 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+from chromadb.api.types import Documents, EmbeddingFunction, Embeddings
+
+# --- Configuration ---
+# The model Chroma used implicitly before, so existing collections stay comparable.
+EMBEDDING_MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+# Persistent text-hash -> vector cache shared by indexing, retrieval, novelty and deduplication.
+EMBEDDING_CACHE_PATH = Path(__file__).resolve().parent.parent.parent / "data" / "embedding_cache" / "embeddings.sqlite3"
+ENCODE_BATCH_SIZE = 128
+# Number of encoder processes for large batches (0 or 1 encodes in this process).
+ENCODE_PROCESSES = int(os.getenv("EMBEDDING_PROCESSES", "0"))
+MULTIPROCESS_MIN_TEXTS = 2000   # Smaller batches do not pay off the pool's start-up cost
+
+
+class EmbeddingCache:
+    """
+    Stores embeddings in SQLite, keyed by the SHA-256 of the model name and the text.
+
+    Vectors are kept as raw float32 bytes. The cache is shared by all runs and modules,
+    so a text - an abstract, a chunk or an idea - is only ever encoded once per model.
+    """
+
+    def __init__(self, path: Path = EMBEDDING_CACHE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, dim INTEGER, vector BLOB)")
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(model_name: str, text: str) -> str:
+        return hashlib.sha256(f"{model_name}|{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: list) -> dict:
+        """Returns key -> vector for the keys that are cached."""
+        found = {}
+        with self._lock:
+            # SQLite limits the number of bound parameters per statement.
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})", batch
+                ).fetchall()
+                found.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+        return found
+
+    def put_many(self, items: dict) -> None:
+        """Stores key -> vector pairs."""
+        rows = [(key, len(vector), np.asarray(vector, dtype=np.float32).tobytes()) for key, vector in items.items()]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings (key, dim, vector) VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class EmbeddingService:
+    """
+    The one place where text is turned into vectors.
+
+    Texts are deduplicated and looked up in the persistent cache first; only the
+    misses are encoded, in batches of `batch_size`, and spread over a pool of
+    `processes` encoder processes when there are enough of them. Vectors are
+    L2-normalized, so cosine similarity is a dot product.
+
+    Args:
+        model_name (str): Sentence-transformers model to load.
+        cache (EmbeddingCache, optional): Vector cache; None disables caching.
+        batch_size (int): Texts per encoder batch.
+        processes (int): Encoder processes for large batches; 0 or 1 encodes in-process.
+    """
+
+    def __init__(self, model_name: str = EMBEDDING_MODEL_NAME, cache: EmbeddingCache = None,
+                 batch_size: int = ENCODE_BATCH_SIZE, processes: int = ENCODE_PROCESSES):
+        self.model_name = model_name
+        self.cache = cache
+        self.batch_size = batch_size
+        self.processes = processes
+        self._model = None
+        self._pool = None
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "encoded": 0}
+
+    def _get_model(self):
+        if self._model is None:
+            from sentence_transformers import SentenceTransformer
+
+            self._model = SentenceTransformer(self.model_name, token=False)
+        return self._model
+
+    def _encode(self, texts: list) -> np.ndarray:
+        model = self._get_model()
+        if self.processes > 1 and len(texts) >= MULTIPROCESS_MIN_TEXTS:
+            if self._pool is None:
+                self._pool = model.start_multi_process_pool(["cpu"] * self.processes)
+            vectors = model.encode_multi_process(texts, self._pool, batch_size=self.batch_size,
+                                                 normalize_embeddings=True)
+        else:
+            vectors = model.encode(texts, batch_size=self.batch_size, normalize_embeddings=True,
+                                   convert_to_numpy=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def encode(self, texts: list) -> np.ndarray:
+        """Returns an (n, dim) float32 array of normalized embeddings, in the order of `texts`."""
+        if not texts:
+            return np.zeros((0, self.dimension()), dtype=np.float32)
+        keys = [EmbeddingCache.make_key(self.model_name, text) for text in texts]
+        vectors = self.cache.get_many(list(set(keys))) if self.cache is not None else {}
+
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in vectors:
+                missing.setdefault(key, text)
+        if missing:
+            # One encoder at a time; the model is not shared safely across threads.
+            with self._lock:
+                encoded = self._encode(list(missing.values()))
+            new_vectors = dict(zip(missing, encoded))
+            vectors.update(new_vectors)
+            if self.cache is not None:
+                self.cache.put_many(new_vectors)
+
+        self.stats["hits"] += len(texts) - len(missing)
+        self.stats["encoded"] += len(missing)
+        return np.stack([vectors[key] for key in keys])
+
+    def dimension(self) -> int:
+        return self._get_model().get_sentence_embedding_dimension()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._get_model().stop_multi_process_pool(self._pool)
+            self._pool = None
+
+
+class ChromaEmbeddingFunction(EmbeddingFunction):
+    """Adapter that lets Chroma collections embed documents and queries through an `EmbeddingService`."""
+
+    def __init__(self, service: EmbeddingService):
+        self.service = service
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return self.service.encode(list(input)).tolist()
+
+
+@lru_cache(maxsize=1)
+def get_embedding_service() -> EmbeddingService:
+    """Returns the process-wide embedding service with the persistent cache."""
+    return EmbeddingService(cache=EmbeddingCache())
+
+
+def get_embedding_function() -> ChromaEmbeddingFunction:
+    """Returns the embedding function to pass to every Chroma collection that is created or opened."""
+    return ChromaEmbeddingFunction(get_embedding_service())
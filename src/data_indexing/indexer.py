@@ -1,32 +1,437 @@
 import chromadb
+import hashlib
 import json
+import os
+import time
+from functools import lru_cache
 from pathlib import Path
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from typing import Iterator
+
+from data_indexing.chunking import chunk_processed_paper, chunk_fallback_text
+from data_indexing.embeddings import get_embedding_function
+from data_indexing.lexical_index import build_run_bm25_index
+from data_indexing.numpy_index import NumpyVectorIndex, numpy_index_dir
+from paper_processing.bundle import open_run_bundle
 
 # --- Configuration ---
 # Where ChromaDB will store its persistent data
 CHROMA_PERSIST_DIR = Path(__file__).resolve().parent.parent.parent / "chroma_db"
 # The base name for collections. The final name will be suffixed with the run timestamp.
 CHROMA_COLLECTION_BASE_NAME = "lit_review_papers"
+# All runs share one collection: a chunk is keyed by its paper and text hash and embedded
+# once, however many runs reference it. Each run marks its chunks with a `run_<timestamp>`
+# metadata flag that retrieval filters on. Set to False to index into one collection per run.
+USE_SHARED_COLLECTION = True
+SHARED_COLLECTION_NAME = "lit_review_chunks"
+RUN_FLAG_PREFIX = "run_"
+# Vector store a run is indexed into: 'chroma', or 'numpy' for an exact in-process index
+# (memory-mapped .npy + JSON sidecar under data/vector_index/) without database overhead.
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+VECTOR_BACKENDS = ("chroma", "numpy")
 
-# Configuration for splitting text into chunks
-TEXT_SPLITTER = RecursiveCharacterTextSplitter(
-    chunk_size=10000,
-    chunk_overlap=2000,
-    length_function=len,
-    is_separator_regex=False,
-)
+# Chunk sizes are set in `chunking.py` to fit the embedding model's token window.
+# Chunks are written in batches as they are produced: peak memory follows the batch size, and an
+# interrupted build keeps the batches it finished.
+WRITE_BATCH_SIZE = 256
 
 def get_chroma_client() -> chromadb.PersistentClient:
     """Initializes and returns a persistent ChromaDB client."""
     return chromadb.PersistentClient(path=str(CHROMA_PERSIST_DIR))
 
-def index_run(run_timestamp: str):
+def run_flag(run_timestamp: str) -> str:
+    """Metadata key marking the chunks of a run in the shared collection."""
+    return f"{RUN_FLAG_PREFIX}{run_timestamp}"
+
+
+@lru_cache(maxsize=1)
+def metadata_key_deletion_supported() -> bool:
+    """
+    Whether the installed Chroma deletes a metadata key that an update sets to None.
+    Probed once per process on an in-memory collection. Where it does not, a removed
+    run's flag is set to False instead, which retrieval's `== True` filters also skip.
+    """
+    name = "metadata_key_deletion_probe"
+    try:
+        client = chromadb.EphemeralClient()
+        probe = client.get_or_create_collection(name=name, embedding_function=None)
+        probe.upsert(ids=["probe"], embeddings=[[0.0, 1.0]], metadatas=[{"kept": 1, "flag": True}])
+        probe.update(ids=["probe"], metadatas=[{"flag": None}])
+        metadata = probe.get(ids=["probe"], include=["metadatas"])["metadatas"][0] or {}
+        client.delete_collection(name=name)
+        return "flag" not in metadata
+    except Exception as e:
+        print(f"Warning: Could not check Chroma metadata key deletion, run flags will be set to False: {e}")
+        return False
+
+
+def chunk_content_hash(text: str) -> str:
+    """SHA-256 of a chunk's text, stored in its metadata to detect changed chunks."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _active_metadata(metadata: dict) -> dict:
+    """Metadata without run flags that are not set, e.g. left as False by older versions."""
+    return {key: value for key, value in metadata.items() if not key.startswith(RUN_FLAG_PREFIX) or value is True}
+
+
+def _write_chunk_batch(collection, chunks: list, metadatas: list, ids: list, existing_meta: dict) -> tuple:
+    """
+    Writes one batch of chunks, comparing each against its stored metadata.
+
+    New chunks and chunks whose content hash changed are upserted (and embedded);
+    chunks whose text is unchanged but whose metadata differs only get their
+    metadata updated. Returns (upserted, updated) counts.
+    """
+    upsert_idx, update_idx = [], []
+    metadatas = list(metadatas)
+    for i, (chunk_id, metadata) in enumerate(zip(ids, metadatas)):
+        current = existing_meta.get(chunk_id)
+        if current is not None:
+            # A shared chunk keeps the flags of the other runs that reference it.
+            other_runs = {key: value for key, value in current.items()
+                          if key.startswith(RUN_FLAG_PREFIX) and key not in metadata and value is True}
+            metadatas[i] = metadata = {**other_runs, **metadata}
+        if current is None or current.get("content_hash") != metadata["content_hash"]:
+            upsert_idx.append(i)
+        elif _active_metadata(current) != metadata:
+            update_idx.append(i)
+    if upsert_idx:
+        collection.upsert(documents=[chunks[i] for i in upsert_idx], metadatas=[metadatas[i] for i in upsert_idx],
+                          ids=[ids[i] for i in upsert_idx])
+    if update_idx:
+        collection.update(metadatas=[metadatas[i] for i in update_idx], ids=[ids[i] for i in update_idx])
+    return len(upsert_idx), len(update_idx)
+
+
+def _remove_chunks(collection, chunk_ids: list, existing_meta: dict, run_timestamp: str = None,
+                   batch_size: int = WRITE_BATCH_SIZE) -> tuple:
+    """
+    Removes chunks a run no longer produces.
+
+    In a per-run collection they are deleted. In the shared collection (`run_timestamp`
+    given) the run's flag key is removed instead (set to False on Chroma versions that
+    cannot delete keys), and a chunk is deleted once no run flag is set on it.
+    Returns (deleted, unflagged) counts.
+    """
+    to_delete, to_update, updated_meta = [], [], []
+    for chunk_id in chunk_ids:
+        metadata = existing_meta.get(chunk_id) or {}
+        flag = run_flag(run_timestamp) if run_timestamp else None
+        still_used = flag and any(value is True for key, value in metadata.items()
+                                  if key.startswith(RUN_FLAG_PREFIX) and key != flag)
+        if still_used:
+            to_update.append(chunk_id)
+            # Chroma merges updated metadata into the stored one; a None value deletes the key.
+            cleared = None if metadata_key_deletion_supported() else False
+            updated_meta.append({**_active_metadata(metadata), flag: cleared})
+        else:
+            to_delete.append(chunk_id)
+    for start in range(0, len(to_delete), batch_size):
+        collection.delete(ids=to_delete[start:start + batch_size])
+    for start in range(0, len(to_update), batch_size):
+        collection.update(ids=to_update[start:start + batch_size], metadatas=updated_meta[start:start + batch_size])
+    return len(to_delete), len(to_update)
+
+
+def sync_chunks(collection, chunks: list, metadatas: list, ids: list, where: dict = None,
+                batch_size: int = WRITE_BATCH_SIZE, run_timestamp: str = None) -> dict:
+    """
+    Brings a collection in line with the given chunks, embedding only what changed.
+
+    Existing chunks are compared by id and content hash: new or changed chunks are
+    upserted (and embedded), chunks whose text is unchanged but whose metadata differs
+    only get their metadata updated, and chunks in scope that are no longer produced
+    are deleted. Running it twice is a no-op, and a build interrupted half-way resumes
+    by embedding only the chunks that were not written yet.
+
+    Args:
+        collection: The Chroma collection.
+        chunks, metadatas, ids (list): The desired chunks. Metadatas must carry 'content_hash'.
+        where (dict, optional): Chroma filter limiting the existing chunks that are
+            considered for deletion (e.g. {"paper_id": ...}); None means the whole collection.
+        batch_size (int): Number of chunks written per call.
+        run_timestamp (str, optional): The run being synced, for the shared collection.
+            Chunks it no longer produces are then only unflagged, see `_remove_chunks`.
+
+    Returns:
+        dict: Counts of 'upserted', 'updated', 'deleted' (or unflagged) and 'unchanged' chunks.
+    """
+    existing = collection.get(where=where, include=["metadatas"]) if where else collection.get(include=["metadatas"])
+    existing_meta = dict(zip(existing.get("ids", []), existing.get("metadatas") or []))
+
+    stored_meta = dict(existing_meta)
+    upserted, updated = 0, 0
+    for start in range(0, len(ids), batch_size):
+        batch_ids = ids[start:start + batch_size]
+        # Chunks stored by other runs are outside `where`; found by id, they are only flagged, not re-embedded.
+        lookup = [chunk_id for chunk_id in batch_ids if chunk_id not in stored_meta]
+        if lookup:
+            found = collection.get(ids=lookup, include=["metadatas"])
+            stored_meta.update(zip(found.get("ids", []), found.get("metadatas") or []))
+        batch_upserted, batch_updated = _write_chunk_batch(
+            collection, chunks[start:start + batch_size], metadatas[start:start + batch_size],
+            batch_ids, stored_meta,
+        )
+        upserted += batch_upserted
+        updated += batch_updated
+
+    wanted = set(ids)
+    to_delete = [chunk_id for chunk_id in existing_meta if chunk_id not in wanted]
+    _remove_chunks(collection, to_delete, existing_meta, run_timestamp, batch_size)
+
+    return {
+        "upserted": upserted,
+        "updated": updated,
+        "deleted": len(to_delete),
+        "unchanged": len(ids) - upserted - updated,
+    }
+
+
+def ingest_chunk_stream(collection, chunk_stream: Iterator[tuple], batch_size: int = WRITE_BATCH_SIZE,
+                        delete_stale: bool = True, run_timestamp: str = None) -> dict:
+    """
+    Writes a lazily produced stream of chunks to a collection in fixed-size batches.
+
+    Only one batch of chunk texts and metadata is held at a time; each batch is
+    diffed against what is stored (see `sync_chunks`) and written - and embedded by
+    Chroma - as soon as it is full. Only the chunk ids are kept for the whole run, to
+    delete chunks that are no longer produced once the stream is exhausted.
+
+    Args:
+        collection: The Chroma collection.
+        chunk_stream (Iterator[tuple]): Yields (chunk, metadata, id) triples.
+        batch_size (int): Chunks per write; must not exceed the client's max batch size.
+        delete_stale (bool): Delete chunks of the collection that the stream did not produce.
+        run_timestamp (str, optional): The run being indexed into the shared collection; only
+            chunks flagged for this run are considered stale, and they are unflagged.
+
+    Returns:
+        dict: Counts of 'chunks', 'batches', 'upserted', 'updated', 'deleted' and
+            'unchanged', plus 'seconds' and 'chunks_per_second'.
+    """
+    stats = {"chunks": 0, "batches": 0, "upserted": 0, "updated": 0, "deleted": 0}
+    seen_ids = set()
+    start_time = time.perf_counter()
+
+    def flush(batch: list):
+        chunks, metadatas, ids = (list(column) for column in zip(*batch))
+        existing = collection.get(ids=ids, include=["metadatas"])
+        existing_meta = dict(zip(existing.get("ids", []), existing.get("metadatas") or []))
+        upserted, updated = _write_chunk_batch(collection, chunks, metadatas, ids, existing_meta)
+        stats["upserted"] += upserted
+        stats["updated"] += updated
+        stats["batches"] += 1
+        elapsed = time.perf_counter() - start_time
+        print(f"   Batch {stats['batches']}: {stats['chunks']} chunks written "
+              f"({stats['chunks'] / elapsed:.1f} chunks/s)")
+
+    batch = []
+    for chunk, metadata, chunk_id in chunk_stream:
+        if chunk_id in seen_ids:
+            # A paper listed twice in the report; Chroma rejects duplicate ids in a batch.
+            continue
+        batch.append((chunk, metadata, chunk_id))
+        seen_ids.add(chunk_id)
+        stats["chunks"] += 1
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+
+    if delete_stale:
+        if run_timestamp:
+            existing = collection.get(where={run_flag(run_timestamp): True}, include=["metadatas"])
+        else:
+            existing = collection.get(include=[])
+        existing_meta = dict(zip(existing["ids"], existing.get("metadatas") or [{}] * len(existing["ids"])))
+        stale = [chunk_id for chunk_id in existing_meta if chunk_id not in seen_ids]
+        _remove_chunks(collection, stale, existing_meta, run_timestamp, batch_size)
+        stats["deleted"] = len(stale)
+
+    stats["unchanged"] = stats["chunks"] - stats["upserted"] - stats["updated"]
+    elapsed = time.perf_counter() - start_time
+    stats["seconds"] = round(elapsed, 3)
+    stats["chunks_per_second"] = round(stats["chunks"] / elapsed, 1) if elapsed else 0.0
+    return stats
+
+
+def remove_run_from_shared_collection(collection, run_timestamp: str, batch_size: int = WRITE_BATCH_SIZE) -> dict:
+    """
+    Drops a run from the shared collection: its flag is cleared on every chunk, and chunks
+    no other run references are deleted.
+
+    Returns:
+        dict: Counts of 'deleted' and 'unflagged' chunks.
+    """
+    existing = collection.get(where={run_flag(run_timestamp): True}, include=["metadatas"])
+    existing_meta = dict(zip(existing["ids"], existing["metadatas"]))
+    deleted, unflagged = _remove_chunks(collection, list(existing_meta), existing_meta, run_timestamp, batch_size)
+    return {"deleted": deleted, "unflagged": unflagged}
+
+
+def effective_batch_size(client, batch_size: int = WRITE_BATCH_SIZE) -> int:
+    """Caps a write batch size at the largest batch the Chroma client accepts."""
+    limit = getattr(client, "get_max_batch_size", None)
+    limit = limit() if callable(limit) else getattr(client, "max_batch_size", None)
+    return min(batch_size, limit) if limit else batch_size
+
+
+def get_run_collection(run_timestamp: str, client: chromadb.PersistentClient = None,
+                       shared: bool = USE_SHARED_COLLECTION):
+    """
+    Returns (creating if needed) the Chroma collection a run is indexed into: the shared
+    collection, or with `shared=False` the run's own `lit_review_papers_<timestamp>`.
+    """
+    client = client or get_chroma_client()
+    # Chunks are embedded by the shared, cached embedding service rather than Chroma's implicit default.
+    if shared:
+        return client.get_or_create_collection(name=SHARED_COLLECTION_NAME, embedding_function=get_embedding_function())
+    # Create a unique collection name for this specific run
+    collection_name = f"{CHROMA_COLLECTION_BASE_NAME}_{run_timestamp}"
+    return client.get_or_create_collection(name=collection_name, embedding_function=get_embedding_function())
+
+
+def load_paper_content(paper: dict, processed_papers_dir: Path, index: int = 0, bundle=None) -> tuple:
+    """
+    Reads what gets indexed for a paper: its processed content from the run bundle or a
+    per-paper JSON file, or else the title/abstract/TLDR text from the report.
+
+    Returns:
+        tuple: (processed_data, fallback_text, content_source); exactly one of the
+            first two is set (fallback_text may be empty).
+    """
+    paper_id = paper.get("paperId", f"unknown_id_{index}")
+
+    # Construct the path to the processed JSON file for the paper
+    processed_file_path = Path(processed_papers_dir) / f"{paper_id}.json"
+
+    processed_data = bundle.get(paper_id) if bundle is not None else None
+    if processed_data is not None:
+        return processed_data, None, f"Processed bundle: {bundle.path.name}#{paper_id}"
+    if processed_file_path.exists():
+        with open(processed_file_path, 'r', encoding='utf-8') as f:
+            return json.load(f), None, f"Processed file: {processed_file_path.name}"
+
+    # --- Fallback Strategy: Use abstract and TLDR ---
+    abstract = paper.get("abstract", "")
+    tldr = paper.get("tldr", {}).get("text", "") if paper.get("tldr") else ""
+    fallback_text = f"Title: {paper.get('title', 'Unknown Title')}\n\nAbstract: {abstract}\n\nTLDR: {tldr}"
+    return None, fallback_text, "Fallback (Abstract + TLDR)"
+
+
+def chunk_paper_content(processed_data, fallback_text: str) -> list:
+    """Chunks what `load_paper_content` returned: section by section, or the fallback text."""
+    if processed_data is not None:
+        # --- Primary Strategy: Use fully processed paper, chunked section by section ---
+        return chunk_processed_paper(processed_data)
+    return chunk_fallback_text(fallback_text) if fallback_text and fallback_text.strip() else []
+
+
+def build_paper_chunks(paper: dict, processed_papers_dir: Path, run_timestamp: str, index: int = 0, bundle=None,
+                       shared: bool = USE_SHARED_COLLECTION) -> tuple:
+    """
+    Chunks a single paper for indexing.
+
+    Uses the processed content of the paper if it exists - from the run bundle,
+    or from a per-paper JSON file for older runs - otherwise falls back to its
+    title, abstract and TLDR from the report.
+
+    Args:
+        paper (dict): The paper entry from the literature review report.
+        processed_papers_dir (Path): Directory with the processed paper JSONs of the run.
+        run_timestamp (str): The run the chunks belong to.
+        index (int): Position of the paper in the report, used for papers without an ID.
+        bundle (RunBundleReader, optional): The run's bundle of processed papers.
+        shared (bool): Build chunks for the shared collection: ids are derived from the
+            paper and the chunk's text hash, and the run is recorded as a metadata flag.
+
+    Returns:
+        tuple: (chunks, metadatas, ids) lists ready for `collection.add`.
+    """
+    paper_id = paper.get("paperId", f"unknown_id_{index}")
+    paper_title = paper.get("title", "Unknown Title")
+
+    processed_data, fallback_text, content_source = load_paper_content(paper, processed_papers_dir, index, bundle)
+    pieces = chunk_paper_content(processed_data, fallback_text)
+
+    chunks = [piece["text"] for piece in pieces]
+
+    metadatas, ids = [], []
+    if chunks:
+        print(f"  -> Paper '{paper_id}' ({content_source}): Chunked into {len(chunks)} documents.")
+        for chunk_idx, piece in enumerate(pieces):
+            content_hash = chunk_content_hash(piece["text"])
+            # Create metadata for this chunk; the section lets retrieval return the parent section.
+            metadata = {
+                "paper_id": paper_id,
+                "title": paper_title,
+                "year": paper.get("year"),
+                "source": content_source,
+                "chunk_index": chunk_idx,
+                "section": piece["section"],
+                "section_index": piece["section_index"],
+                "content_hash": content_hash,
+            }
+            if shared:
+                metadata[run_flag(run_timestamp)] = True
+                # The same text of the same paper is the same chunk in every run.
+                chunk_id = f"{paper_id}_{content_hash[:24]}"
+            else:
+                metadata["run_timestamp"] = run_timestamp
+                chunk_id = f"{paper_id}_chunk_{chunk_idx}"
+            metadatas.append(metadata)
+            ids.append(chunk_id)
+    else:
+        print(f"  -> Paper '{paper_id}': No content found to chunk.")
+
+    if shared and len(set(ids)) < len(ids):
+        # Identical passages within a paper collapse to one chunk.
+        unique = {}
+        for chunk, metadata, chunk_id in zip(chunks, metadatas, ids):
+            unique.setdefault(chunk_id, (chunk, metadata))
+        ids = list(unique)
+        chunks = [unique[chunk_id][0] for chunk_id in ids]
+        metadatas = [unique[chunk_id][1] for chunk_id in ids]
+
+    return chunks, metadatas, ids
+
+
+def iter_run_chunks(papers: list, processed_papers_dir: Path, run_timestamp: str, bundle=None,
+                    shared: bool = USE_SHARED_COLLECTION) -> Iterator[tuple]:
+    """Yields (chunk, metadata, id) for every paper of a run, chunking one paper at a time."""
+    for i, paper in enumerate(papers):
+        chunks, metadatas, ids = build_paper_chunks(paper, processed_papers_dir, run_timestamp, index=i, bundle=bundle,
+                                                    shared=shared)
+        yield from zip(chunks, metadatas, ids)
+
+
+def index_run_numpy(papers: list, processed_papers_dir: Path, run_timestamp: str) -> NumpyVectorIndex:
+    """Chunks a run and writes it to its own exact-search numpy index (the 'numpy' backend)."""
+    bundle = open_run_bundle(processed_papers_dir)
+    try:
+        chunks, metadatas, ids, seen = [], [], [], set()
+        for chunk, metadata, chunk_id in iter_run_chunks(papers, processed_papers_dir, run_timestamp,
+                                                         bundle=bundle, shared=False):
+            if chunk_id not in seen:
+                seen.add(chunk_id)
+                chunks.append(chunk)
+                metadatas.append(metadata)
+                ids.append(chunk_id)
+    finally:
+        if bundle is not None:
+            bundle.close()
+    return NumpyVectorIndex.build(numpy_index_dir(run_timestamp), chunks, metadatas, ids)
+
+
+def index_run(run_timestamp: str, backend: str = VECTOR_BACKEND):
     """
     Main function to process and index all papers from a specific workflow run.
     It reads the final report, processes each paper, chunks the content,
-    and indexes it into ChromaDB.
+    and indexes it into ChromaDB - or, with backend='numpy', into a per-run numpy index.
     """
+    if backend not in VECTOR_BACKENDS:
+        raise ValueError(f"Unknown vector backend '{backend}'. Choose one of: {', '.join(VECTOR_BACKENDS)}")
     project_root = Path(__file__).resolve().parent.parent.parent
     report_path = project_root / "results" / "final_reports" / f"lit_review_report_{run_timestamp}.json"
     processed_papers_dir = project_root / "data" / "processed_papers" / f"lit_review_papers_{run_timestamp}"
@@ -49,88 +454,48 @@ def index_run(run_timestamp: str):
 
     print(f"Found {len(all_papers)} papers in report to process for indexing.")
 
-    # 2. Prepare documents for ChromaDB
-    all_chunks = []
-    all_metadatas = []
-    all_ids = []
-
-    for i, paper in enumerate(all_papers):
-        paper_id = paper.get("paperId", f"unknown_id_{i}")
-        paper_title = paper.get("title", "Unknown Title")
-        
-        # Construct the path to the processed JSON file for the paper
-        processed_file_path = processed_papers_dir / f"{paper_id}.json"
-
-        content_source = ""
-        chunks = []
-
-        if processed_file_path.exists():
-            # --- Primary Strategy: Use fully processed paper ---
-            content_source = f"Processed file: {processed_file_path.name}"
-            with open(processed_file_path, 'r', encoding='utf-8') as f:
-                processed_data = json.load(f)
-            
-            full_text = ""
-            # Combine all paragraphs from all sections into one text block
-            for section_title, paragraphs in processed_data.items():
-                if isinstance(paragraphs, list):
-                    full_text += f"\n\n--- {section_title.upper()} ---\n\n" + " ".join(paragraphs)
-            
-            if full_text:
-                chunks = TEXT_SPLITTER.split_text(full_text.strip())
-
-        else:
-            # --- Fallback Strategy: Use abstract and TLDR ---
-            content_source = "Fallback (Abstract + TLDR)"
-            abstract = paper.get("abstract", "")
-            tldr = paper.get("tldr", {}).get("text", "") if paper.get("tldr") else ""
-            
-            fallback_text = f"Title: {paper_title}\n\nAbstract: {abstract}\n\nTLDR: {tldr}"
-            
-            if fallback_text.strip():
-                chunks = TEXT_SPLITTER.split_text(fallback_text)
-
-        if chunks:
-            print(f"  -> Paper '{paper_id}' ({content_source}): Chunked into {len(chunks)} documents.")
-            for chunk_idx, chunk_text in enumerate(chunks):
-                all_chunks.append(chunk_text)
-                
-                # Create metadata for this chunk
-                all_metadatas.append({
-                    "paper_id": paper_id,
-                    "title": paper_title,
-                    "year": paper.get("year"),
-                    "run_timestamp": run_timestamp,
-                    "source": content_source,
-                    "chunk_index": chunk_idx,
-                })
-                
-                # Create a unique ID for this chunk
-                all_ids.append(f"{paper_id}_chunk_{chunk_idx}")
-        else:
-            print(f"  -> Paper '{paper_id}': No content found to chunk.")
-
-    # 3. Index the documents in ChromaDB
-    if not all_chunks:
-        print("\nNo text chunks were generated. Skipping database indexing.")
+    if backend == "numpy":
+        start = time.perf_counter()
+        index = index_run_numpy(all_papers, processed_papers_dir, run_timestamp)
+        build_run_bm25_index(index, run_timestamp)
+        print(f"\nNumpy index with {index.count()} chunks written to {index.index_dir} "
+              f"in {time.perf_counter() - start:.2f}s.")
         print("--- Data Indexing Workflow Finished ---")
         return
-        
+
+    # 2. Chunk papers lazily and write them to ChromaDB batch by batch
     client = get_chroma_client()
-    # Create a unique collection name for this specific run
-    collection_name = f"{CHROMA_COLLECTION_BASE_NAME}_{run_timestamp}"
-    collection = client.get_or_create_collection(name=collection_name)
+    collection = get_run_collection(run_timestamp, client)
+    batch_size = effective_batch_size(client)
+    print(f"\nSyncing chunks into Chroma collection '{collection.name}' in batches of {batch_size}...")
 
-    print(f"\nIndexing {len(all_chunks)} chunks into Chroma collection '{collection_name}'...")
-    
-    # ChromaDB's `add` is idempotent. If IDs already exist, they are updated.
-    collection.add(
-        documents=all_chunks,
-        metadatas=all_metadatas,
-        ids=all_ids
-    )
-
-    print(f"Successfully indexed {collection.count()} total documents in the collection.")
+    # Processed papers are streamed record by record from the run bundle, if the run has one.
+    bundle = open_run_bundle(processed_papers_dir)
+    try:
+        # Only new or changed chunks are embedded; chunks that disappeared are deleted.
+        sync_stats = ingest_chunk_stream(
+            collection, iter_run_chunks(all_papers, processed_papers_dir, run_timestamp, bundle=bundle),
+            batch_size=batch_size, run_timestamp=run_timestamp if USE_SHARED_COLLECTION else None,
+        )
+    finally:
+        if bundle is not None:
+            bundle.close()
+
+    if not sync_stats["chunks"]:
+        print("\nNo text chunks were generated.")
+    print(f"\nWrote {sync_stats['chunks']} chunks in {sync_stats['batches']} batches "
+          f"({sync_stats['chunks_per_second']} chunks/s over {sync_stats['seconds']}s).")
+    print(f"Embedded {sync_stats['upserted']} new/changed chunks, updated metadata of {sync_stats['updated']}, "
+          f"deleted {sync_stats['deleted']}, kept {sync_stats['unchanged']} unchanged.")
+    # 3. Build the run's BM25 index from the stored chunks, for hybrid retrieval
+    bm25_index = build_run_bm25_index(collection, run_timestamp,
+                                      where={run_flag(run_timestamp): True} if USE_SHARED_COLLECTION else None)
+    print(f"BM25 index built over {len(bm25_index.ids)} chunks ({len(bm25_index.postings)} terms).")
+
+    if USE_SHARED_COLLECTION:
+        print(f"Shared collection now holds {collection.count()} documents; this run references {sync_stats['chunks']}.")
+    else:
+        print(f"Collection now holds {collection.count()} documents.")
     print("--- Data Indexing Workflow Finished ---")
 
 
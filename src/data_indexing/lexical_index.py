@@ -0,0 +1,116 @@
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from pathlib import Path
+
+# --- Configuration ---
+# One BM25 index per run, built next to the vector index by `index_run`.
+LEXICAL_INDEX_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "lexical_index"
+BM25_K1 = 1.5
+BM25_B = 0.75
+RRF_K = 60  # Standard reciprocal rank fusion constant; damps the weight of the top ranks
+
+# Identifiers like "GPT-4", "k-means" or "bert_base" stay one token.
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_][a-z0-9]+)*")
+# Common function words, plus the filler of the debater query template ("... from the perspective of ...").
+_STOPWORDS = frozenset(
+    "a an and are as at be by can for from has have in is it its of on or our that the their these this "
+    "those to was we were which with perspective".split()
+)
+
+
+def tokenize(text: str) -> list:
+    """Lowercases and splits text into terms, dropping stopwords."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower()) if token not in _STOPWORDS]
+
+
+def bm25_index_path(run_timestamp: str) -> Path:
+    return LEXICAL_INDEX_DIR / f"bm25_{run_timestamp}.json"
+
+
+class BM25Index:
+    """
+    Okapi BM25 over the chunks of a run.
+
+    Only postings (term -> [(document position, term frequency)]) and document
+    lengths are stored; the chunk texts stay in the vector store and are looked up
+    by id. Rare technical terms, which a small embedding model represents poorly,
+    get a high IDF and dominate the lexical ranking.
+    """
+
+    def __init__(self, ids: list, doc_lengths: list, postings: dict, k1: float = BM25_K1, b: float = BM25_B):
+        self.ids = ids
+        self.doc_lengths = doc_lengths
+        self.postings = postings
+        self.k1 = k1
+        self.b = b
+        self.avg_length = sum(doc_lengths) / len(doc_lengths) if doc_lengths else 0.0
+        n = len(ids)
+        self.idf = {term: math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5)) for term, docs in postings.items()}
+
+    @classmethod
+    def build(cls, ids: list, texts: list) -> "BM25Index":
+        postings = defaultdict(list)
+        doc_lengths = []
+        for position, text in enumerate(texts):
+            term_counts = Counter(tokenize(text))
+            doc_lengths.append(sum(term_counts.values()))
+            for term, count in term_counts.items():
+                postings[term].append([position, count])
+        return cls(list(ids), doc_lengths, dict(postings))
+
+    def search(self, query: str, k: int = 10) -> list:
+        """Returns up to k (chunk id, score) pairs, best first."""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for position, count in self.postings[term]:
+                length_norm = 1 - self.b + self.b * self.doc_lengths[position] / (self.avg_length or 1.0)
+                scores[position] += idf * count * (self.k1 + 1) / (count + self.k1 * length_norm)
+        best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+        return [(self.ids[position], score) for position, score in best]
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"ids": self.ids, "doc_lengths": self.doc_lengths, "postings": self.postings,
+                       "k1": self.k1, "b": self.b}, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> "BM25Index":
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(data["ids"], data["doc_lengths"], data["postings"], data.get("k1", BM25_K1), data.get("b", BM25_B))
+
+
+def build_run_bm25_index(collection, run_timestamp: str, where: dict = None) -> BM25Index:
+    """
+    Builds and saves the BM25 index of a run from the chunks stored in its collection.
+
+    Reading the chunks back from Chroma keeps the lexical and the vector index in
+    sync, whichever ingestion path (batch or streaming) wrote them.
+    """
+    stored = collection.get(where=where, include=["documents"]) if where else collection.get(include=["documents"])
+    index = BM25Index.build(stored["ids"], stored["documents"])
+    index.save(bm25_index_path(run_timestamp))
+    return index
+
+
+def reciprocal_rank_fusion(rankings: list, k: int = RRF_K) -> list:
+    """
+    Fuses several ranked lists of ids: each id scores sum(1 / (k + rank)).
+
+    Returns the ids sorted by fused score, best first.
+    """
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, item_id in enumerate(ranking, start=1):
+            scores[item_id] += 1.0 / (k + rank)
+    return sorted(scores, key=lambda item_id: scores[item_id], reverse=True)
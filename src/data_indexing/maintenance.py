@@ -0,0 +1,290 @@
+"""
+Maintenance command for the vector stores.
+
+Lists every indexed run - legacy per-run Chroma collections, runs in the shared
+collection and numpy indexes - with its size, age and whether the run's workflow
+state still exists. Orphaned or expired runs can be dropped or archived, and the
+Chroma SQLite file compacted. Examples:
+
+    python src/data_indexing/maintenance.py list
+    python src/data_indexing/maintenance.py gc --dry-run
+    python src/data_indexing/maintenance.py gc --retention-days 30 --keep-last 5 --archive
+    python src/data_indexing/maintenance.py compact
+"""
+import argparse
+import gzip
+import json
+import shutil
+import sqlite3
+import sys
+import uuid
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+src_path = Path(__file__).resolve().parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from data_indexing.indexer import (
+    CHROMA_COLLECTION_BASE_NAME, CHROMA_PERSIST_DIR, RUN_FLAG_PREFIX, SHARED_COLLECTION_NAME,
+    get_chroma_client, remove_run_from_shared_collection, run_flag,
+)
+from data_indexing.lexical_index import bm25_index_path
+from data_indexing.numpy_index import NUMPY_INDEX_DIR
+
+# --- Configuration ---
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+ARCHIVE_DIR = PROJECT_ROOT / "data" / "index_archive"
+# Any of these files marks a run as still in use.
+STATE_FILE_PATTERNS = [
+    PROJECT_ROOT / "results" / "agent_states" / "workflow_state_{ts}.json",
+    PROJECT_ROOT / "results" / "zeroshot_agent_states" / "workflow_state_{ts}.json",
+    PROJECT_ROOT / "results" / "simple_agent_states" / "simple_workflow_state_{ts}.json",
+]
+# Default retention policy for `gc`: orphaned runs (no workflow state) older than
+# MIN_ORPHAN_AGE_DAYS are collected, so runs still in progress are left alone; with a
+# retention period, runs older than it are collected too. The KEEP_LAST most recent runs
+# are never collected.
+RETENTION_DAYS = None
+KEEP_LAST = 5
+MIN_ORPHAN_AGE_DAYS = 1
+PAGE_SIZE = 1000
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+
+def has_workflow_state(run_timestamp: str) -> bool:
+    return any(Path(str(pattern).format(ts=run_timestamp)).exists() for pattern in STATE_FILE_PATTERNS)
+
+
+def run_age_days(run_timestamp: str):
+    """Age of a run from its timestamp, or None for names that are not timestamps (e.g. test runs)."""
+    try:
+        return (datetime.now() - datetime.strptime(run_timestamp, TIMESTAMP_FORMAT)).total_seconds() / 86400
+    except ValueError:
+        return None
+
+
+def _directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in path.rglob("*") if f.is_file()) if path.exists() else 0
+
+
+def _get_collection(client, name: str):
+    try:
+        return client.get_collection(name=name)
+    except Exception:
+        return None
+
+
+def shared_run_counts(collection) -> Counter:
+    """Counts the chunks each run references in the shared collection, paging through the metadata."""
+    counts = Counter()
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=PAGE_SIZE, offset=offset)
+        for metadata in page["metadatas"]:
+            for key, value in (metadata or {}).items():
+                if key.startswith(RUN_FLAG_PREFIX) and value is True:
+                    counts[key[len(RUN_FLAG_PREFIX):]] += 1
+        if len(page["ids"]) < PAGE_SIZE:
+            return counts
+        offset += PAGE_SIZE
+
+
+def collect_runs(client) -> dict:
+    """Returns run_timestamp -> {'stores': {store: chunks}, 'numpy_bytes', 'age_days', 'has_state'}."""
+    runs = {}
+
+    def entry(run_timestamp: str) -> dict:
+        return runs.setdefault(run_timestamp, {"stores": {}, "numpy_bytes": 0})
+
+    prefix = f"{CHROMA_COLLECTION_BASE_NAME}_"
+    for collection in client.list_collections():
+        # Newer Chroma versions return names, older ones collection objects.
+        name = collection if isinstance(collection, str) else collection.name
+        if name.startswith(prefix):
+            entry(name[len(prefix):])["stores"]["chroma_collection"] = client.get_collection(name=name).count()
+
+    shared = _get_collection(client, SHARED_COLLECTION_NAME)
+    if shared is not None:
+        for run_timestamp, count in shared_run_counts(shared).items():
+            entry(run_timestamp)["stores"]["chroma_shared"] = count
+
+    if NUMPY_INDEX_DIR.exists():
+        for index_dir in sorted(p for p in NUMPY_INDEX_DIR.iterdir() if p.is_dir()):
+            run = entry(index_dir.name)
+            run["stores"]["numpy"] = len(json.loads((index_dir / "chunks.json").read_text(encoding='utf-8'))["ids"]) \
+                if (index_dir / "chunks.json").exists() else 0
+            run["numpy_bytes"] = _directory_size(index_dir)
+
+    for run_timestamp, run in runs.items():
+        run["age_days"] = run_age_days(run_timestamp)
+        run["has_state"] = has_workflow_state(run_timestamp)
+    return runs
+
+
+def select_for_gc(runs: dict, retention_days=RETENTION_DAYS, keep_last: int = KEEP_LAST,
+                  min_orphan_age_days: float = MIN_ORPHAN_AGE_DAYS) -> dict:
+    """
+    Applies the retention policy. Returns run_timestamp -> reason for the runs to collect.
+    Runs whose name is not a timestamp have no age and are never collected automatically.
+    """
+    dated = sorted((run_timestamp for run_timestamp, run in runs.items() if run["age_days"] is not None),
+                   key=lambda run_timestamp: runs[run_timestamp]["age_days"])
+    selected = {}
+    for run_timestamp in dated[keep_last:]:
+        run = runs[run_timestamp]
+        if not run["has_state"] and run["age_days"] >= min_orphan_age_days:
+            selected[run_timestamp] = "orphaned"
+        elif retention_days is not None and run["age_days"] > retention_days:
+            selected[run_timestamp] = f"older than {retention_days} days"
+    return selected
+
+
+def _archive_chunks(archive_path: Path, result: dict) -> None:
+    """Writes chunks returned by `collection.get` as gzipped JSON lines, embeddings included."""
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(archive_path, 'wt', encoding='utf-8') as f:
+        for chunk_id, document, metadata, embedding in zip(result["ids"], result["documents"],
+                                                           result["metadatas"], result["embeddings"]):
+            f.write(json.dumps({"id": chunk_id, "document": document, "metadata": metadata,
+                                "embedding": [float(x) for x in embedding]}) + "\n")
+
+
+def drop_run(client, run_timestamp: str, stores: dict, archive: bool) -> None:
+    """Removes a run from every store it is in, archiving it to ARCHIVE_DIR first if asked to."""
+    archive_dir = ARCHIVE_DIR / run_timestamp
+    include = ["documents", "metadatas", "embeddings"]
+
+    if "chroma_collection" in stores:
+        name = f"{CHROMA_COLLECTION_BASE_NAME}_{run_timestamp}"
+        if archive:
+            _archive_chunks(archive_dir / "chroma_collection.jsonl.gz", client.get_collection(name=name).get(include=include))
+        client.delete_collection(name=name)
+
+    if "chroma_shared" in stores:
+        shared = client.get_collection(name=SHARED_COLLECTION_NAME)
+        if archive:
+            _archive_chunks(archive_dir / "chroma_shared.jsonl.gz",
+                            shared.get(where={run_flag(run_timestamp): True}, include=include))
+        counts = remove_run_from_shared_collection(shared, run_timestamp)
+        print(f"   shared collection: {counts['deleted']} chunks deleted, {counts['unflagged']} kept for other runs")
+
+    numpy_dir = NUMPY_INDEX_DIR / run_timestamp
+    if numpy_dir.exists():
+        if archive:
+            archive_dir.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(numpy_dir), str(archive_dir / "numpy"))
+        else:
+            shutil.rmtree(numpy_dir)
+
+    bm25_path = bm25_index_path(run_timestamp)
+    if bm25_path.exists():
+        if archive:
+            archive_dir.mkdir(parents=True, exist_ok=True)
+            shutil.move(str(bm25_path), str(archive_dir / bm25_path.name))
+        else:
+            bm25_path.unlink()
+
+
+def _remove_orphaned_segment_dirs(persist_dir: Path, conn) -> int:
+    """
+    Deletes HNSW segment directories that no segment in the database refers to any more.
+    Chroma names each vector segment's directory after the segment id and can leave it
+    behind when a collection is deleted. Returns the number of directories removed.
+    """
+    try:
+        segment_ids = {row[0] for row in conn.execute("SELECT id FROM segments")}
+    except sqlite3.Error as e:
+        print(f"Could not read Chroma segments, keeping segment directories: {e}")
+        return 0
+    removed = 0
+    for path in persist_dir.iterdir():
+        try:
+            is_segment_dir = path.is_dir() and str(uuid.UUID(path.name)) == path.name
+        except ValueError:
+            is_segment_dir = False
+        if is_segment_dir and path.name not in segment_ids:
+            shutil.rmtree(path)
+            removed += 1
+    return removed
+
+
+def compact(persist_dir: Path = CHROMA_PERSIST_DIR) -> None:
+    """
+    Runs VACUUM on Chroma's SQLite file to return the space of deleted records to the OS,
+    and deletes the HNSW segment directories left behind by deleted collections.
+    Run it while no pipeline or debate is using the database.
+    """
+    db_path = persist_dir / "chroma.sqlite3"
+    if not db_path.exists():
+        print(f"No Chroma database found at {db_path}.")
+        return
+    before = _directory_size(persist_dir)
+    conn = sqlite3.connect(str(db_path))
+    try:
+        removed = _remove_orphaned_segment_dirs(persist_dir, conn)
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    after = _directory_size(persist_dir)
+    print(f"Compacted {persist_dir}: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB "
+          f"({removed} orphaned segment directories removed).")
+
+
+def print_runs(runs: dict) -> None:
+    print(f"{'run':18s} {'age (days)':>10s} {'state':>6s} {'chunks':>8s}  stores")
+    for run_timestamp in sorted(runs):
+        run = runs[run_timestamp]
+        age = f"{run['age_days']:.1f}" if run["age_days"] is not None else "?"
+        stores = ", ".join(f"{store}={count}" for store, count in run["stores"].items())
+        if run["numpy_bytes"]:
+            stores += f" ({run['numpy_bytes'] / 1e6:.2f} MB on disk)"
+        print(f"{run_timestamp:18s} {age:>10s} {'yes' if run['has_state'] else 'no':>6s} "
+              f"{max(run['stores'].values(), default=0):8d}  {stores}")
+    print(f"\nChroma directory: {CHROMA_PERSIST_DIR} ({_directory_size(CHROMA_PERSIST_DIR) / 1e6:.1f} MB)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="List, garbage-collect and compact the vector stores.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("list", help="List indexed runs with size, age and workflow state.")
+    gc_parser = subparsers.add_parser("gc", help="Drop or archive orphaned and expired runs.")
+    gc_parser.add_argument("--min-orphan-age-days", type=float, default=MIN_ORPHAN_AGE_DAYS,
+                           help="Only collect runs without workflow state once they are this old.")
+    gc_parser.add_argument("--retention-days", type=float, default=RETENTION_DAYS,
+                           help="Also collect runs older than this many days.")
+    gc_parser.add_argument("--keep-last", type=int, default=KEEP_LAST,
+                           help="Never collect the most recent N runs.")
+    gc_parser.add_argument("--archive", action="store_true", help=f"Archive runs to {ARCHIVE_DIR} before dropping them.")
+    gc_parser.add_argument("--dry-run", action="store_true", help="Only show what would be collected.")
+    gc_parser.add_argument("--compact", action="store_true", help="Compact the Chroma database afterwards.")
+    subparsers.add_parser("compact", help="VACUUM the Chroma SQLite database and delete orphaned segment directories.")
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        compact()
+        return
+
+    client = get_chroma_client()
+    runs = collect_runs(client)
+    if args.command == "list":
+        print_runs(runs)
+        return
+
+    selected = select_for_gc(runs, args.retention_days, args.keep_last, args.min_orphan_age_days)
+    if not selected:
+        print("Nothing to collect.")
+        return
+    for run_timestamp, reason in sorted(selected.items()):
+        action = "Would drop" if args.dry_run else ("Archiving" if args.archive else "Dropping")
+        print(f"{action} run {run_timestamp} ({reason}): {runs[run_timestamp]['stores']}")
+        if not args.dry_run:
+            drop_run(client, run_timestamp, runs[run_timestamp]["stores"], args.archive)
+    if args.compact and not args.dry_run:
+        del client
+        compact()
+
+
+if __name__ == "__main__":
+    main()
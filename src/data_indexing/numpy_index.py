@@ -0,0 +1,228 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from data_indexing.embeddings import EmbeddingService, get_embedding_service
+
+# --- Configuration ---
+# Per-run exact-search indexes: <dir>/<run_timestamp>/embeddings.npy + chunks.json
+NUMPY_INDEX_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "vector_index"
+EMBEDDINGS_FILE = "embeddings.npy"
+SIDECAR_FILE = "chunks.json"
+QUANTIZATION_PARAMS_FILE = "quantization.npy"
+FULL_PRECISION_FILE = "embeddings.f32.npy"  # Quantized indexes only: float32 vectors for rescoring
+ENCODE_BATCH_SIZE = 256
+# Vector storage: 'none' (float32), 'float16' (half the size) or 'int8' (a quarter; per-dimension
+# scalar quantization). Quantized indexes rank approximately, then rescore the best
+# RESCORE_FACTOR * k candidates with the float32 vectors kept in a memory-mapped file beside
+# the quantized matrix; only the rows of those candidates are read from disk. Quantization
+# therefore saves memory, not disk: with the float32 file, a float16 index takes 1.5x and an
+# int8 index about 1.25x the disk of a float32 one.
+QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none")
+QUANTIZATIONS = ("none", "float16", "int8")
+RESCORE_FACTOR = 4
+SCORE_BLOCK_ROWS = 16384  # Quantized rows are widened to float32 block by block, not all at once
+
+
+def numpy_index_dir(run_timestamp: str) -> Path:
+    return NUMPY_INDEX_DIR / run_timestamp
+
+
+def _matches(metadata: dict, where: Optional[dict]) -> bool:
+    """Evaluates the subset of Chroma `where` filters the pipeline uses: equality and $and."""
+    if not where:
+        return True
+    if "$and" in where:
+        return all(_matches(metadata, clause) for clause in where["$and"])
+    return all(metadata.get(key) == value for key, value in where.items())
+
+
+def quantize(embeddings: np.ndarray, quantization: str) -> tuple:
+    """
+    Converts float32 embeddings to the storage type of a quantization.
+
+    Returns:
+        tuple: (stored array, params). For int8, params is a (2, dim) float32 array of
+            per-dimension scale and offset with x ~= code * scale + offset; otherwise None.
+    """
+    if quantization == "none":
+        return np.ascontiguousarray(embeddings, dtype=np.float32), None
+    if quantization == "float16":
+        return embeddings.astype(np.float16), None
+    if quantization == "int8":
+        if not len(embeddings):
+            return embeddings.astype(np.int8), np.zeros((2, embeddings.shape[1]), dtype=np.float32)
+        low, high = embeddings.min(axis=0), embeddings.max(axis=0)
+        scale = np.maximum((high - low) / 255.0, 1e-12)
+        codes = np.clip(np.round((embeddings - low) / scale) - 128, -128, 127).astype(np.int8)
+        return codes, np.stack([scale, low + 128 * scale]).astype(np.float32)
+    raise ValueError(f"Unknown quantization '{quantization}'. Choose one of: {', '.join(QUANTIZATIONS)}")
+
+
+class NumpyVectorIndex:
+    """
+    Exact top-k search over a run's chunks with a single matrix-vector product.
+
+    A run has at most a few hundred chunks, so brute force beats an HNSW graph and
+    needs no database: the normalized float32 embeddings are a memory-mapped `.npy`
+    file and ids, texts and metadata live in a JSON sidecar. `query` and `get` return
+    the same dicts as a Chroma collection, so the retriever can use either backend.
+    With quantization, the searched vectors are float16 or int8 (see `quantize`) and
+    the float32 vectors stay on disk, memory-mapped, for rescoring the shortlist; the
+    index then needs less memory but more disk than an unquantized one.
+    """
+
+    def __init__(self, index_dir: Path, embeddings: np.ndarray, ids: list, documents: list, metadatas: list,
+                 embedding_service: EmbeddingService = None, quantization: str = "none",
+                 quantization_params: np.ndarray = None, full_embeddings: np.ndarray = None):
+        self.index_dir = Path(index_dir)
+        self.name = f"numpy:{self.index_dir.name}"
+        self.embeddings = embeddings
+        self.ids = ids
+        self.documents = documents
+        self.metadatas = metadatas
+        self._positions = {chunk_id: position for position, chunk_id in enumerate(ids)}
+        self._embedding_service = embedding_service
+        self.quantization = quantization
+        self.quantization_params = quantization_params
+        self.full_embeddings = full_embeddings
+
+    @classmethod
+    def build(cls, index_dir: Path, documents: list, metadatas: list, ids: list,
+              embedding_service: EmbeddingService = None, embeddings: np.ndarray = None,
+              quantization: str = QUANTIZATION) -> "NumpyVectorIndex":
+        """
+        Embeds the chunks (unless `embeddings` are given) and writes the index files atomically.
+        """
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        embedding_service = embedding_service or get_embedding_service()
+        if embeddings is None:
+            batches = [embedding_service.encode(documents[start:start + ENCODE_BATCH_SIZE])
+                       for start in range(0, len(documents), ENCODE_BATCH_SIZE)]
+            embeddings = np.concatenate(batches) if batches else np.zeros((0, embedding_service.dimension()), np.float32)
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        stored, params = quantize(embeddings, quantization)
+
+        tmp_embeddings = index_dir / f"{EMBEDDINGS_FILE}.tmp"
+        with open(tmp_embeddings, 'wb') as f:
+            np.save(f, stored)
+        if params is not None:
+            with open(index_dir / QUANTIZATION_PARAMS_FILE, 'wb') as f:
+                np.save(f, params)
+        full_path = index_dir / FULL_PRECISION_FILE
+        if quantization != "none":
+            tmp_full = index_dir / f"{FULL_PRECISION_FILE}.tmp"
+            with open(tmp_full, 'wb') as f:
+                np.save(f, embeddings)
+            os.replace(tmp_full, full_path)
+        elif full_path.exists():
+            full_path.unlink()
+        tmp_sidecar = index_dir / f"{SIDECAR_FILE}.tmp"
+        with open(tmp_sidecar, 'w', encoding='utf-8') as f:
+            json.dump({"ids": ids, "documents": documents, "metadatas": metadatas, "quantization": quantization}, f)
+        os.replace(tmp_embeddings, index_dir / EMBEDDINGS_FILE)
+        os.replace(tmp_sidecar, index_dir / SIDECAR_FILE)
+        full_embeddings = np.load(full_path, mmap_mode="r") if quantization != "none" else None
+        return cls(index_dir, stored, list(ids), list(documents), list(metadatas), embedding_service,
+                   quantization, params, full_embeddings)
+
+    @classmethod
+    def load(cls, index_dir: Path, embedding_service: EmbeddingService = None) -> "NumpyVectorIndex":
+        """Opens an index; the embeddings are memory-mapped, not read into memory."""
+        index_dir = Path(index_dir)
+        embeddings = np.load(index_dir / EMBEDDINGS_FILE, mmap_mode="r")
+        with open(index_dir / SIDECAR_FILE, 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+        quantization = sidecar.get("quantization", "none")
+        params = np.load(index_dir / QUANTIZATION_PARAMS_FILE) if quantization == "int8" else None
+        full_path = index_dir / FULL_PRECISION_FILE
+        full_embeddings = np.load(full_path, mmap_mode="r") if quantization != "none" and full_path.exists() else None
+        return cls(index_dir, embeddings, sidecar["ids"], sidecar["documents"], sidecar["metadatas"], embedding_service,
+                   quantization, params, full_embeddings)
+
+    @staticmethod
+    def exists(index_dir: Path) -> bool:
+        return (Path(index_dir) / EMBEDDINGS_FILE).exists() and (Path(index_dir) / SIDECAR_FILE).exists()
+
+    def count(self) -> int:
+        return len(self.ids)
+
+    def vector_bytes(self) -> int:
+        """Bytes of the searched vectors (and quantization parameters); the float32 rescoring file is not counted."""
+        params_bytes = self.quantization_params.nbytes if self.quantization_params is not None else 0
+        return int(self.embeddings.nbytes) + params_bytes
+
+    def _scores(self, query_vector: np.ndarray) -> np.ndarray:
+        """Similarity of every stored vector to the query; approximate if the index is quantized."""
+        if self.quantization == "none":
+            return self.embeddings @ query_vector
+        if self.quantization == "int8":
+            scale, offset = self.quantization_params
+            # (code * scale + offset) . q == code . (scale * q) + offset . q
+            query_vector, bias = scale * query_vector, float(offset @ query_vector)
+        else:
+            bias = 0.0
+        scores = np.empty(len(self.ids), dtype=np.float32)
+        for start in range(0, len(self.ids), SCORE_BLOCK_ROWS):
+            block = np.asarray(self.embeddings[start:start + SCORE_BLOCK_ROWS], dtype=np.float32)
+            scores[start:start + SCORE_BLOCK_ROWS] = block @ query_vector + bias
+        return scores
+
+    def _rescore(self, query_vector: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """Exact similarities for a few candidates, read from the memory-mapped float32 vectors."""
+        return np.asarray(self.full_embeddings[positions], dtype=np.float32) @ query_vector
+
+    def query(self, query_texts: list = None, n_results: int = 10, where: dict = None,
+              query_embeddings=None, rescore: bool = True, **_) -> dict:
+        """
+        Chroma-compatible query; distances are cosine distances (1 - similarity).
+        With `rescore=False`, a quantized index ranks by its approximate scores only.
+        """
+        if query_embeddings is None:
+            query_embeddings = (self._embedding_service or get_embedding_service()).encode(list(query_texts))
+        query_embeddings = np.asarray(query_embeddings, dtype=np.float32)
+        candidates = np.array([i for i, metadata in enumerate(self.metadatas) if _matches(metadata, where)], dtype=np.int64) \
+            if where else None
+
+        result = {"ids": [], "documents": [], "metadatas": [], "distances": []}
+        for query_vector in query_embeddings:
+            scores = self._scores(query_vector)
+            if candidates is not None:
+                positions = candidates
+                scores = scores[candidates]
+            else:
+                positions = np.arange(len(scores))
+            k = min(n_results, len(scores))
+            # Quantized scores only preselect; the shortlist is rescored at full precision.
+            rescoring = rescore and self.quantization != "none" and self.full_embeddings is not None
+            shortlist = min(k * RESCORE_FACTOR, len(scores)) if rescoring else k
+            # argpartition finds the top k in linear time; only those k are sorted.
+            top = np.argpartition(-scores, shortlist - 1)[:shortlist] if k else np.array([], dtype=np.int64)
+            # Indexes built before the float32 file existed keep their approximate scores.
+            if rescoring and len(top):
+                scores = scores.astype(np.float32, copy=True)
+                scores[top] = self._rescore(query_vector, positions[top])
+            top = top[np.argsort(-scores[top])][:k]
+            hits = positions[top]
+            result["ids"].append([self.ids[i] for i in hits])
+            result["documents"].append([self.documents[i] for i in hits])
+            result["metadatas"].append([self.metadatas[i] for i in hits])
+            result["distances"].append([float(1 - s) for s in scores[top]])
+        return result
+
+    def get(self, ids: list = None, where: dict = None, include: list = None, limit: int = None, **_) -> dict:
+        """Chroma-compatible get by ids and/or metadata filter."""
+        positions = [self._positions[i] for i in ids if i in self._positions] if ids is not None \
+            else range(len(self.ids))
+        positions = [p for p in positions if _matches(self.metadatas[p], where)][:limit]
+        include = ["documents", "metadatas"] if include is None else include
+        result = {"ids": [self.ids[p] for p in positions]}
+        if "documents" in include:
+            result["documents"] = [self.documents[p] for p in positions]
+        if "metadatas" in include:
+            result["metadatas"] = [self.metadatas[p] for p in positions]
+        return result
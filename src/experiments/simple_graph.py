@@ -1,6 +1,6 @@
 import os
 from langgraph.graph import StateGraph, END
-from langchain_mistralai import ChatMistralAI
+from llm_backends.chat_models import get_chat_model
 from dotenv import load_dotenv
 from typing import List, TypedDict
 from experiments.agent_builders import build_agent
@@ -10,7 +10,7 @@ from experiments.data_models import FinalIdeaList
 load_dotenv()
 
 # Initialize the LLM
-llm = ChatMistralAI(api_key=os.getenv("MISTRAL_API_KEY"), model="mistral-medium-latest", temperature=0.7)
+llm = get_chat_model(model="mistral-medium-latest", temperature=0.7)
 
 # --- State Definition ---
 class SimpleAgentState(TypedDict):
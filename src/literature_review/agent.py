@@ -3,15 +3,74 @@ import time
 from . import tools
 from query_decomp.llm_client import LLMClient
 from query_decomp.config import LLMConfig
+from llm_backends.batch import run_batch_job
 
 # --- Constants ---
 MAX_ITERATIONS = 5
 PAPERS_PER_ITERATION = 10
 GROUNDING_PAPERS_K = 5
 
+def build_scoring_prompt(initial_query: str, papers: list) -> str:
+    """Builds the relevance scoring prompt for a list of papers."""
+    papers_to_score_str = tools.format_papers_for_llm(papers)
+    
+    return f"""
+        You are a research assistant. Your task is to score papers for their relevance to the following research topic:
+        "{initial_query}"
+
+        Score each paper from 1 to 10 based on its direct relevance. A score of 10 means it is extremely relevant.
+        Focus on papers that propose novel methods or findings. Give lower scores to surveys, reviews, or tangentially related work.
+
+        Here are the papers to score:
+        ---
+        {papers_to_score_str}
+        ---
+
+        Provide your response as a single JSON object where keys are paperIds and values are the integer scores.
+        Example: {{"paperId1": 8, "paperId2": 5}}
+        """
+
+def parse_scoring_response(response_str: str) -> dict:
+    """Extracts the {paperId: score} JSON object from a scoring response."""
+    try:
+        # Clean the response to grab only the JSON object
+        json_str = response_str[response_str.find('{'):response_str.rfind('}')+1]
+        return json.loads(json_str)
+    except (json.JSONDecodeError, IndexError):
+        print(f"Warning: Could not decode LLM scoring response: {response_str}")
+        return {}
+
+def batch_score_papers(initial_query: str, papers: list, batch_backend, job_name: str,
+                       papers_per_prompt: int = PAPERS_PER_ITERATION) -> dict:
+    """
+    Scores a large list of papers offline through a provider batch job.
+    Papers are grouped into prompts of `papers_per_prompt` and each response is
+    mapped back to the paperIds of its own group. Returns {paperId: score}.
+    """
+    groups = [papers[i:i + papers_per_prompt] for i in range(0, len(papers), papers_per_prompt)]
+    batch_requests = [
+        {"custom_id": f"group_{i}", "prompt": build_scoring_prompt(initial_query, group)}
+        for i, group in enumerate(groups)
+    ]
+    responses = run_batch_job(batch_requests, batch_backend, job_name=job_name)
+
+    scores = {}
+    for i, group in enumerate(groups):
+        response_str = responses.get(f"group_{i}")
+        if not response_str:
+            continue
+        group_scores = parse_scoring_response(response_str)
+        for paper in group:
+            paper_id = paper.get("paperId")
+            if paper_id in group_scores:
+                scores[paper_id] = group_scores[paper_id]
+    return scores
+
 class LitReviewAgent:
-    def __init__(self, initial_query: str):
+    def __init__(self, initial_query: str, batch_backend=None):
         self.initial_query = initial_query
+        # If set, papers are not scored during the search but all at once in one batch job afterwards.
+        self.batch_backend = batch_backend
         self.paper_bank = {}  # Using a dict for easy deduplication by paperId
         self.llm_client = LLMClient(LLMConfig())
         self.past_queries = []
@@ -57,32 +116,9 @@ class LitReviewAgent:
         if not new_papers:
             return {}
             
-        papers_to_score_str = tools.format_papers_for_llm(new_papers)
-        
-        prompt = f"""
-        You are a research assistant. Your task is to score papers for their relevance to the following research topic:
-        "{self.initial_query}"
-
-        Score each paper from 1 to 10 based on its direct relevance. A score of 10 means it is extremely relevant.
-        Focus on papers that propose novel methods or findings. Give lower scores to surveys, reviews, or tangentially related work.
-
-        Here are the papers to score:
-        ---
-        {papers_to_score_str}
-        ---
-
-        Provide your response as a single JSON object where keys are paperIds and values are the integer scores.
-        Example: {{"paperId1": 8, "paperId2": 5}}
-        """
+        prompt = build_scoring_prompt(self.initial_query, new_papers)
         response_str = self.llm_client.generate_response(prompt)
-        
-        try:
-            # Clean the response to grab only the JSON object
-            json_str = response_str[response_str.find('{'):response_str.rfind('}')+1]
-            return json.loads(json_str)
-        except (json.JSONDecodeError, IndexError):
-            print(f"Warning: Could not decode LLM scoring response: {response_str}")
-            return {}
+        return parse_scoring_response(response_str)
 
     def _execute_query(self, query: str) -> list:
         """Parses and executes a tool function call, ignoring LLM thoughts."""
@@ -141,7 +177,8 @@ class LitReviewAgent:
                 continue
                 
             print(f"Found {len(unseen_papers)} new, relevant papers to score.")
-            scores = self._score_papers_with_llm(unseen_papers)
+            # In batch mode scoring waits until the search is over, so no iteration blocks on a job.
+            scores = {} if self.batch_backend is not None else self._score_papers_with_llm(unseen_papers)
 
             # Add scored papers to the bank
             for paper in unseen_papers:
@@ -155,6 +192,13 @@ class LitReviewAgent:
             current_query = self._get_next_query_from_llm()
             time.sleep(5) # Small delay to avoid API rate limits
 
+        if self.batch_backend is not None and self.paper_bank:
+            print(f"Scoring {len(self.paper_bank)} papers in one batch job...")
+            scores = batch_score_papers(self.initial_query, list(self.paper_bank.values()), self.batch_backend,
+                                        job_name=f"lit_review_scoring_{int(time.time())}")
+            for paper_id, paper in self.paper_bank.items():
+                paper['score'] = scores.get(paper_id, 0)
+
         print("\n--- Literature Review Finished ---")
         # Return the final, sorted list of papers
         final_list = sorted(self.paper_bank.values(), key=lambda p: p.get("score", 0), reverse=True)
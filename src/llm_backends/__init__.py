@@ -0,0 +1,2 @@
+# This file can be left empty.
+# It tells Python that 'llm_backends' is a package.
@@ -0,0 +1,288 @@
+import json
+import os
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import requests
+from dotenv import load_dotenv
+
+# --- Configuration ---
+BATCH_JOBS_DIR = Path(__file__).resolve().parent.parent.parent / "results" / "batch_jobs"
+DEFAULT_BATCH_MODEL = "mistral-medium-latest"
+DEFAULT_POLL_INTERVAL = 30  # seconds between status checks
+
+# Terminal job states, shared by all backends
+JOB_SUCCEEDED = "SUCCESS"
+JOB_FAILED = "FAILED"
+TERMINAL_STATES = {JOB_SUCCEEDED, JOB_FAILED, "TIMEOUT_EXCEEDED", "CANCELLED"}
+
+
+# --- Job File Format ---
+
+def write_batch_job_file(batch_requests: List[dict], job_path: Path, temperature: float = 0.0, max_tokens: Optional[int] = None) -> Path:
+    """
+    Serializes prompts into a JSONL batch job file.
+
+    Args:
+        batch_requests (list): Dicts with a unique 'custom_id' and a 'prompt' string.
+        job_path (Path): Where to write the JSONL file.
+        temperature (float): Sampling temperature applied to every request.
+        max_tokens (int, optional): Completion token limit applied to every request.
+    """
+    job_path = Path(job_path)
+    job_path.parent.mkdir(parents=True, exist_ok=True)
+
+    seen_ids = set()
+    with open(job_path, 'w', encoding='utf-8') as f:
+        for request in batch_requests:
+            custom_id = request["custom_id"]
+            if custom_id in seen_ids:
+                raise ValueError(f"Duplicate custom_id '{custom_id}' in batch job.")
+            seen_ids.add(custom_id)
+
+            body = {
+                "messages": [{"role": "user", "content": request["prompt"]}],
+                "temperature": temperature,
+            }
+            if max_tokens is not None:
+                body["max_tokens"] = max_tokens
+            f.write(json.dumps({"custom_id": custom_id, "body": body}) + "\n")
+
+    return job_path
+
+
+def read_batch_results(results_path: Path) -> Dict[str, Optional[str]]:
+    """
+    Parses a JSONL results file into a mapping of custom_id to response text.
+    Requests that failed on the provider side map to None.
+    """
+    results = {}
+    with open(results_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            custom_id = record.get("custom_id")
+            response = record.get("response") or {}
+            body = response.get("body") or {}
+            choices = body.get("choices") or []
+
+            if record.get("error") or response.get("status_code", 200) >= 400 or not choices:
+                print(f"    [WARNING] Batch request '{custom_id}' failed: {record.get('error') or response.get('status_code')}")
+                results[custom_id] = None
+            else:
+                results[custom_id] = choices[0].get("message", {}).get("content")
+    return results
+
+
+# --- Backends ---
+
+class BatchBackend:
+    """
+    Interface for a provider batch API.
+
+    A backend accepts a JSONL job file, reports the job status and, once the job
+    has succeeded, downloads a JSONL results file in the same format that
+    `read_batch_results` understands.
+    """
+
+    def submit(self, job_path: Path) -> str:
+        """Submits a job file and returns the provider's job id."""
+        raise NotImplementedError
+
+    def status(self, job_id: str) -> str:
+        """Returns the current job status, e.g. 'QUEUED', 'RUNNING' or 'SUCCESS'."""
+        raise NotImplementedError
+
+    def download_results(self, job_id: str, output_path: Path) -> Path:
+        """Writes the results of a finished job to output_path."""
+        raise NotImplementedError
+
+
+class LocalFileBatchBackend(BatchBackend):
+    """
+    A file-based stand-in for a provider batch API, for tests and dry runs.
+
+    Jobs are copied into a local work directory and executed on the first
+    status poll by calling `responder` once per request body. The responder
+    receives the request body dict (with 'messages') and returns the text reply.
+    """
+
+    def __init__(self, responder: Callable[[dict], str], work_dir: Path = BATCH_JOBS_DIR / "local_backend"):
+        self.responder = responder
+        self.work_dir = Path(work_dir)
+
+    def _job_dir(self, job_id: str) -> Path:
+        return self.work_dir / job_id
+
+    def submit(self, job_path: Path) -> str:
+        job_id = f"local_{uuid.uuid4().hex[:12]}"
+        job_dir = self._job_dir(job_id)
+        job_dir.mkdir(parents=True, exist_ok=True)
+        (job_dir / "input.jsonl").write_bytes(Path(job_path).read_bytes())
+        (job_dir / "status").write_text("QUEUED")
+        return job_id
+
+    def status(self, job_id: str) -> str:
+        job_dir = self._job_dir(job_id)
+        status_path = job_dir / "status"
+        if not status_path.exists():
+            raise ValueError(f"Unknown local batch job '{job_id}'.")
+
+        current = status_path.read_text().strip()
+        if current == "QUEUED":
+            self._execute(job_dir)
+            current = status_path.read_text().strip()
+        return current
+
+    def _execute(self, job_dir: Path) -> None:
+        (job_dir / "status").write_text("RUNNING")
+        with open(job_dir / "input.jsonl", 'r', encoding='utf-8') as f_in, \
+                open(job_dir / "output.jsonl", 'w', encoding='utf-8') as f_out:
+            for line in f_in:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                try:
+                    content = self.responder(request["body"])
+                    record = {
+                        "custom_id": request["custom_id"],
+                        "response": {
+                            "status_code": 200,
+                            "body": {"choices": [{"index": 0, "message": {"role": "assistant", "content": content}}]},
+                        },
+                        "error": None,
+                    }
+                except Exception as e:
+                    record = {"custom_id": request["custom_id"], "response": None, "error": str(e)}
+                f_out.write(json.dumps(record) + "\n")
+        (job_dir / "status").write_text(JOB_SUCCEEDED)
+
+    def download_results(self, job_id: str, output_path: Path) -> Path:
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes((self._job_dir(job_id) / "output.jsonl").read_bytes())
+        return output_path
+
+
+class MistralBatchBackend(BatchBackend):
+    """Submits jobs to the Mistral batch API (file upload + batch job)."""
+
+    API_URL = "https://api.mistral.ai/v1"
+
+    def __init__(self, model: str = DEFAULT_BATCH_MODEL, api_key: Optional[str] = None, timeout_hours: int = 24):
+        load_dotenv()
+        self.model = model
+        self.api_key = api_key or os.getenv("MISTRAL_API_KEY")
+        self.timeout_hours = timeout_hours
+        if not self.api_key:
+            raise ValueError("MISTRAL_API_KEY not found. Please set it in your environment variables or a .env file.")
+        self.session = requests.Session()
+        self.session.headers.update({"Authorization": f"Bearer {self.api_key}"})
+
+    def submit(self, job_path: Path) -> str:
+        job_path = Path(job_path)
+        with open(job_path, 'rb') as f:
+            upload = self.session.post(
+                f"{self.API_URL}/files",
+                files={"file": (job_path.name, f)},
+                data={"purpose": "batch"},
+                timeout=120,
+            )
+        upload.raise_for_status()
+
+        job = self.session.post(
+            f"{self.API_URL}/batch/jobs",
+            json={
+                "input_files": [upload.json()["id"]],
+                "model": self.model,
+                "endpoint": "/v1/chat/completions",
+                "timeout_hours": self.timeout_hours,
+            },
+            timeout=60,
+        )
+        job.raise_for_status()
+        return job.json()["id"]
+
+    def _get_job(self, job_id: str) -> dict:
+        response = self.session.get(f"{self.API_URL}/batch/jobs/{job_id}", timeout=60)
+        response.raise_for_status()
+        return response.json()
+
+    def status(self, job_id: str) -> str:
+        return self._get_job(job_id).get("status", "UNKNOWN")
+
+    def download_results(self, job_id: str, output_path: Path) -> Path:
+        output_file_id = self._get_job(job_id).get("output_file")
+        if not output_file_id:
+            raise RuntimeError(f"Batch job '{job_id}' has no output file.")
+
+        response = self.session.get(f"{self.API_URL}/files/{output_file_id}/content", stream=True, timeout=120)
+        response.raise_for_status()
+
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'wb') as f:
+            for chunk in response.iter_content(chunk_size=65536):
+                f.write(chunk)
+        return output_path
+
+
+def chat_model_responder(llm_client) -> Callable[[dict], str]:
+    """Wraps a LangChain chat model so it can serve a LocalFileBatchBackend."""
+    from langchain_core.messages import HumanMessage
+
+    def respond(body: dict) -> str:
+        messages = [HumanMessage(content=m["content"]) for m in body["messages"]]
+        return llm_client.invoke(messages).content
+
+    return respond
+
+
+# --- Job Runner ---
+
+def run_batch_job(batch_requests: List[dict], backend: BatchBackend, job_name: str,
+                  job_dir: Path = BATCH_JOBS_DIR, poll_interval: float = DEFAULT_POLL_INTERVAL,
+                  timeout: Optional[float] = None, temperature: float = 0.0) -> Dict[str, Optional[str]]:
+    """
+    Serializes, submits and polls a batch job, then returns responses keyed by custom_id.
+
+    Args:
+        batch_requests (list): Dicts with 'custom_id' and 'prompt'.
+        backend (BatchBackend): The backend that executes the job.
+        job_name (str): Used to name the job and results files in job_dir.
+        poll_interval (float): Seconds to wait between status checks.
+        timeout (float, optional): Give up after this many seconds of polling.
+    """
+    if not batch_requests:
+        return {}
+
+    job_dir = Path(job_dir)
+    job_path = write_batch_job_file(batch_requests, job_dir / f"{job_name}.jsonl", temperature=temperature)
+    job_id = backend.submit(job_path)
+    print(f"    -> Submitted batch job '{job_id}' with {len(batch_requests)} requests ({job_path.name}).")
+
+    start = time.time()
+    while True:
+        status = backend.status(job_id)
+        if status in TERMINAL_STATES:
+            break
+        if timeout is not None and time.time() - start > timeout:
+            raise TimeoutError(f"Batch job '{job_id}' did not finish within {timeout} seconds (last status: {status}).")
+        print(f"    -> Batch job '{job_id}' status: {status}. Waiting {poll_interval}s...")
+        time.sleep(poll_interval)
+
+    if status != JOB_SUCCEEDED:
+        raise RuntimeError(f"Batch job '{job_id}' finished with status '{status}'.")
+
+    results_path = backend.download_results(job_id, job_dir / f"{job_name}_results.jsonl")
+    results = read_batch_results(results_path)
+
+    missing = [r["custom_id"] for r in batch_requests if r["custom_id"] not in results]
+    for custom_id in missing:
+        results[custom_id] = None
+    print(f"    -> Batch job '{job_id}' finished in {time.time() - start:.1f}s. "
+          f"{sum(v is not None for v in results.values())}/{len(batch_requests)} responses received.")
+    return results
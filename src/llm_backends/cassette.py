@@ -0,0 +1,187 @@
+import hashlib
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import Runnable
+
+# Cassette modes
+RECORD = "record"
+REPLAY = "replay"
+
+# Replay latency modes
+LATENCY_ZERO = "zero"
+LATENCY_RECORDED = "recorded"
+
+
+class CassetteMissError(LookupError):
+    """Raised in replay mode when a request has no matching recorded interaction."""
+
+
+def _to_messages(model_input: Any) -> List[BaseMessage]:
+    """Normalizes the input of a chat model call (prompt value, messages or string) into messages."""
+    if hasattr(model_input, "to_messages"):
+        return model_input.to_messages()
+    if isinstance(model_input, str):
+        return [HumanMessage(content=model_input)]
+    return list(model_input)
+
+
+def _serialize_messages(messages: List[BaseMessage]) -> list:
+    return [{"type": m.type, "content": m.content} for m in messages]
+
+
+def prompt_hash(model_params: dict, kind: str, schema_name: Optional[str], messages: List[BaseMessage]) -> str:
+    """Stable hash of everything that determines an LLM response."""
+    payload = json.dumps(
+        {"params": model_params, "kind": kind, "schema": schema_name, "messages": _serialize_messages(messages)},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCassette:
+    """
+    Records every LLM request/response of a run to a JSONL file and replays them later.
+
+    Interactions are keyed by call order and prompt hash. On replay the entry at
+    the current position is used when its hash matches; otherwise the first unused
+    entry with the same hash is used, so runs with concurrent calls (and therefore
+    a slightly different call order) still replay exactly.
+    """
+
+    def __init__(self, path: Path, mode: str = REPLAY, replay_latency: str = LATENCY_ZERO):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode '{mode}'. Use '{RECORD}' or '{REPLAY}'.")
+        if replay_latency not in (LATENCY_ZERO, LATENCY_RECORDED):
+            raise ValueError(f"Unknown replay latency '{replay_latency}'. Use '{LATENCY_ZERO}' or '{LATENCY_RECORDED}'.")
+
+        self.path = Path(path)
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self._lock = threading.Lock()
+        self._entries: List[dict] = []
+        self._used: List[bool] = []
+        self._cursor = 0
+
+        if mode == RECORD:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            # Start a fresh recording; entries are appended as they happen so a crash keeps what was recorded.
+            self.path.write_text("")
+            print(f"LLM cassette: recording to {self.path}")
+        else:
+            if not self.path.exists():
+                raise FileNotFoundError(f"LLM cassette '{self.path}' not found. Record one first.")
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self._entries = [json.loads(line) for line in f if line.strip()]
+            self._used = [False] * len(self._entries)
+            print(f"LLM cassette: replaying {len(self._entries)} interactions from {self.path} (latency: {replay_latency})")
+
+    def record(self, key: str, kind: str, schema_name: Optional[str], messages: List[BaseMessage], output: Any, latency: float) -> None:
+        """Appends one interaction to the cassette file."""
+        with self._lock:
+            entry = {
+                "index": len(self._entries),
+                "prompt_hash": key,
+                "kind": kind,
+                "schema": schema_name,
+                "messages": _serialize_messages(messages),
+                "output": output,
+                "latency": round(latency, 4),
+            }
+            self._entries.append(entry)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, default=str) + "\n")
+
+    def replay(self, key: str) -> Any:
+        """Returns the recorded output for a request, honoring the configured replay latency."""
+        with self._lock:
+            position = None
+            if self._cursor < len(self._entries) and not self._used[self._cursor] \
+                    and self._entries[self._cursor]["prompt_hash"] == key:
+                position = self._cursor
+            else:
+                position = next(
+                    (i for i, entry in enumerate(self._entries) if not self._used[i] and entry["prompt_hash"] == key),
+                    None,
+                )
+            if position is None:
+                raise CassetteMissError(
+                    f"No recorded LLM interaction for prompt hash {key[:12]} at call #{self._cursor}. "
+                    f"The cassette '{self.path}' does not match this run."
+                )
+
+            self._used[position] = True
+            while self._cursor < len(self._entries) and self._used[self._cursor]:
+                self._cursor += 1
+            entry = self._entries[position]
+
+        if self.replay_latency == LATENCY_RECORDED:
+            time.sleep(entry.get("latency", 0))
+        return entry["output"]
+
+    @property
+    def unused_count(self) -> int:
+        """Number of recorded interactions that were not replayed (useful as a regression check)."""
+        with self._lock:
+            return self._used.count(False)
+
+
+class CassetteChatModel(Runnable):
+    """
+    A chat model wrapper that records to or replays from an LLMCassette.
+
+    Supports plain calls (`prompt | llm`) and `with_structured_output`, which is
+    what `build_structured_agent` and `build_raw_agent` use. In replay mode no
+    inner model is needed and no network request is made.
+    """
+
+    def __init__(self, cassette: LLMCassette, model_params: dict, inner: Optional[Runnable] = None):
+        if cassette.mode == RECORD and inner is None:
+            raise ValueError("A cassette in record mode needs an inner chat model to call.")
+        self.cassette = cassette
+        self.model_params = model_params
+        self.inner = inner
+
+    def invoke(self, input: Any, config=None, **kwargs) -> AIMessage:
+        messages = _to_messages(input)
+        key = prompt_hash(self.model_params, "chat", None, messages)
+
+        if self.cassette.mode == REPLAY:
+            return AIMessage(content=self.cassette.replay(key))
+
+        start = time.time()
+        response = self.inner.invoke(input, config, **kwargs)
+        self.cassette.record(key, "chat", None, messages, response.content, time.time() - start)
+        return response
+
+    def with_structured_output(self, schema, **kwargs) -> Runnable:
+        return _CassetteStructuredRunnable(self, schema, **kwargs)
+
+
+class _CassetteStructuredRunnable(Runnable):
+    """The structured-output counterpart of CassetteChatModel; stores the parsed model as JSON."""
+
+    def __init__(self, parent: CassetteChatModel, schema, **kwargs):
+        self.parent = parent
+        self.schema = schema
+        self.inner = parent.inner.with_structured_output(schema, **kwargs) if parent.inner is not None else None
+
+    def invoke(self, input: Any, config=None, **kwargs):
+        messages = _to_messages(input)
+        cassette = self.parent.cassette
+        key = prompt_hash(self.parent.model_params, "structured", self.schema.__name__, messages)
+
+        if cassette.mode == REPLAY:
+            data = cassette.replay(key)
+            return self.schema(**data) if data is not None else None
+
+        start = time.time()
+        result = self.inner.invoke(input, config, **kwargs)
+        data = result.dict() if result is not None else None
+        cassette.record(key, "structured", self.schema.__name__, messages, data, time.time() - start)
+        return result
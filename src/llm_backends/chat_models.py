@@ -0,0 +1,103 @@
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from .cassette import LLMCassette, CassetteChatModel, RECORD, REPLAY, LATENCY_ZERO
+from .fake_chat_model import FakeChatModel
+
+# --- Configuration ---
+# The cassette is controlled through the environment so that it also applies to the
+# module-level models created at import time (e.g. in agentic_workflow/graph.py):
+#   LLM_CASSETTE_MODE     'record' or 'replay' (unset = normal operation)
+#   LLM_CASSETTE_PATH     path of the JSONL cassette file
+#   LLM_CASSETTE_LATENCY  'zero' (default) or 'recorded' when replaying
+# A deterministic fake model (for load testing) is enabled the same way:
+#   LLM_FAKE_MODEL=1 plus the optional LLM_FAKE_SEED, LLM_FAKE_BASE_LATENCY,
+#   LLM_FAKE_PER_TOKEN_LATENCY, LLM_FAKE_ERROR_RATE, LLM_FAKE_RPM
+load_dotenv()
+DEFAULT_CASSETTE_PATH = Path(__file__).resolve().parent.parent.parent / "results" / "llm_cassettes" / "cassette.jsonl"
+
+_active_cassette: Optional[LLMCassette] = None
+_cassette_lock = threading.Lock()
+_fake_model: Optional[FakeChatModel] = None
+
+
+def get_cassette_mode() -> Optional[str]:
+    """Returns 'record', 'replay' or None if no cassette is configured."""
+    mode = os.getenv("LLM_CASSETTE_MODE", "").strip().lower()
+    return mode if mode in (RECORD, REPLAY) else None
+
+
+def fake_model_enabled() -> bool:
+    """True when LLM_FAKE_MODEL is set to a truthy value."""
+    return os.getenv("LLM_FAKE_MODEL", "").strip().lower() in ("1", "true", "yes")
+
+
+def offline_mode_enabled() -> bool:
+    """True when LLM calls are served without contacting the provider, so no API key is needed."""
+    return get_cassette_mode() == REPLAY or fake_model_enabled()
+
+
+def get_fake_model() -> FakeChatModel:
+    """Returns the process-wide fake model, configured from the LLM_FAKE_* environment variables.
+    It is shared by all callers so that its rate limit and stats are provider-wide."""
+    global _fake_model
+    with _cassette_lock:
+        if _fake_model is None:
+            rpm = os.getenv("LLM_FAKE_RPM")
+            _fake_model = FakeChatModel(
+                seed=int(os.getenv("LLM_FAKE_SEED", "0")),
+                base_latency=float(os.getenv("LLM_FAKE_BASE_LATENCY", "0")),
+                per_token_latency=float(os.getenv("LLM_FAKE_PER_TOKEN_LATENCY", "0")),
+                error_rate=float(os.getenv("LLM_FAKE_ERROR_RATE", "0")),
+                requests_per_minute=int(rpm) if rpm else None,
+            )
+        return _fake_model
+
+
+def get_active_cassette() -> Optional[LLMCassette]:
+    """Returns the process-wide cassette, creating it on first use. All models share one cassette."""
+    global _active_cassette
+    mode = get_cassette_mode()
+    if mode is None:
+        return None
+
+    with _cassette_lock:
+        if _active_cassette is None:
+            path = Path(os.getenv("LLM_CASSETTE_PATH") or DEFAULT_CASSETTE_PATH)
+            latency = os.getenv("LLM_CASSETTE_LATENCY", LATENCY_ZERO).strip().lower()
+            _active_cassette = LLMCassette(path, mode=mode, replay_latency=latency)
+        return _active_cassette
+
+
+def get_chat_model(model: str = "mistral-medium-latest", temperature: float = 0.7,
+                   max_tokens: Optional[int] = None, api_key: Optional[str] = None):
+    """
+    Creates the chat model used throughout the pipeline.
+
+    Returns a plain ChatMistralAI unless a cassette is configured, in which case
+    the model is wrapped so every request/response is recorded or replayed. With
+    LLM_FAKE_MODEL set, the shared FakeChatModel takes the place of ChatMistralAI.
+    """
+    model_params = {"model": model, "temperature": temperature, "max_tokens": max_tokens}
+    cassette = get_active_cassette()
+
+    if cassette is not None and cassette.mode == REPLAY:
+        return CassetteChatModel(cassette, model_params)
+
+    if fake_model_enabled():
+        llm = get_fake_model()
+    else:
+        from langchain_mistralai import ChatMistralAI
+
+        kwargs = {"api_key": api_key or os.getenv("MISTRAL_API_KEY"), "model": model, "temperature": temperature}
+        if max_tokens is not None:
+            kwargs["max_tokens"] = max_tokens
+        llm = ChatMistralAI(**kwargs)
+
+    if cassette is not None:
+        return CassetteChatModel(cassette, model_params, inner=llm)
+    return llm
@@ -0,0 +1,190 @@
+import hashlib
+import random
+import threading
+import time
+import typing
+from collections import deque
+from typing import Any, Callable, Optional
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel
+
+from .cassette import _to_messages
+
+# Vocabulary for synthetic text. Deterministic content only needs to look like prose.
+_WORDS = (
+    "agent model retrieval knowledge graph novel framework hypothesis evaluation dataset "
+    "semantic embedding literature scientific reasoning multi debate critique synthesis "
+    "benchmark transformer protein climate causal inference scalable robust adaptive sparse "
+    "representation learning uncertainty simulation discovery pipeline ontology citation"
+).split()
+
+
+class FakeLLMError(Exception):
+    """A simulated provider error."""
+
+
+class FakeRateLimitError(FakeLLMError):
+    """A simulated HTTP 429 from the provider."""
+
+
+def _stable_seed(*parts: Any) -> int:
+    digest = hashlib.sha256("|".join(str(p) for p in parts).encode("utf-8")).hexdigest()
+    return int(digest[:16], 16)
+
+
+def _prompt_text(model_input: Any) -> str:
+    return "\n".join(str(m.content) for m in _to_messages(model_input))
+
+
+class FakeChatModel(Runnable):
+    """
+    A deterministic, offline drop-in for ChatMistralAI for load testing.
+
+    Plain calls return synthetic prose and `with_structured_output(schema)` returns
+    a schema-valid instance of any of the pydantic models used by the graphs. The
+    same prompt always yields the same content. Latency, error rate and a
+    provider-wide requests-per-minute limit are configurable so that schedulers can
+    be exercised at high concurrency without paying for tokens.
+
+    Args:
+        seed (int): Base seed for content and error sampling.
+        base_latency (float): Fixed seconds added to every call (time to first token).
+        per_token_latency (float): Seconds per generated token.
+        error_rate (float): Probability in [0, 1] that a call raises FakeLLMError.
+        requests_per_minute (int, optional): Calls beyond this rate raise FakeRateLimitError,
+            or block until a slot frees up when `wait_on_rate_limit` is True.
+        list_length (int): Number of items generated for list fields.
+        text_words (int): Length of plain text responses, in words.
+        text_factory (callable, optional): Overrides plain responses; receives the prompt text.
+    """
+
+    def __init__(self, seed: int = 0, base_latency: float = 0.0, per_token_latency: float = 0.0,
+                 error_rate: float = 0.0, requests_per_minute: Optional[int] = None,
+                 wait_on_rate_limit: bool = False, list_length: int = 3, text_words: int = 60,
+                 text_factory: Optional[Callable[[str], str]] = None):
+        self.seed = seed
+        self.base_latency = base_latency
+        self.per_token_latency = per_token_latency
+        self.error_rate = error_rate
+        self.requests_per_minute = requests_per_minute
+        self.wait_on_rate_limit = wait_on_rate_limit
+        self.list_length = list_length
+        self.text_words = text_words
+        self.text_factory = text_factory
+
+        self._lock = threading.Lock()
+        self._error_rng = random.Random(seed)
+        self._request_times = deque()
+        self.stats = {"calls": 0, "errors": 0, "rate_limited": 0, "output_tokens": 0, "busy_seconds": 0.0}
+
+    # --- Simulated provider behaviour ---
+
+    def _admit(self) -> None:
+        """Applies the rate limit and error rate for one incoming request."""
+        with self._lock:
+            self.stats["calls"] += 1
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if self.requests_per_minute:
+                    while self._request_times and now - self._request_times[0] > 60:
+                        self._request_times.popleft()
+                    if len(self._request_times) >= self.requests_per_minute:
+                        self.stats["rate_limited"] += 1
+                        if not self.wait_on_rate_limit:
+                            raise FakeRateLimitError(f"Rate limit of {self.requests_per_minute} requests/minute exceeded.")
+                        wait = 60 - (now - self._request_times[0])
+                    else:
+                        self._request_times.append(now)
+                        wait = None
+                else:
+                    wait = None
+
+                if wait is None:
+                    if self.error_rate and self._error_rng.random() < self.error_rate:
+                        self.stats["errors"] += 1
+                        raise FakeLLMError("Simulated provider error.")
+                    return
+            time.sleep(max(wait, 0.01))
+
+    def _simulate_generation(self, num_tokens: int) -> None:
+        delay = self.base_latency + num_tokens * self.per_token_latency
+        with self._lock:
+            self.stats["output_tokens"] += num_tokens
+            self.stats["busy_seconds"] += delay
+        if delay > 0:
+            time.sleep(delay)
+
+    # --- Synthetic content ---
+
+    def _words(self, rng: random.Random, count: int) -> str:
+        return " ".join(rng.choice(_WORDS) for _ in range(count))
+
+    def _fake_value(self, annotation: Any, rng: random.Random, field_name: str) -> Any:
+        origin = typing.get_origin(annotation)
+        args = typing.get_args(annotation)
+
+        if origin is typing.Union:
+            non_none = [a for a in args if a is not type(None)]
+            return self._fake_value(non_none[0], rng, field_name) if non_none else None
+        if origin in (list, typing.List) or annotation is list:
+            item_type = args[0] if args else str
+            return [self._fake_value(item_type, rng, field_name) for _ in range(self.list_length)]
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+            return self._fake_model_data(annotation, rng)
+        if annotation is bool:
+            return rng.random() < 0.5
+        if annotation is int:
+            return rng.randint(1, 10)
+        if annotation is float:
+            return round(rng.random(), 4)
+
+        # Strings: short for names/titles, longer for everything else.
+        length = 6 if any(key in field_name for key in ("name", "title")) else 40
+        return f"{field_name.replace('_', ' ').capitalize()}: {self._words(rng, length)}"
+
+    def _fake_model_data(self, schema, rng: random.Random) -> dict:
+        # pydantic v2 exposes `model_fields`, v1 exposes `__fields__`.
+        if hasattr(schema, "model_fields"):
+            fields = {name: field.annotation for name, field in schema.model_fields.items()}
+        else:
+            fields = {name: field.outer_type_ for name, field in schema.__fields__.items()}
+        return {name: self._fake_value(annotation, rng, name) for name, annotation in fields.items()}
+
+    def fake_structured(self, schema, prompt_text: str):
+        """Builds a deterministic, schema-valid instance of `schema` for a prompt."""
+        rng = random.Random(_stable_seed(self.seed, schema.__name__, prompt_text))
+        return schema(**self._fake_model_data(schema, rng))
+
+    # --- Runnable interface ---
+
+    def invoke(self, input: Any, config=None, **kwargs) -> AIMessage:
+        prompt_text = _prompt_text(input)
+        self._admit()
+        if self.text_factory is not None:
+            content = self.text_factory(prompt_text)
+        else:
+            rng = random.Random(_stable_seed(self.seed, "chat", prompt_text))
+            content = self._words(rng, self.text_words)
+        self._simulate_generation(len(content.split()))
+        return AIMessage(content=content)
+
+    def with_structured_output(self, schema, **kwargs) -> Runnable:
+        return _FakeStructuredRunnable(self, schema)
+
+
+class _FakeStructuredRunnable(Runnable):
+    """Structured-output view of a FakeChatModel for one pydantic schema."""
+
+    def __init__(self, parent: FakeChatModel, schema):
+        self.parent = parent
+        self.schema = schema
+
+    def invoke(self, input: Any, config=None, **kwargs):
+        prompt_text = _prompt_text(input)
+        self.parent._admit()
+        result = self.parent.fake_structured(self.schema, prompt_text)
+        self.parent._simulate_generation(len(str(result.dict()).split()))
+        return result
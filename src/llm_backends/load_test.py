@@ -0,0 +1,239 @@
+"""
+Load test for the LangGraph workflows using the deterministic FakeChatModel.
+
+Runs many graph invocations concurrently against the fake model, so scheduler
+bottlenecks show up on a laptop without spending real tokens. The debate graph
+retrieves from a real index: a small synthetic fixture run is indexed into Chroma
+(with its BM25 index) through the regular ingestion path and removed afterwards,
+or an existing run is used with --rag-run. --no-rag skips retrieval, and the report
+records which of these applied. Example:
+
+    python src/llm_backends/load_test.py --graph debate --runs 50 --concurrency 16 \\
+        --per-token-latency 0.002 --error-rate 0.02 --rpm 600
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+
+src_path = Path(__file__).resolve().parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+GRAPH_CHOICES = ("debate", "simple", "zeroshot")
+FIXTURE_RUN = "loadtest_fixture"
+FIXTURE_PAPERS = 20
+FIXTURE_SENTENCES = 12
+FIXTURE_VOCABULARY = (
+    "agent", "debate", "retrieval", "hypothesis", "experiment", "benchmark", "language", "model", "graph",
+    "reasoning", "planning", "tool", "memory", "evaluation", "novelty", "citation", "dataset", "protein",
+    "chemistry", "simulation", "critique", "consensus", "literature", "discovery", "uncertainty", "robustness",
+)
+
+
+def fixture_papers(num_papers: int = FIXTURE_PAPERS, seed: int = 0) -> list:
+    """Synthetic report entries with abstracts long enough to give several chunks each."""
+    rng = random.Random(seed)
+    papers = []
+    for i in range(num_papers):
+        topic = rng.sample(FIXTURE_VOCABULARY, 3)
+        sentences = [" ".join(rng.choices(topic + list(FIXTURE_VOCABULARY), k=18)).capitalize() + "."
+                     for _ in range(FIXTURE_SENTENCES)]
+        papers.append({"paperId": f"loadtest_paper_{i}", "year": 2024, "abstract": " ".join(sentences),
+                       "title": f"{' '.join(topic).title()} for Scientific Discovery"})
+    return papers
+
+
+def build_fixture_index(run_timestamp: str = FIXTURE_RUN, seed: int = 0) -> int:
+    """
+    Indexes the fixture papers for a run into Chroma and builds its BM25 index, the way
+    `index_run` does. No processed PDFs exist, so papers are chunked from their abstracts.
+    Returns the number of chunks.
+    """
+    from data_indexing.indexer import (
+        USE_SHARED_COLLECTION, effective_batch_size, get_chroma_client, get_run_collection, ingest_chunk_stream,
+        iter_run_chunks, run_flag,
+    )
+    from data_indexing.lexical_index import build_run_bm25_index
+
+    client = get_chroma_client()
+    collection = get_run_collection(run_timestamp, client)
+    processed_papers_dir = src_path.parent / "data" / "processed_papers" / f"lit_review_papers_{run_timestamp}"
+    chunk_stream = iter_run_chunks(fixture_papers(seed=seed), processed_papers_dir, run_timestamp)
+    stats = ingest_chunk_stream(collection, chunk_stream, batch_size=effective_batch_size(client),
+                                run_timestamp=run_timestamp if USE_SHARED_COLLECTION else None)
+    build_run_bm25_index(collection, run_timestamp,
+                         where={run_flag(run_timestamp): True} if USE_SHARED_COLLECTION else None)
+    return stats["chunks"]
+
+
+def remove_fixture_index(run_timestamp: str = FIXTURE_RUN) -> None:
+    """Drops the fixture run from Chroma and deletes its BM25 index."""
+    from data_indexing.indexer import (
+        CHROMA_COLLECTION_BASE_NAME, SHARED_COLLECTION_NAME, USE_SHARED_COLLECTION, get_chroma_client,
+        remove_run_from_shared_collection,
+    )
+    from data_indexing.lexical_index import bm25_index_path
+
+    client = get_chroma_client()
+    if USE_SHARED_COLLECTION:
+        remove_run_from_shared_collection(client.get_collection(name=SHARED_COLLECTION_NAME), run_timestamp)
+    else:
+        client.delete_collection(name=f"{CHROMA_COLLECTION_BASE_NAME}_{run_timestamp}")
+    bm25_path = bm25_index_path(run_timestamp)
+    if bm25_path.exists():
+        bm25_path.unlink()
+
+
+def load_graph(name: str, rag_run: str = None):
+    """
+    Imports a compiled graph and returns it with a factory for its initial state.
+    The debate graph retrieves from the index of `rag_run`; without one, retrieval is skipped.
+    """
+    if name == "debate":
+        from agentic_workflow.graph import debate_graph
+
+        def initial_state(i: int) -> dict:
+            return {
+                "initial_query": f"Load test query {i}: multi-agent systems for scientific discovery",
+                "topics": ["multi-agent systems", "scientific discovery"],
+                "intention": "Exploratory",
+                "run_timestamp": rag_run or f"loadtest_{i}",
+                "personalities": [], "persona_pool": [], "history": [],
+                "current_round_number": 0, "round_contributions": [],
+                "current_criticism": None, "current_summary": None,
+                "final_ideas": None, "final_deduplicated_ideas": None,
+                "use_ablation_synthesis": True,
+                "use_ablation_RAG": rag_run is None,
+                "use_ablation_viewpoint": False,
+                "use_ablation_critique": False,
+            }
+        return debate_graph, initial_state
+
+    if name == "simple":
+        from experiments.simple_graph import simple_graph
+
+        def initial_state(i: int) -> dict:
+            return {"initial_query": f"Load test query {i}", "generated_ideas": None, "refined_ideas": None}
+        return simple_graph, initial_state
+
+    from experiments.zeroshot_graph import generation_only_graph
+
+    def initial_state(i: int) -> dict:
+        return {"initial_query": f"Load test query {i}", "topics": [f"Load test query {i}"],
+                "run_timestamp": f"loadtest_{i}", "final_ideas": None}
+    return generation_only_graph, initial_state
+
+
+def percentile(values: list, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_load_test(graph_name: str, runs: int, concurrency: int, rag_run: str = None) -> dict:
+    """Invokes the graph `runs` times on `concurrency` threads and returns latency and error statistics."""
+    from llm_backends.chat_models import get_fake_model
+
+    graph, initial_state = load_graph(graph_name, rag_run)
+    fake_model = get_fake_model()
+
+    latencies, failures = [], []
+
+    def one_run(i: int) -> float:
+        start = time.perf_counter()
+        graph.invoke(initial_state(i))
+        return time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {executor.submit(one_run, i): i for i in range(runs)}
+        for future in as_completed(futures):
+            try:
+                latencies.append(future.result())
+            except Exception as e:
+                failures.append(f"run {futures[future]}: {type(e).__name__}: {e}")
+    wall_time = time.perf_counter() - wall_start
+
+    stats = dict(fake_model.stats)
+    return {
+        "graph": graph_name,
+        "runs": runs,
+        "concurrency": concurrency,
+        # Only the debate graph retrieves; None means the runs did not touch Chroma or BM25.
+        "rag_run": rag_run if graph_name == "debate" else None,
+        "succeeded": len(latencies),
+        "failed": len(failures),
+        "wall_seconds": round(wall_time, 3),
+        "runs_per_second": round(len(latencies) / wall_time, 3) if wall_time else 0.0,
+        "latency_p50": round(percentile(latencies, 0.50), 3),
+        "latency_p95": round(percentile(latencies, 0.95), 3),
+        "latency_mean": round(statistics.mean(latencies), 3) if latencies else 0.0,
+        "llm_calls": stats["calls"],
+        "llm_errors": stats["errors"],
+        "llm_rate_limited": stats["rate_limited"],
+        "llm_output_tokens": stats["output_tokens"],
+        # Share of wall time the simulated provider was busy, summed over parallel calls.
+        "llm_parallelism": round(stats["busy_seconds"] / wall_time, 2) if wall_time else 0.0,
+        "sample_failures": failures[:5],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the LangGraph workflows with a fake chat model.")
+    parser.add_argument("--graph", choices=GRAPH_CHOICES, default="debate")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--base-latency", type=float, default=0.0, help="Seconds added to every LLM call.")
+    parser.add_argument("--per-token-latency", type=float, default=0.0, help="Seconds per generated token.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability that an LLM call fails.")
+    parser.add_argument("--rpm", type=int, default=None, help="Provider-wide requests-per-minute limit.")
+    parser.add_argument("--rag-run", default=None,
+                        help="Retrieve from this indexed run instead of the synthetic fixture index.")
+    parser.add_argument("--no-rag", action="store_true", help="Skip retrieval and load-test the LLM path only.")
+    parser.add_argument("--output", type=Path, default=None, help="Optional path to save the report as JSON.")
+    args = parser.parse_args()
+
+    # The graphs create their models at import time, so the fake must be configured first.
+    os.environ["LLM_FAKE_MODEL"] = "1"
+    os.environ["LLM_FAKE_SEED"] = str(args.seed)
+    os.environ["LLM_FAKE_BASE_LATENCY"] = str(args.base_latency)
+    os.environ["LLM_FAKE_PER_TOKEN_LATENCY"] = str(args.per_token_latency)
+    os.environ["LLM_FAKE_ERROR_RATE"] = str(args.error_rate)
+    if args.rpm:
+        os.environ["LLM_FAKE_RPM"] = str(args.rpm)
+
+    rag_run, fixture_chunks = None, None
+    if args.graph == "debate" and not args.no_rag:
+        rag_run = args.rag_run
+        if rag_run is None:
+            print(f"Indexing the synthetic fixture run '{FIXTURE_RUN}'...")
+            fixture_chunks = build_fixture_index(FIXTURE_RUN, seed=args.seed)
+            rag_run = FIXTURE_RUN
+    try:
+        report = run_load_test(args.graph, args.runs, args.concurrency, rag_run)
+    finally:
+        if fixture_chunks is not None:
+            remove_fixture_index(FIXTURE_RUN)
+    report["fixture_chunks"] = fixture_chunks
+    report["timestamp"] = datetime.now().isoformat()
+    print(json.dumps(report, indent=4))
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=4)
+        print(f"Load test report saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Checks the batch-job paths end to end with LocalFileBatchBackend, without a provider.
+
+A scripted responder judges tournament matches and scores papers. It garbles every
+verdict involving one idea and fails one scoring request, so the fallbacks are
+exercised too: unreadable batch verdicts must be re-judged interactively, and papers
+whose scoring request failed must get no score. The job files are written to
+results/batch_jobs like those of any other batch job. Example:
+
+    python src/llm_backends/test_batch.py
+"""
+import json
+import re
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+src_path = Path(__file__).resolve().parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from llm_backends.batch import LocalFileBatchBackend
+from literature_review.agent import batch_score_papers
+from metrics.llm_evaluation import tournament_ranking
+
+NUM_IDEAS = 4
+NUM_PAPERS = 12
+PAPERS_PER_PROMPT = 5
+GARBLED_IDEA = 0      # Batch verdicts for this idea's matches are unreadable
+FAILING_PAPER = "paper_10"  # The scoring request containing this paper fails
+
+
+def judge(prompt: str) -> str:
+    """The higher-numbered idea always wins."""
+    first, second = (int(n) for n in re.findall(r"Title: Idea (\d+)", prompt)[:2])
+    return "1" if first > second else "2"
+
+
+def batch_responder(body: dict) -> str:
+    prompt = body["messages"][0]["content"]
+    if "Title: Idea" in prompt:
+        return "Paper 1 looks stronger." if f"Title: Idea {GARBLED_IDEA}\n" in prompt else judge(prompt)
+    if FAILING_PAPER in prompt:
+        raise RuntimeError("simulated provider error")
+    paper_ids = re.findall(r"paperId: (\S+)", prompt)
+    return json.dumps({paper_id: int(paper_id.split("_")[1]) % 10 for paper_id in paper_ids})
+
+
+class InteractiveJudge:
+    """Stands in for the chat model that re-judges matches the batch job did not settle."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, messages):
+        self.calls += 1
+        return SimpleNamespace(content=judge(messages[0].content))
+
+
+def check_tournament(work_dir: Path) -> None:
+    ideas = [{"title": f"Idea {i}", "description": f"Description {i}", "abstract": f"Abstract {i}"}
+             for i in range(NUM_IDEAS)]
+    interactive = InteractiveJudge()
+    run_timestamp = f"batch_check_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    ranked = tournament_ranking(ideas, interactive, str(work_dir), run_timestamp, max_round=3,
+                                batch_backend=LocalFileBatchBackend(batch_responder, work_dir / "backend"))
+    assert ranked[0]["title"] == f"Idea {NUM_IDEAS - 1}", ranked
+    assert ranked[-1]["title"] == f"Idea {GARBLED_IDEA}", ranked
+    # The garbled idea plays one match per round, and each was re-judged.
+    assert interactive.calls == 3, interactive.calls
+    print(f"Tournament: OK ({interactive.calls} matches re-judged interactively)")
+
+
+def check_paper_scoring(work_dir: Path) -> None:
+    papers = [{"paperId": f"paper_{i:02d}", "title": f"Paper {i}"} for i in range(NUM_PAPERS)]
+    scores = batch_score_papers("batch check", papers, LocalFileBatchBackend(batch_responder, work_dir / "backend"),
+                                job_name=f"batch_check_scoring_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+                                papers_per_prompt=PAPERS_PER_PROMPT)
+    failed_group = {f"paper_{i:02d}" for i in range(10, NUM_PAPERS)}
+    assert set(scores) == {p["paperId"] for p in papers} - failed_group, scores
+    assert all(score == int(paper_id.split("_")[1]) % 10 for paper_id, score in scores.items()), scores
+    print(f"Paper scoring: OK ({len(scores)}/{len(papers)} papers scored, one failed request)")
+
+
+def main():
+    work_dir = Path(tempfile.mkdtemp(prefix="batch_check_"))
+    try:
+        check_tournament(work_dir)
+        check_paper_scoring(work_dir)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
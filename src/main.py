@@ -11,6 +11,7 @@ if str(src_path) not in sys.path:
 
 try:
     from query_decomp.query_analyzer import QueryAnalyzer, QueryAnalysis
+    from query_decomp.query_store import QueryLogStore
 except ImportError as e:
     print(f"Error: Could not import from 'query_decomp'. {e}")
     print("Make sure it is a package in 'src' and accessible.")
@@ -24,14 +25,11 @@ except ImportError as e:
     sys.exit(1)
 
 try:
-    from KG_explore.modules.file_io import download_pdf
-    from KG_explore.modules.data_processing import sanitize_filename, extract_pdf_url_from_paper_details
-except ImportError as e:
-    print(f"Error: Could not import download utilities from 'KG_explore'. {e}")
-    sys.exit(1)
-
-try:
-    from paper_processing.processor import process_directory
+    from paper_processing.processor import process_directory, PIPELINE_SECTION_OPTIONS
+    from paper_processing.downloader import download_papers
+    from paper_processing.pdf_store import PDFStore
+    from paper_processing.extraction_cache import ExtractionCache
+    from paper_processing.streaming import run_streaming_ingestion
 except ImportError as e:
     print(f"Error: Could not import from 'paper_processing'. {e}")
     print("Make sure it is a package in 'src' and accessible.")
@@ -100,15 +98,21 @@ def save_final_results(project_root: Path, query_analysis: QueryAnalysis, paper_
     print(f"\nFinal report saved to: {output_filepath}")
     return output_filepath
 
-def run_query_decomposition_stage(project_root_path: Path, query_text: str) -> QueryAnalysis:
-    """Handles the query decomposition stage."""
+def run_query_decomposition_stage(project_root_path: Path, query_text: str, query_store: QueryLogStore = None) -> QueryAnalysis:
+    """Handles the query decomposition stage, reusing a precomputed analysis from the query store if present."""
     print("\n--- Stage 1: Query Decomposition ---")
-    analyzer = QueryAnalyzer() 
     
     # REMOVED: query_text = input('Enter your research query: ')
     
     try:
-        analysis_result = analyzer.analyze_query(query_text)
+        analysis_result = query_store.get(query_text) if query_store is not None else None
+        if analysis_result is not None:
+            print("Using precomputed analysis from the query log store.")
+        else:
+            analyzer = QueryAnalyzer()
+            analysis_result = analyzer.analyze_query(query_text)
+            if query_store is not None:
+                query_store.put(analysis_result)
         analysis_result.query = query_text # Attach the original query for later use
         
         print("\nQuery Analysis Results:")
@@ -122,8 +126,8 @@ def run_query_decomposition_stage(project_root_path: Path, query_text: str) -> Q
         print(f"Error during query analysis: {str(e)}")
         return None
 
-def run_literature_review_stage(query_analysis: QueryAnalysis) -> list:
-    """Runs the agentic literature review process."""
+def run_literature_review_stage(query_analysis: QueryAnalysis, batch_backend=None) -> list:
+    """Runs the agentic literature review process. Pass a batch_backend to score papers in batch jobs."""
     print("\n--- Stage 2: Agentic Literature Review ---")
     if not query_analysis.topics:
         print("No topics found from query analysis. Cannot start literature review.")
@@ -132,7 +136,7 @@ def run_literature_review_stage(query_analysis: QueryAnalysis) -> list:
     # Combine all topics to form the seed for the agent
     initial_topic = " and ".join(query_analysis.topics)
     print(f"Starting literature review with combined topic: '{initial_topic}'")
-    agent = LitReviewAgent(initial_topic)
+    agent = LitReviewAgent(initial_topic, batch_backend=batch_backend)
     
     try:
         final_paper_list = agent.run()
@@ -142,13 +146,16 @@ def run_literature_review_stage(query_analysis: QueryAnalysis) -> list:
         print(f"An error occurred during the literature review: {e}")
         return []
 
-def run_paper_download_stage(papers_to_download: list, project_root_path: Path, timestamp: str):
-    """Handles the downloading of PDFs from the final paper list."""
+def run_paper_download_stage(papers_to_download: list, project_root_path: Path, timestamp: str) -> list:
+    """
+    Handles the downloading of PDFs from the final paper list.
+    Downloads run concurrently; returns one result dict per paper for reporting.
+    """
     print("\n--- Stage 3: Paper Downloading ---")
     
     if not papers_to_download:
         print("No papers to download. Skipping.")
-        return
+        return []
 
     # Create a dedicated download directory named after the report timestamp
     download_folder_name = f"lit_review_papers_{timestamp}"
@@ -156,25 +163,11 @@ def run_paper_download_stage(papers_to_download: list, project_root_path: Path,
     
     print(f"Saving papers to: {download_dir}\n")
 
-    for i, paper in enumerate(papers_to_download):
-        title = paper.get("title", "Unknown Title")
-        paper_id = paper.get("paperId", f"unknown_id_{i}")
-        
-        # Use the more robust URL extraction logic
-        pdf_url = extract_pdf_url_from_paper_details(paper)
-
-        if pdf_url:
-            download_pdf(
-                title=title,
-                paper_id=paper_id,
-                pdf_url=pdf_url,
-                download_dir=str(download_dir),
-                sanitize_func=sanitize_filename
-            )
-        else:
-            print(f"    -> No open access PDF URL for paper {paper_id} ('{title}'). Skipping.")
+    # PDFs are kept once in the global store; the run directory only holds links to them.
+    download_results = download_papers(papers_to_download, download_dir, store=PDFStore(project_root_path / "data" / "pdf_store"))
 
     print("\n--- Download process finished. ---")
+    return download_results
 
 
 def run_paper_processing_stage(project_root_path: Path, timestamp: str):
@@ -185,14 +178,16 @@ def run_paper_processing_stage(project_root_path: Path, timestamp: str):
     input_dir = project_root_path / "data" / "papers" / download_folder_name
     output_dir = project_root_path / "data" / "processed_papers" / download_folder_name
     
-    if not input_dir.exists() or not any(input_dir.iterdir()):
-        print(f"Input directory '{input_dir}' is empty or does not exist. Skipping processing.")
+    if not input_dir.exists() or not any(input_dir.glob("*.pdf")):
+        print(f"Input directory '{input_dir}' has no PDFs or does not exist. Skipping processing.")
         return
         
     print(f"Processing PDFs from: {input_dir}")
     print(f"Saving JSON output to: {output_dir}")
     
-    process_directory(input_pdf_dir=input_dir, output_json_dir=output_dir)
+    process_directory(input_pdf_dir=input_dir, output_json_dir=output_dir, parallel=True,
+                      cache=ExtractionCache(project_root_path / "data" / "extraction_cache"),
+                      section_options=PIPELINE_SECTION_OPTIONS, use_bundle=True)
 
     print("\n--- Paper processing finished. ---")
 
@@ -205,6 +200,22 @@ def run_data_indexing_stage(run_timestamp: str):
     except Exception as e:
         print(f"An error occurred during data indexing: {e}")
 
+def run_streaming_ingestion_stage(papers: list, project_root_path: Path, timestamp: str) -> dict:
+    """
+    Runs stages 3-5 as one streaming pipeline: each paper is processed and indexed
+    as soon as it is downloaded, instead of waiting for the whole stage to finish.
+    """
+    if not papers:
+        print("No papers to ingest. Skipping.")
+        return {}
+    try:
+        return run_streaming_ingestion(papers, project_root_path, timestamp,
+                                       store=PDFStore(project_root_path / "data" / "pdf_store"),
+                                       cache=ExtractionCache(project_root_path / "data" / "extraction_cache"))
+    except Exception as e:
+        print(f"An error occurred during streaming ingestion: {e}")
+        return {}
+
 # --- New Stage for Agentic Workflow ---
 
 def state_serializer(obj):
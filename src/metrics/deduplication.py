@@ -8,7 +8,7 @@ import numpy as np
 import pandas as pd
 import argparse
 import os
-from sentence_transformers import SentenceTransformer, util
+from data_indexing.embeddings import get_embedding_service
 import matplotlib.pyplot as plt
 
 def plot_string_occurrences(strings_list):
@@ -118,13 +118,12 @@ def run_deduplication(final_state: dict, project_root_path: str, run_timestamp:
     print(f"Using similarity threshold: {similarity_threshold}")
 
     # 1. Concatenate and encode all ideas
-    model = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2", token=False)
     concatenated_ideas = [concatenate_idea_with_abstract(idea) for idea in ideas]
-    embeddings = model.encode(concatenated_ideas, convert_to_tensor=True)
+    embeddings = get_embedding_service().encode(concatenated_ideas)
 
 
-    # 2. Calculate the similarity matrix
-    similarity_matrix = util.pytorch_cos_sim(embeddings, embeddings).cpu().numpy()
+    # 2. Calculate the similarity matrix (embeddings are normalized, so this is cosine similarity)
+    similarity_matrix = embeddings @ embeddings.T
 
     # 3. Filter out similar ideas
     final_indices = []
@@ -10,19 +10,20 @@ if str(src_path) not in sys.path:
     sys.path.insert(0, str(src_path))
 
 from metrics.deduplication import run_deduplication
-from langchain_mistralai import ChatMistralAI
+from llm_backends.chat_models import get_chat_model
 
 from metrics.llm_evaluation import tournament_ranking, calculate_precision_at_n
 
 
-def run_precision_comparison(baseline_ideas: list, non_baseline_ideas: list, run_timestamp: str) -> dict | None:
+def run_precision_comparison(baseline_ideas: list, non_baseline_ideas: list, run_timestamp: str, batch_backend=None) -> dict | None:
     """
     Ranks ideas from two lists via tournament and calculates Precision@N.
     This version is flexible and takes idea lists directly.
+    Pass a batch_backend to judge all matches in one offline batch job.
     """
     # 1. Setup LLM and paths
     load_dotenv()
-    llm = ChatMistralAI(api_key=os.getenv("MISTRAL_API_KEY"), model="mistral-medium-latest", temperature=0.0)
+    llm = get_chat_model(model="mistral-medium-latest", temperature=0.0)
     output_dir = Path(__file__).parent / "evaluation_results"
     output_dir.mkdir(exist_ok=True)
 
@@ -45,7 +46,8 @@ def run_precision_comparison(baseline_ideas: list, non_baseline_ideas: list, run
         llm_client=llm,
         output_dir=output_dir,
         run_timestamp=run_timestamp,
-        max_round=10
+        max_round=10,
+        batch_backend=batch_backend
     )
     # 4. Calculate and return Precision@N
     if ranked_ideas:
@@ -56,14 +58,15 @@ def run_precision_comparison(baseline_ideas: list, non_baseline_ideas: list, run
 
 
 
-def run_precision_evaluation(timestamp_str):
+def run_precision_evaluation(timestamp_str, batch_backend=None):
     """
     Loads ideas from baseline and non-baseline configurations,
     ranks them via tournament, and calculates Precision@N.
+    Pass a batch_backend to judge all matches in one offline batch job.
     """
     # 1. Setup paths and load LLM
     load_dotenv()
-    llm = ChatMistralAI(api_key=os.getenv("MISTRAL_API_KEY"), model="mistral-medium-latest", temperature=0.0)
+    llm = get_chat_model(model="mistral-medium-latest", temperature=0.0)
     project_root = Path("/Users/husainsaif/Desktop/thesis-saif")
     
     baseline_path = project_root / "results" / "simple_agent_states" / f"simple_workflow_state_{timestamp_str}.json"
@@ -112,7 +115,8 @@ def run_precision_evaluation(timestamp_str):
         llm_client=llm,
         output_dir=output_dir,
         run_timestamp=run_timestamp,
-        max_round=10  # As per your requirement for 10 rounds
+        max_round=10,  # As per your requirement for 10 rounds
+        batch_backend=batch_backend
     )
 
     # 6. Calculate and print Precision@N
@@ -7,10 +7,11 @@ import retry
 from langchain_core.messages import HumanMessage
 
 from metrics.utils import format_plan_json, format_idea_with_abstract
+from llm_backends.batch import run_batch_job
 
-@retry.retry(tries=3, delay=5)
-def better_idea(idea_1, idea_2, llm_client, temperature=0.0):
-    prompt = (
+def build_comparison_prompt(idea_1, idea_2):
+    """Builds the pairwise judging prompt for two ideas."""
+    return (
         "You are a reviewer specialized in Natural Language Processing and Large Language Models. "
         "You are given two research project summaries. One of them is likely to be accepted by a top AI conference (like ICLR or ACL) "
         "and the other one is likely to be rejected. Your task is to identify the one with higher potential.\n\n"
@@ -21,6 +22,10 @@ def better_idea(idea_1, idea_2, llm_client, temperature=0.0):
         f"{format_idea_with_abstract(idea_2)}\n\n"
         "Now, decide which one is the better idea. Directly return a number 1 or 2 and nothing else."
     )
+
+@retry.retry(tries=3, delay=5)
+def better_idea(idea_1, idea_2, llm_client, temperature=0.0):
+    prompt = build_comparison_prompt(idea_1, idea_2)
     
     try:
         response = llm_client.invoke([HumanMessage(content=prompt)])
@@ -29,25 +34,76 @@ def better_idea(idea_1, idea_2, llm_client, temperature=0.0):
         print(f"LLM call failed: {e}")
         raise # Re-raise the exception to trigger the retry
 
-def tournament_ranking(idea_lst, llm_client, output_dir, run_timestamp, max_round=3):
+def _run_batched_matches(rounds, batch_backend, run_timestamp):
+    """
+    Judges every match of every round in a single batch job.
+    Pairings do not depend on earlier results, so all rounds can be submitted at once.
+    Returns the judge's raw answer for each (round, match) index.
+    """
+    batch_requests = [
+        {"custom_id": f"r{round_idx}_m{match_idx}", "prompt": build_comparison_prompt(idea1, idea2)}
+        for round_idx, match_pairs in enumerate(rounds)
+        for match_idx, (idea1, idea2) in enumerate(match_pairs)
+    ]
+    responses = run_batch_job(batch_requests, batch_backend, job_name=f"tournament_{run_timestamp}")
+    return {
+        (round_idx, match_idx): responses.get(f"r{round_idx}_m{match_idx}")
+        for round_idx, match_pairs in enumerate(rounds)
+        for match_idx in range(len(match_pairs))
+    }
+
+def _interactive_winner(result):
+    """The interactive rule: idea 1 wins on a '1' verdict, idea 2 on anything else."""
+    return 1 if result and result.strip() == '1' else 2
+
+def _batch_winner(result):
+    """Returns 1 or 2 for a batch verdict, or None if the response is missing or not a verdict."""
+    if result is None:
+        return None
+    answer = result.strip()
+    return int(answer) if answer in ("1", "2") else None
+
+def tournament_ranking(idea_lst, llm_client, output_dir, run_timestamp, max_round=3, batch_backend=None):
     """
     Ranks a list of ideas using a head-to-head tournament evaluation.
+    If a batch_backend is given, all matches are judged offline in one provider batch job
+    instead of one interactive LLM call per match.
     """
     scores = defaultdict(lambda: 1)
     
+    # Draw all pairings up front so the interactive and batch modes judge the same matches.
+    rounds = []
     for current_round in range(max_round):
-        print(f"--- Starting Tournament Round {current_round + 1}/{max_round} ---")
-        
         random.shuffle(idea_lst)
         match_pairs = [tuple(idea_lst[i:i+2]) for i in range(0, len(idea_lst) - (len(idea_lst) % 2), 2)]
         
         if len(idea_lst) % 2 != 0:
             scores[format_plan_json(idea_lst[-1])] += 1
+        rounds.append(match_pairs)
+
+    batch_results = _run_batched_matches(rounds, batch_backend, run_timestamp) if batch_backend else None
+
+    for current_round, match_pairs in enumerate(rounds):
+        print(f"--- Starting Tournament Round {current_round + 1}/{max_round} ---")
         
-        for idea1, idea2 in tqdm(match_pairs, desc=f"Round {current_round + 1} Matches"):
-            prompt, result, cost = better_idea(idea1, idea2, llm_client)
-            
-            if result and result.strip() == '1':
+        for match_idx, (idea1, idea2) in enumerate(tqdm(match_pairs, desc=f"Round {current_round + 1} Matches")):
+            if batch_results is not None:
+                winner = _batch_winner(batch_results[(current_round, match_idx)])
+                if winner is None:
+                    # Failed or unreadable batch response: judge this match interactively instead,
+                    # and skip it only if that fails too.
+                    try:
+                        prompt, result, cost = better_idea(idea1, idea2, llm_client)
+                        winner = _interactive_winner(result)
+                    except Exception as e:
+                        print(f"Re-judging match {match_idx} of round {current_round + 1} failed: {e}")
+            else:
+                prompt, result, cost = better_idea(idea1, idea2, llm_client)
+                winner = _interactive_winner(result)
+
+            if winner is None:
+                print(f"Warning: No verdict for match {match_idx} of round {current_round + 1}; skipping it.")
+            elif winner == 1:
                 scores[format_plan_json(idea1)] += 1
             else:
                 scores[format_plan_json(idea2)] += 1
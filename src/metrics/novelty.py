@@ -1,19 +1,19 @@
 import numpy as np
-from sentence_transformers import SentenceTransformer, util
 from sklearn.metrics.pairwise import euclidean_distances
+from data_indexing.embeddings import get_embedding_service
 from literature_review.tools import search_papers_by_keyword, get_paper_details
 
 # --- Configuration ---
 BPAST_CUTOFF_YEAR = 2023
 TOP_K_SIMILAR = 5
-model = SentenceTransformer("all-MiniLM-L6-v2")
 
 def get_paper_embeddings(papers):
     """Generates embeddings for the abstracts of a list of papers."""
     abstracts = [p.get('abstract', '') for p in papers if p.get('abstract')]
     if not abstracts:
         return []
-    return model.encode(abstracts, convert_to_tensor=True)
+    # Shared with indexing and deduplication; abstracts seen in earlier runs come from its cache.
+    return get_embedding_service().encode(abstracts)
 
 def calculate_dissimilarity(generated_embedding, historical_embeddings):
     """Calculates the average Euclidean distance to the top K most similar embeddings."""
@@ -24,10 +24,7 @@ def calculate_dissimilarity(generated_embedding, historical_embeddings):
     if len(generated_embedding.shape) == 1:
         generated_embedding = generated_embedding.reshape(1, -1)
 
-    distances = euclidean_distances(
-        generated_embedding.cpu().numpy(), 
-        historical_embeddings.cpu().numpy()
-    )[0]
+    distances = euclidean_distances(generated_embedding, historical_embeddings)[0]
     
     # Get the distances of the top K most similar (smallest distance)
     top_k_distances = np.sort(distances)[:TOP_K_SIMILAR]
@@ -59,7 +56,7 @@ def calculate_novelty_metrics(generated_idea: dict, discovered_papers: list):
     
     # 1. Generate embedding for the new idea
     idea_text = f"{generated_idea['title']} {generated_idea['description']}"
-    idea_embedding = model.encode([idea_text], convert_to_tensor=True)
+    idea_embedding = get_embedding_service().encode([idea_text])
     
     # 2. Separate discovered papers into Bpast and Bcon
     bpast_papers = [p for p in discovered_papers if p.get('year') and p['year'] < BPAST_CUTOFF_YEAR]
@@ -82,9 +79,9 @@ def calculate_novelty_metrics(generated_idea: dict, discovered_papers: list):
 
     # 6. Find top 5 similar contemporary papers for CI
     if bcon_papers:
-        # Calculate cosine similarities to find the most similar papers
-        cos_scores = util.pytorch_cos_sim(idea_embedding, bcon_embeddings)[0]
-        top_k_indices = np.argsort(-cos_scores.cpu().numpy())[:TOP_K_SIMILAR]
+        # Calculate cosine similarities to find the most similar papers (embeddings are normalized)
+        cos_scores = (bcon_embeddings @ idea_embedding[0])
+        top_k_indices = np.argsort(-cos_scores)[:TOP_K_SIMILAR]
         top_k_con_papers = [bcon_papers[i] for i in top_k_indices]
         
         # 7. Calculate Contemporary Impact (CI)
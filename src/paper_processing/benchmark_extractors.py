@@ -0,0 +1,133 @@
+"""
+Benchmarks the PDF text backends against pdfplumber on a fixed corpus of local PDFs.
+
+Reports pages/second per backend and how well the sections it detects agree with
+the pdfplumber baseline. Example:
+
+    python src/paper_processing/benchmark_extractors.py --pdf-dir data/pdf_store/objects --limit 30
+"""
+import argparse
+import json
+import re
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+src_path = Path(__file__).resolve().parent.parent
+if str(src_path) not in sys.path:
+    sys.path.insert(0, str(src_path))
+
+from paper_processing.extractors import EXTRACTORS, get_extractor
+from paper_processing.processor import extract_structured_content
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
+DEFAULT_PDF_DIR = PROJECT_ROOT / "data" / "pdf_store" / "objects"
+BENCHMARK_DIR = PROJECT_ROOT / "results" / "benchmarks"
+BASELINE = "pdfplumber"
+
+
+def normalize_section_title(title: str) -> str:
+    """Strips numbering, punctuation and case so titles from different backends compare equal."""
+    title = re.sub(r"^\s*\d+(\.\d+)*\s*\.?\s*", "", title.lower())
+    return re.sub(r"[^a-z ]", "", title).strip()
+
+
+def section_agreement(baseline: dict, candidate: dict) -> float:
+    """Jaccard similarity of the normalized section titles of two extractions."""
+    baseline_titles = {normalize_section_title(t) for t in baseline}
+    candidate_titles = {normalize_section_title(t) for t in candidate}
+    if not baseline_titles and not candidate_titles:
+        return 1.0
+    return len(baseline_titles & candidate_titles) / len(baseline_titles | candidate_titles)
+
+
+def content_chars(content: dict) -> int:
+    return sum(len(p) for paragraphs in content.values() if isinstance(paragraphs, list) for p in paragraphs)
+
+
+def run_benchmark(pdf_files: list, backends: list) -> dict:
+    """Extracts every PDF with every backend and compares each against the pdfplumber baseline."""
+    per_backend = {}
+    extractions = {}
+
+    for backend in backends:
+        extractor = get_extractor(backend)
+        total_pages, total_seconds, failures = 0, 0.0, 0
+        extractions[backend] = {}
+        for pdf_path in pdf_files:
+            try:
+                pages = extractor.page_count(pdf_path)
+                start = time.perf_counter()
+                content = extract_structured_content(pdf_path, extractor_name=backend)
+                total_seconds += time.perf_counter() - start
+            except Exception as e:
+                print(f"   !!! {backend} failed on {pdf_path.name}: {e}")
+                failures += 1
+                continue
+            if "error" in content:
+                failures += 1
+                continue
+            total_pages += pages
+            extractions[backend][pdf_path.name] = content
+
+        per_backend[backend] = {
+            "pdfs": len(pdf_files),
+            "failures": failures,
+            "pages": total_pages,
+            "seconds": round(total_seconds, 3),
+            "pages_per_second": round(total_pages / total_seconds, 2) if total_seconds else 0.0,
+            "chars": sum(content_chars(c) for c in extractions[backend].values()),
+        }
+
+    if BASELINE in extractions:
+        for backend in backends:
+            agreements = [
+                section_agreement(extractions[BASELINE][name], content)
+                for name, content in extractions[backend].items() if name in extractions[BASELINE]
+            ]
+            per_backend[backend]["section_agreement_mean"] = round(statistics.mean(agreements), 3) if agreements else None
+            baseline_seconds = per_backend[BASELINE]["seconds"]
+            per_backend[backend]["speedup_vs_baseline"] = (
+                round(baseline_seconds / per_backend[backend]["seconds"], 2) if per_backend[backend]["seconds"] else None
+            )
+    return per_backend
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare PDF text extraction backends on local PDFs.")
+    parser.add_argument("--pdf-dir", type=Path, default=DEFAULT_PDF_DIR, help="Directory searched recursively for PDFs.")
+    parser.add_argument("--limit", type=int, default=20, help="Number of PDFs in the corpus (sorted by path).")
+    parser.add_argument("--backends", nargs="+", default=list(EXTRACTORS), choices=list(EXTRACTORS))
+    parser.add_argument("--output", type=Path, default=None, help="Where to save the JSON report.")
+    args = parser.parse_args()
+
+    pdf_files = sorted(args.pdf_dir.rglob("*.pdf"))[:args.limit]
+    if not pdf_files:
+        print(f"No PDFs found under '{args.pdf_dir}'.")
+        return
+
+    backends = [BASELINE] + [b for b in args.backends if b != BASELINE]
+    print(f"Benchmarking {', '.join(backends)} on {len(pdf_files)} PDF(s) from {args.pdf_dir}\n")
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "pdf_dir": str(args.pdf_dir),
+        "corpus": [p.name for p in pdf_files],
+        "backends": run_benchmark(pdf_files, backends),
+    }
+
+    print(f"\n{'backend':12s} {'pages/s':>9s} {'speedup':>8s} {'agreement':>10s} {'failures':>9s}")
+    for backend, stats in report["backends"].items():
+        print(f"{backend:12s} {stats['pages_per_second']:9.2f} {stats.get('speedup_vs_baseline') or 0:8.2f} "
+              f"{stats.get('section_agreement_mean') or 0:10.3f} {stats['failures']:9d}")
+
+    output_path = args.output or BENCHMARK_DIR / f"extractor_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    print(f"\nBenchmark report saved to: {output_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+import json
+import os
+import struct
+import threading
+from pathlib import Path
+from typing import Iterator, Optional
+
+# --- Configuration ---
+# All processed papers of a run are stored in one bundle file instead of one JSON per paper.
+BUNDLE_NAME = "papers.bundle"
+BUNDLE_FORMAT_VERSION = 1
+COMPRESSION_NONE = "none"
+COMPRESSION_ZSTD = "zstd"
+
+# Each record is a 4-byte big-endian payload length followed by the payload: the compact
+# JSON of {"id": ..., "content": ...}, zstd-compressed if the bundle uses compression.
+_LENGTH = struct.Struct(">I")
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def _index_path(bundle_path: Path) -> Path:
+    return bundle_path.with_name(bundle_path.name + ".index.json")
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise ImportError("zstd-compressed bundles require the zstandard package: pip install zstandard") from e
+    return zstandard
+
+
+class _BundleBase:
+    """Shared record decoding and offset-index handling for bundle readers and writers."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.index_path = _index_path(self.path)
+        self.compression = COMPRESSION_NONE
+        self._offsets = {}   # record id -> (offset of the length prefix, payload length)
+        self._decompressor = None
+
+    def _decode(self, payload: bytes) -> dict:
+        if self.compression == COMPRESSION_ZSTD:
+            if self._decompressor is None:
+                self._decompressor = _zstd().ZstdDecompressor()
+            payload = self._decompressor.decompress(payload)
+        return json.loads(payload)
+
+    def _load_index(self) -> None:
+        """Loads the offset index, rebuilding it by scanning the bundle if it is missing or stale."""
+        bundle_size = self.path.stat().st_size if self.path.exists() else 0
+        if self.index_path.exists():
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                self.compression = index.get("compression", COMPRESSION_NONE)
+                if index.get("bundle_bytes") == bundle_size:
+                    self._offsets = {key: tuple(value) for key, value in index["records"].items()}
+                    return
+            except (json.JSONDecodeError, KeyError, IOError) as e:
+                print(f"Warning: Could not read bundle index '{self.index_path}'. Rebuilding. Error: {e}")
+        if bundle_size:
+            self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        """Recovers the index after an interrupted run; a truncated trailing record is ignored."""
+        self._offsets = {}
+        with open(self.path, 'rb') as f:
+            offset = 0
+            while True:
+                header = f.read(_LENGTH.size)
+                if len(header) < _LENGTH.size:
+                    break
+                (length,) = _LENGTH.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length:
+                    break
+                if offset == 0 and payload.startswith(_ZSTD_MAGIC):
+                    self.compression = COMPRESSION_ZSTD
+                self._offsets[self._decode(payload)["id"]] = (offset, length)
+                offset += _LENGTH.size + length
+        self.valid_bytes = offset
+
+    def _read_at(self, f, offset: int, length: int) -> dict:
+        f.seek(offset + _LENGTH.size)
+        return self._decode(f.read(length))
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def keys(self) -> list:
+        return list(self._offsets)
+
+
+class RunBundleReader(_BundleBase):
+    """
+    Random and sequential access to the processed papers of a run.
+
+    Only the small offset index is loaded up front; each record is read and parsed
+    on demand, so consumers never parse the whole bundle.
+    """
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self._load_index()
+        self._file = open(self.path, 'rb') if self.path.exists() else None
+        self._lock = threading.Lock()
+
+    def get(self, record_id: str) -> Optional[dict]:
+        """Returns the content stored for a record id (a paper's PDF stem), or None."""
+        if record_id not in self._offsets or self._file is None:
+            return None
+        offset, length = self._offsets[record_id]
+        with self._lock:
+            return self._read_at(self._file, offset, length)["content"]
+
+    def __iter__(self) -> Iterator[tuple]:
+        """Yields (record_id, content) in file order, one record at a time."""
+        for record_id, (offset, length) in sorted(self._offsets.items(), key=lambda item: item[1][0]):
+            with self._lock:
+                record = self._read_at(self._file, offset, length)
+            yield record_id, record["content"]
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class RunBundleWriter(_BundleBase):
+    """
+    Appends processed papers to a run bundle and maintains its offset index.
+
+    Writing a record id again appends a new record and points the index at it. An
+    existing bundle is reopened for appending, so re-running a stage adds to it.
+    Records can be read back while writing, which the streaming pipeline relies on.
+
+    Args:
+        path (Path): The bundle file, usually <processed dir>/papers.bundle.
+        compression (str): 'none' or 'zstd' (needs the optional zstandard package).
+            An existing bundle keeps its original compression.
+    """
+
+    def __init__(self, path: Path, compression: str = COMPRESSION_NONE):
+        super().__init__(path)
+        self._lock = threading.Lock()
+        self.valid_bytes = None
+        self._load_index()
+        if not self._offsets:
+            self.compression = compression
+        self._compressor = _zstd().ZstdCompressor(level=3) if self.compression == COMPRESSION_ZSTD else None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a+b')
+        if self.valid_bytes is not None:
+            # Drop a partial record left behind by an interrupted run.
+            self._file.truncate(self.valid_bytes)
+        self._file.seek(0, os.SEEK_END)
+
+    def add(self, record_id: str, content: dict) -> None:
+        payload = json.dumps({"id": record_id, "content": content}, separators=(",", ":")).encode("utf-8")
+        if self._compressor is not None:
+            payload = self._compressor.compress(payload)
+        with self._lock:
+            self._file.seek(0, os.SEEK_END)
+            offset = self._file.tell()
+            self._file.write(_LENGTH.pack(len(payload)) + payload)
+            self._offsets[record_id] = (offset, len(payload))
+
+    def get(self, record_id: str) -> Optional[dict]:
+        with self._lock:
+            if record_id not in self._offsets:
+                return None
+            self._file.flush()
+            offset, length = self._offsets[record_id]
+            return self._read_at(self._file, offset, length)["content"]
+
+    def save_index(self) -> None:
+        with self._lock:
+            self._file.flush()
+            self._file.seek(0, os.SEEK_END)
+            index = {
+                "format": BUNDLE_FORMAT_VERSION,
+                "compression": self.compression,
+                "bundle_bytes": self._file.tell(),
+                "records": {key: list(value) for key, value in self._offsets.items()},
+            }
+        tmp_path = self.index_path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(index, f, separators=(",", ":"))
+        os.replace(tmp_path, self.index_path)
+
+    def close(self) -> None:
+        if self._file is None:
+            return
+        self.save_index()
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_run_bundle(processed_dir: Path) -> Optional[RunBundleReader]:
+    """Opens the bundle of a processed-papers directory, or returns None if the run has none."""
+    bundle_path = Path(processed_dir) / BUNDLE_NAME
+    return RunBundleReader(bundle_path) if bundle_path.exists() else None
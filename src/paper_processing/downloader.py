@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from KG_explore.modules.file_io import download_pdf
+from KG_explore.modules.data_processing import sanitize_filename, extract_pdf_url_from_paper_details
+from paper_processing.pdf_store import PDFStore, write_run_manifest
+
+# --- Configuration ---
+DOWNLOAD_WORKERS = 8            # Total concurrent downloads
+PER_HOST_CONNECTIONS = 2        # Concurrent downloads against a single host
+CONNECT_TIMEOUT = 10            # Seconds to establish a connection
+READ_TIMEOUT = 30               # Seconds to wait for the next chunk
+MAX_DOWNLOAD_SECONDS = 120      # Overall budget for a single PDF
+
+
+def create_download_session(pool_size: int = DOWNLOAD_WORKERS) -> requests.Session:
+    """Creates a shared session with a connection pool and retries on transient errors."""
+    session = requests.Session()
+    retries = Retry(total=2, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504], allowed_methods=["GET"])
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": "Mozilla/5.0 (research-pipeline PDF downloader)"})
+    return session
+
+
+def _interleave_by_host(jobs: list) -> list:
+    """Orders jobs round-robin over hosts so workers are not all stuck waiting on one host's limit."""
+    by_host = defaultdict(deque)
+    for job in jobs:
+        by_host[job["host"]].append(job)
+
+    ordered = []
+    while by_host:
+        for host in list(by_host):
+            ordered.append(by_host[host].popleft())
+            if not by_host[host]:
+                del by_host[host]
+    return ordered
+
+
+def download_papers(papers: list, download_dir: Path, max_workers: int = DOWNLOAD_WORKERS,
+                    per_host_limit: int = PER_HOST_CONNECTIONS, store: PDFStore = None, on_result=None) -> list:
+    """
+    Downloads the open access PDFs of a list of papers concurrently.
+
+    Uses a bounded thread pool, a shared session, a per-host connection limit and
+    an overall time budget per file, so one slow host cannot stall the run.
+
+    Args:
+        papers (list): Paper dicts from the literature review.
+        download_dir (Path): Directory to save the PDFs in.
+        max_workers (int): Number of concurrent downloads.
+        per_host_limit (int): Maximum concurrent downloads per host.
+        store (PDFStore, optional): Global PDF store to reuse and fill. When given, the
+            run directory only holds links, described by a manifest next to it.
+        on_result (callable, optional): Called with each result as soon as it is known, so
+            later stages can start on a paper without waiting for the whole batch.
+
+    Returns:
+        list: One result dict per paper (see `download_pdf`), plus 'title' and 'url'.
+    """
+    download_dir = Path(download_dir)
+    results = []
+    jobs = []
+
+    for i, paper in enumerate(papers):
+        title = paper.get("title", "Unknown Title")
+        paper_id = paper.get("paperId", f"unknown_id_{i}")
+        pdf_url = extract_pdf_url_from_paper_details(paper)
+
+        if not pdf_url:
+            print(f"    -> No open access PDF URL for paper {paper_id} ('{title}'). Skipping.")
+            result = {"paper_id": paper_id, "title": title, "url": None, "status": "skipped",
+                      "bytes": 0, "seconds": 0.0, "path": None, "error": "no_url"}
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+            continue
+        jobs.append({"paper_id": paper_id, "title": title, "url": pdf_url, "host": urlparse(pdf_url).netloc})
+
+    if not jobs:
+        return results
+
+    session = create_download_session(pool_size=max_workers)
+    host_slots = defaultdict(lambda: threading.Semaphore(per_host_limit))
+    slots_lock = threading.Lock()
+
+    def run_job(job: dict) -> dict:
+        with slots_lock:
+            slot = host_slots[job["host"]]
+        with slot:
+            result = download_pdf(
+                title=job["title"],
+                paper_id=job["paper_id"],
+                pdf_url=job["url"],
+                download_dir=str(download_dir),
+                sanitize_func=sanitize_filename,
+                session=session,
+                timeout=(CONNECT_TIMEOUT, READ_TIMEOUT),
+                max_seconds=MAX_DOWNLOAD_SECONDS,
+                store=store,
+            )
+        result.update({"title": job["title"], "url": job["url"]})
+        return result
+
+    start = time.monotonic()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run_job, job) for job in _interleave_by_host(jobs)]
+            for completed, future in enumerate(as_completed(futures), start=1):
+                result = future.result()
+                results.append(result)
+                print(f"    [{completed}/{len(jobs)}] {result['status'].upper():7s} {result['paper_id']} "
+                      f"({result['bytes'] / 1024:.0f} KB in {result['seconds']:.1f}s)")
+                if on_result is not None:
+                    on_result(result)
+    finally:
+        session.close()
+
+    elapsed = time.monotonic() - start
+    summary = summarize_download_results(results)
+    print(f"\nDownloaded {summary['ok']} ok / {summary['cached']} from store / {summary['failed']} failed / "
+          f"{summary['skipped']} skipped, {summary['bytes'] / 1e6:.1f} MB in {elapsed:.1f}s.")
+
+    if store is not None:
+        manifest_path = write_run_manifest(download_dir, store, results)
+        print(f"Run manifest saved to: {manifest_path}")
+    return results
+
+
+def summarize_download_results(results: list) -> dict:
+    """Aggregates download results into counts and totals for reporting."""
+    summary = {"ok": 0, "cached": 0, "failed": 0, "skipped": 0, "bytes": 0, "seconds": 0.0}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+        summary["bytes"] += result.get("bytes", 0) if result["status"] == "ok" else 0
+        summary["seconds"] += result.get("seconds", 0.0)
+    summary["seconds"] = round(summary["seconds"], 3)
+    return summary
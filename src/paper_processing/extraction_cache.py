@@ -0,0 +1,74 @@
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+# --- Configuration ---
+# Persistent cache of extraction results, shared by all runs.
+EXTRACTION_CACHE_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "extraction_cache"
+
+
+class ExtractionCache:
+    """
+    Caches structured extraction results by PDF content.
+
+    Entries are keyed by (PDF SHA-256, extractor version, extraction options), so a
+    PDF that was processed before - in a crashed run or in another run - is never
+    extracted again, while a change to the extractor or its options invalidates the
+    old results. The options include the title guessed from the file name (see
+    `processor.extraction_options`), so identical PDFs saved under different names
+    are not served each other's content. Each entry is one JSON file under <root>/<key[:2]>/<key>.json.
+    """
+
+    def __init__(self, root: Path = EXTRACTION_CACHE_DIR):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "writes": 0}
+
+    @staticmethod
+    def make_key(pdf_sha256: str, extractor_version: str, options: dict) -> str:
+        options_blob = json.dumps(options, sort_keys=True)
+        return hashlib.sha256(f"{pdf_sha256}|{extractor_version}|{options_blob}".encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, pdf_sha256: str, extractor_version: str, options: dict) -> Optional[dict]:
+        """Returns the cached content for a PDF, or None on a miss."""
+        path = self._entry_path(self.make_key(pdf_sha256, extractor_version, options))
+        content = None
+        if path.exists():
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    content = json.load(f)["content"]
+            except (json.JSONDecodeError, KeyError, IOError) as e:
+                print(f"Warning: Ignoring unreadable extraction cache entry '{path.name}'. Error: {e}")
+
+        with self._lock:
+            self.stats["hits" if content is not None else "misses"] += 1
+        return content
+
+    def put(self, pdf_sha256: str, extractor_version: str, options: dict, content: dict, filename: str = None) -> None:
+        """Stores the content extracted from a PDF. Writes are atomic, so concurrent workers are safe."""
+        path = self._entry_path(self.make_key(pdf_sha256, extractor_version, options))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        entry = {
+            "pdf_sha256": pdf_sha256,
+            "extractor_version": extractor_version,
+            "options": options,
+            "filename": filename,
+            "content": content,
+        }
+        tmp_path = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self.stats["writes"] += 1
+
+    def hit_rate(self) -> float:
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return self.stats["hits"] / lookups if lookups else 0.0
@@ -0,0 +1,140 @@
+import os
+from pathlib import Path
+from typing import Iterator
+
+# --- Configuration ---
+# The backend for a run can be chosen with the PDF_EXTRACTOR environment variable
+# ('pdfplumber', 'pdfminer' or 'pypdfium2') or passed explicitly to `process_directory`.
+DEFAULT_EXTRACTOR = os.getenv("PDF_EXTRACTOR", "pdfplumber")
+
+
+class PDFTextExtractor:
+    """
+    Interface for the raw text backends used by the paper processor.
+
+    A backend only turns a PDF into per-page text; section detection and paragraph
+    cleaning stay in `processor.py`, so all backends produce the same JSON layout.
+    """
+
+    name = "base"
+
+    def options(self) -> dict:
+        """Settings that influence the extracted text. Part of the extraction cache key."""
+        return {}
+
+    def page_count(self, pdf_path: Path) -> int:
+        raise NotImplementedError
+
+    def iter_page_texts(self, pdf_path: Path) -> Iterator[str]:
+        """Yields the text of each page in order, one page at a time."""
+        raise NotImplementedError
+
+
+class PdfplumberExtractor(PDFTextExtractor):
+    """Character-level layout analysis with pdfplumber. Most accurate, but the slowest backend."""
+
+    name = "pdfplumber"
+
+    def __init__(self, x_tolerance: float = 2, y_tolerance: float = 2):
+        self.x_tolerance = x_tolerance
+        self.y_tolerance = y_tolerance
+
+    def options(self) -> dict:
+        return {"x_tolerance": self.x_tolerance, "y_tolerance": self.y_tolerance}
+
+    def page_count(self, pdf_path: Path) -> int:
+        import pdfplumber
+
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+
+    def iter_page_texts(self, pdf_path: Path) -> Iterator[str]:
+        import pdfplumber
+
+        with pdfplumber.open(pdf_path) as pdf:
+            for page in pdf.pages:
+                yield page.extract_text(x_tolerance=self.x_tolerance, y_tolerance=self.y_tolerance) or ""
+                # Drop the parsed page objects as we go; pdfplumber caches them otherwise.
+                page.flush_cache()
+
+
+class PdfminerExtractor(PDFTextExtractor):
+    """
+    pdfminer.six with reduced layout analysis. Characters are still grouped into lines
+    and text boxes, which the section parser needs, but `boxes_flow=None` skips the
+    hierarchical ordering of the boxes - the costly part of pdfminer's default analysis -
+    and boxes are read top to bottom instead. pdfminer is a pdfplumber dependency.
+    """
+
+    name = "pdfminer"
+
+    def __init__(self, line_margin: float = 0.5, char_margin: float = 2.0):
+        self.line_margin = line_margin
+        self.char_margin = char_margin
+
+    def options(self) -> dict:
+        return {"line_margin": self.line_margin, "char_margin": self.char_margin, "boxes_flow": None}
+
+    def page_count(self, pdf_path: Path) -> int:
+        from pdfminer.pdfpage import PDFPage
+
+        with open(pdf_path, 'rb') as f:
+            return sum(1 for _ in PDFPage.get_pages(f))
+
+    def iter_page_texts(self, pdf_path: Path) -> Iterator[str]:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LAParams, LTTextContainer
+
+        laparams = LAParams(line_margin=self.line_margin, char_margin=self.char_margin, boxes_flow=None)
+        for page_layout in extract_pages(str(pdf_path), laparams=laparams):
+            yield "".join(element.get_text() for element in page_layout if isinstance(element, LTTextContainer))
+
+
+class Pypdfium2Extractor(PDFTextExtractor):
+    """Raw text from PDFium's native text layer. By far the fastest; needs the optional `pypdfium2` package."""
+
+    name = "pypdfium2"
+
+    def page_count(self, pdf_path: Path) -> int:
+        pdfium = _import_pypdfium2()
+        pdf = pdfium.PdfDocument(str(pdf_path))
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    def iter_page_texts(self, pdf_path: Path) -> Iterator[str]:
+        pdfium = _import_pypdfium2()
+        pdf = pdfium.PdfDocument(str(pdf_path))
+        try:
+            for index in range(len(pdf)):
+                page = pdf[index]
+                text_page = page.get_textpage()
+                # PDFium uses CRLF line endings; the section parser splits on '\n'.
+                yield text_page.get_text_range().replace("\r\n", "\n").replace("\r", "\n")
+                text_page.close()
+                page.close()
+        finally:
+            pdf.close()
+
+
+def _import_pypdfium2():
+    try:
+        import pypdfium2
+    except ImportError as e:
+        raise ImportError("The 'pypdfium2' extractor requires the pypdfium2 package: pip install pypdfium2") from e
+    return pypdfium2
+
+
+EXTRACTORS = {
+    PdfplumberExtractor.name: PdfplumberExtractor,
+    PdfminerExtractor.name: PdfminerExtractor,
+    Pypdfium2Extractor.name: Pypdfium2Extractor,
+}
+
+
+def get_extractor(name: str = DEFAULT_EXTRACTOR) -> PDFTextExtractor:
+    """Returns a text extractor by name ('pdfplumber', 'pdfminer' or 'pypdfium2')."""
+    if name not in EXTRACTORS:
+        raise ValueError(f"Unknown PDF extractor '{name}'. Choose one of: {', '.join(EXTRACTORS)}")
+    return EXTRACTORS[name]()
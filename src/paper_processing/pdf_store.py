@@ -0,0 +1,176 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+# --- Configuration ---
+# Global, content-addressed PDF store shared by all runs.
+PDF_STORE_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "pdf_store"
+# A run's manifest sits beside its download directory (<dir>.manifest.json), so the
+# directory itself only ever holds PDFs.
+RUN_MANIFEST_SUFFIX = ".manifest.json"
+
+
+def file_sha256(file_path: Path, chunk_size: int = 1 << 20) -> str:
+    """Computes the SHA-256 of a file without reading it into memory at once."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class PDFStore:
+    """
+    A content-addressed PDF store shared across runs.
+
+    PDFs are stored once under objects/<sha[:2]>/<sha>.pdf and an index maps each
+    paperId to the content hash of its PDF. Per-run download directories only
+    hold links to the stored objects, so disk and bandwidth use scale with the
+    number of unique papers instead of the number of runs.
+    """
+
+    def __init__(self, root: Path = PDF_STORE_DIR):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.index_path = self.root / "index.json"
+        self._lock = threading.Lock()
+        self._index = self._load_index()
+
+    def _load_index(self) -> dict:
+        if not self.index_path.exists():
+            return {}
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Warning: Could not read PDF store index '{self.index_path}'. Starting empty. Error: {e}")
+            return {}
+
+    @contextmanager
+    def _index_file_lock(self):
+        """Holds an exclusive lock on index.lock, so processes sharing the store write the index in turn."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        with open(self.root / "index.lock", 'a') as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _save_index(self, updates: dict) -> None:
+        """
+        Writes new entries to the index. The index is re-read under the file lock and the
+        updates merged into it, so entries added by other processes since this store was
+        opened are kept rather than overwritten by the stale in-memory copy.
+        """
+        with self._index_file_lock():
+            index = self._load_index()
+            index.update(updates)
+            tmp_path = self.index_path.with_suffix(f".json.{os.getpid()}.tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, indent=2)
+            os.replace(tmp_path, self.index_path)
+        self._index = index
+
+    def object_path(self, sha256: str) -> Path:
+        return self.objects_dir / sha256[:2] / f"{sha256}.pdf"
+
+    def get_entry(self, paper_id: str) -> Optional[dict]:
+        """Returns the index entry for a paper if its PDF is in the store."""
+        with self._lock:
+            entry = self._index.get(paper_id)
+        if entry and self.object_path(entry["sha256"]).exists():
+            return entry
+        return None
+
+    def add(self, paper_id: str, file_path: Path, source_url: Optional[str] = None) -> dict:
+        """
+        Moves a freshly downloaded PDF into the store and replaces it with a link.
+        If identical content is already stored, the new copy is simply dropped.
+        """
+        file_path = Path(file_path)
+        sha256 = file_sha256(file_path)
+        target = self.object_path(sha256)
+
+        with self._lock:
+            if not target.exists():
+                target.parent.mkdir(parents=True, exist_ok=True)
+                shutil.move(str(file_path), str(target))
+            else:
+                file_path.unlink()
+            entry = {
+                "sha256": sha256,
+                "bytes": target.stat().st_size,
+                "source_url": source_url,
+                "added": datetime.now().isoformat(),
+            }
+            self._save_index({paper_id: entry})
+
+        self._link(target, file_path)
+        return entry
+
+    def link_into(self, paper_id: str, dest_path: Path) -> Optional[dict]:
+        """Links a stored PDF into a run directory. Returns the entry, or None if the paper is not stored."""
+        entry = self.get_entry(paper_id)
+        if entry is None:
+            return None
+        self._link(self.object_path(entry["sha256"]), Path(dest_path))
+        return entry
+
+    @staticmethod
+    def _link(source: Path, dest: Path) -> str:
+        """Creates dest pointing at source: a hard link if possible, else a symlink, else a copy."""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.exists() or dest.is_symlink():
+            dest.unlink()
+        try:
+            os.link(source, dest)
+            return "hardlink"
+        except OSError:
+            pass
+        try:
+            os.symlink(source.resolve(), dest)
+            return "symlink"
+        except OSError:
+            shutil.copy2(source, dest)
+            return "copy"
+
+
+def run_manifest_path(download_dir: Path) -> Path:
+    download_dir = Path(download_dir)
+    return download_dir.with_name(f"{download_dir.name}{RUN_MANIFEST_SUFFIX}")
+
+
+def write_run_manifest(download_dir: Path, store: PDFStore, download_results: list) -> Path:
+    """Records which stored PDF each paper of a run points to, in a file next to the run directory."""
+    download_dir = Path(download_dir)
+    manifest = {"store": str(store.root), "papers": {}}
+    for result in download_results:
+        entry = store.get_entry(result["paper_id"])
+        if entry is None:
+            continue
+        manifest["papers"][result["paper_id"]] = {
+            "sha256": entry["sha256"],
+            "bytes": entry["bytes"],
+            "object": str(store.object_path(entry["sha256"]).relative_to(store.root)),
+            "status": result["status"],
+        }
+
+    download_dir.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path = run_manifest_path(download_dir)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
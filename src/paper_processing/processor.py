@@ -1,8 +1,70 @@
-import pdfplumber
+import itertools
 import json
+import os
 import re
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+from paper_processing.bundle import BUNDLE_NAME, COMPRESSION_NONE, RunBundleWriter
+from paper_processing.extraction_cache import ExtractionCache
+from paper_processing.extractors import DEFAULT_EXTRACTOR, get_extractor
+from paper_processing.pdf_store import file_sha256
+
+# --- Extraction settings ---
+# Bump EXTRACTOR_VERSION whenever a change alters the extracted content; together with
+# the options it forms the extraction cache key, so stale cache entries are never reused.
+EXTRACTOR_VERSION = "2"
+
+
+def filename_title(pdf_path: Path) -> str:
+    """The paper title guessed from the PDF's file name, used to tell page headers from section headings."""
+    return re.sub(r'[-_]', ' ', Path(pdf_path).stem).lower()
+
+
+def extraction_options(extractor_name: str = DEFAULT_EXTRACTOR, section_options: dict = None,
+                       pdf_path: Path = None) -> dict:
+    """
+    The extraction settings that make up the cache key, including the selected backend.
+    With `pdf_path`, the title guessed from its file name is included too, because the
+    heading heuristics depend on it: identical PDFs under different names may differ.
+    """
+    options = {"extractor": extractor_name, **get_extractor(extractor_name).options()}
+    for key, value in sorted((section_options or {}).items()):
+        options[key] = sorted(value) if key == "sections" and value else value
+    if pdf_path is not None:
+        options["filename_title"] = filename_title(pdf_path)
+    return options
+
+
+# --- Extraction limits ---
+# Every PDF is extracted in its own supervised process. Scanned books or pages full of
+# vector graphics can make pdfplumber run for minutes or use gigabytes; such a worker is
+# killed and no JSON is written, so the indexer falls back to the abstract + TLDR.
+EXTRACTION_TIMEOUT = 180        # Wall-clock seconds per PDF
+MAX_WORKER_RSS_MB = 2048        # Resident memory per extraction worker
+MAX_PDF_PAGES = 100             # Longer documents (books, theses) are not extracted
+RSS_POLL_INTERVAL = 0.2         # Seconds between supervisor checks
+# Workers are started from ThreadPoolExecutor threads, and forking a multi-threaded process
+# can copy locks held by other threads into the child. "forkserver" (POSIX) and "spawn"
+# start each worker from a clean, single-threaded process instead.
+WORKER_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+# --- Boilerplate stripping ---
+# Running headers, footers, journal banners and license notices repeat on every page.
+# They are detected from the top/bottom lines of the first pages and removed everywhere.
+BOILERPLATE_SAMPLE_PAGES = 8    # Pages buffered to learn the repeated lines
+BOILERPLATE_EDGE_LINES = 3      # Lines at the top and bottom of a page that are candidates
+BOILERPLATE_MIN_SHARE = 0.4     # Share of sampled pages a line must appear on (0.4 tolerates odd/even headers)
+BOILERPLATE_MIN_PAGES = 3       # Documents with fewer pages are left untouched
+
+
+class PageLimitExceeded(Exception):
+    """Raised when a PDF has more pages than the extraction page cap."""
+
+
 def clean_and_split_into_paragraphs(text_block: str) -> list[str]:
     """
     Cleans a block of extracted text and splits it into a list of paragraphs.
@@ -33,107 +95,452 @@ def clean_and_split_into_paragraphs(text_block: str) -> list[str]:
             
     return cleaned_paragraphs
 
-def extract_structured_content(pdf_path: Path) -> dict:
+# Patterns for canonical sections
+SECTION_PATTERNS = {
+    "abstract": re.compile(r"^\s*abstract\s*$", re.IGNORECASE),
+    "introduction": re.compile(r"^\s*(1\s*\.?\s*)?introduction\s*$", re.IGNORECASE),
+    "related_work": re.compile(r"^\s*(\d+\s*\.?\s*)?(related\s+work|background|preliminaries)\s*$", re.IGNORECASE),
+    "methodology": re.compile(r"^\s*(\d+\s*\.?\s*)?(methodology|methods|approach|materials\s+and\s+methods)\s*$", re.IGNORECASE),
+    "experiments": re.compile(r"^\s*(\d+\s*\.?\s*)?(experiments|results|evaluation)\s*$", re.IGNORECASE),
+    "discussion": re.compile(r"^\s*(\d+\s*\.?\s*)?discussion\s*$", re.IGNORECASE),
+    "conclusion": re.compile(r"^\s*(\d+\s*\.?\s*)?(conclusion|conclusions)\s*$", re.IGNORECASE),
+    "acknowledgements": re.compile(r"^\s*acknowledgements\s*$", re.IGNORECASE),
+    "references": re.compile(r"^\s*references\s*$", re.IGNORECASE),
+}
+# A more constrained pattern for numbered sections/subsections.
+GENERIC_SECTION_PATTERN = re.compile(r"^\s*(\d{1,2}(\.\d+)*)\s+(.*)")
+# The sections the indexer gets most value from, for `sections=` whitelisting.
+CORE_SECTIONS = ("abstract", "introduction", "methodology", "conclusion")
+# Used by the pipeline stages. Whole papers are extracted by default; set
+# PIPELINE_STOP_AT_REFERENCES=1 to stop at the reference list, which also drops appendices.
+PIPELINE_SECTION_OPTIONS = {"stop_at_references": True} if os.getenv("PIPELINE_STOP_AT_REFERENCES") == "1" else {}
+
+
+def _normalize_edge_line(line: str) -> str:
+    """Normalizes a line so that e.g. 'Page 3 of 12' and 'Page 4 of 12' compare equal."""
+    return re.sub(r'\s+', ' ', re.sub(r'\d+', '#', line.strip().lower()))
+
+
+def _edge_zones(lines: list) -> dict:
+    """Maps the indices of the top and bottom non-empty lines of a page to 'top' or 'bottom'.
+    On short pages the zones shrink so that they never cover the whole page."""
+    non_empty = [i for i, line in enumerate(lines) if line.strip()]
+    edge = min(BOILERPLATE_EDGE_LINES, len(non_empty) // 3)
+    if edge == 0:
+        return {}
+    zones = {i: "top" for i in non_empty[:edge]}
+    zones.update({i: "bottom" for i in non_empty[-edge:]})
+    return zones
+
+
+def strip_repeated_page_lines(page_texts, stats: dict = None):
     """
-    Extracts text from a PDF, structuring it by sections and paragraphs.
+    Removes running headers, footers and other per-page boilerplate from a stream of page texts.
+
+    The first BOILERPLATE_SAMPLE_PAGES pages are buffered to find lines that recur in
+    the same zone (top or bottom) of many pages, with digits normalized so page numbers
+    and dates do not hide repeats. Those lines are then dropped from the zone of every
+    page. Only the sample is buffered, so memory stays bounded for long documents; a
+    shorter stream (e.g. one cut at a page budget) is sampled whole.
+
+    Args:
+        page_texts (iterable): Page texts in order.
+        stats (dict, optional): Receives 'chars_in' and 'chars_removed' counters.
+
+    Yields:
+        str: The cleaned text of each page.
     """
-    print(f"-> Processing: {pdf_path.name}")
-    content = {}
+    stats = stats if stats is not None else {}
+    stats.setdefault("chars_in", 0)
+    stats.setdefault("chars_removed", 0)
+    page_iter = iter(page_texts)
+
+    sample = []
+    for page_text in page_iter:
+        sample.append(page_text or "")
+        if len(sample) >= BOILERPLATE_SAMPLE_PAGES:
+            break
+
+    counts = {}
+    for page_text in sample:
+        lines = page_text.split('\n')
+        for key in {(position, _normalize_edge_line(lines[i])) for i, position in _edge_zones(lines).items()}:
+            counts[key] = counts.get(key, 0) + 1
+
+    threshold = max(BOILERPLATE_MIN_PAGES, BOILERPLATE_MIN_SHARE * len(sample))
+    repeated = {key for key, count in counts.items() if count >= threshold and key[1]}
+
+    def clean(page_text: str) -> str:
+        stats["chars_in"] += len(page_text)
+        if not repeated:
+            return page_text
+        lines = page_text.split('\n')
+        zones = _edge_zones(lines)
+        kept = []
+        for i, line in enumerate(lines):
+            if i in zones and (zones[i], _normalize_edge_line(line)) in repeated:
+                stats["chars_removed"] += len(line)
+                continue
+            kept.append(line)
+        return '\n'.join(kept)
+
+    for page_text in sample:
+        yield clean(page_text)
+    for page_text in page_iter:
+        yield clean(page_text or "")
+
+
+def iter_sections(pdf_path: Path, extractor_name: str = DEFAULT_EXTRACTOR, max_pages: int = None,
+                  stop_at_references: bool = False, stop_after_pages: int = None, sections: list = None,
+                  strip_boilerplate: bool = True, stats: dict = None):
+    """
+    Streams a PDF page by page and yields (section_title, paragraphs) as each section ends.
+
+    Only the text of the current section is held in memory. Extraction stops early,
+    skipping the remaining pages, once the reference list starts (`stop_at_references`),
+    after `stop_after_pages` pages, or once every whitelisted section has been read.
+
+    Args:
+        pdf_path (Path): The PDF to read.
+        extractor_name (str): Text backend (see `extractors.py`).
+        max_pages (int, optional): Page cap; raises PageLimitExceeded for longer PDFs.
+        stop_at_references (bool): Stop at the 'References' heading.
+        stop_after_pages (int, optional): Read at most this many pages.
+        sections (list, optional): Canonical section names to keep (keys of SECTION_PATTERNS,
+            e.g. CORE_SECTIONS). Numbered subsections belong to the canonical section they
+            appear in; everything else is skipped.
+        strip_boilerplate (bool): Remove repeated page headers/footers (see `strip_repeated_page_lines`).
+        stats (dict, optional): Receives 'chars_in' and 'chars_removed' from boilerplate stripping.
+
+    Yields:
+        tuple: (section_title, list of paragraphs). Titles can repeat, as in the PDF.
+    """
+    extractor = get_extractor(extractor_name)
+    whitelist = set(sections) if sections else None
+    remaining = set(whitelist) if whitelist else set()
     current_section_key = "header"
+    current_canonical = None
     text_buffer = []
 
     # Get clean paper title from filename to help filter page headers
-    clean_paper_title = re.sub(r'[-_]', ' ', pdf_path.stem).lower()
-
-    # Patterns for canonical sections
-    section_patterns = {
-        "abstract": re.compile(r"^\s*abstract\s*$", re.IGNORECASE),
-        "introduction": re.compile(r"^\s*(1\s*\.?\s*)?introduction\s*$", re.IGNORECASE),
-        "related_work": re.compile(r"^\s*(\d+\s*\.?\s*)?(related\s+work|background|preliminaries)\s*$", re.IGNORECASE),
-        "methodology": re.compile(r"^\s*(\d+\s*\.?\s*)?(methodology|methods|approach|materials\s+and\s+methods)\s*$", re.IGNORECASE),
-        "experiments": re.compile(r"^\s*(\d+\s*\.?\s*)?(experiments|results|evaluation)\s*$", re.IGNORECASE),
-        "discussion": re.compile(r"^\s*(\d+\s*\.?\s*)?discussion\s*$", re.IGNORECASE),
-        "conclusion": re.compile(r"^\s*(\d+\s*\.?\s*)?(conclusion|conclusions)\s*$", re.IGNORECASE),
-        "acknowledgements": re.compile(r"^\s*acknowledgements\s*$", re.IGNORECASE),
-        "references": re.compile(r"^\s*references\s*$", re.IGNORECASE),
-    }
-    # A more constrained pattern for numbered sections/subsections.
-    generic_section_pattern = re.compile(r"^\s*(\d{1,2}(\.\d+)*)\s+(.*)")
+    clean_paper_title = filename_title(pdf_path)
 
-    try:
-        with pdfplumber.open(pdf_path) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text(x_tolerance=2, y_tolerance=2)
-                if not page_text:
-                    continue
-
-                lines = page_text.split('\n')
-                for line in lines:
-                    stripped_line = line.strip()
+    def keep(canonical):
+        return whitelist is None or canonical in whitelist
+
+    if max_pages is not None:
+        num_pages = extractor.page_count(pdf_path)
+        if num_pages > max_pages:
+            raise PageLimitExceeded(f"{num_pages} pages exceeds cap of {max_pages}")
+
+    page_texts = extractor.iter_page_texts(pdf_path)
+    if stop_after_pages is not None:
+        # Cut before boilerplate stripping, so its page sample never reads past the budget.
+        page_texts = itertools.islice(page_texts, stop_after_pages)
+    if strip_boilerplate:
+        page_texts = strip_repeated_page_lines(page_texts, stats=stats)
+
+    for page_text in page_texts:
+        if not page_text:
+            continue
+
+        lines = page_text.split('\n')
+        for line in lines:
+            stripped_line = line.strip()
+            
+            if not stripped_line or stripped_line.isdigit():
+                continue
+
+            new_section_title = None
+            new_canonical = None
+            # First, check for specific, canonical sections
+            for section_name, pattern in SECTION_PATTERNS.items():
+                if pattern.match(stripped_line):
+                    new_section_title = stripped_line.strip()
+                    new_canonical = section_name
+                    break
+            
+            # If not a canonical one, check for a generic numbered section
+            if not new_section_title:
+                match = GENERIC_SECTION_PATTERN.match(stripped_line)
+                if match:
+                    title_part = match.group(3)
                     
-                    if not stripped_line or stripped_line.isdigit():
+                    # --- Heuristic Checks to Validate Generic Sections ---
+                    # 1. Reject if it looks like code or has odd characters.
+                    if any(c in title_part for c in ['=', ';', '_', '(', ')', '{', '}']):
+                        continue
+                    
+                    # 2. Reject if the line is excessively long.
+                    if len(stripped_line) > 150:
                         continue
 
-                    new_section_title = None
-                    # First, check for specific, canonical sections
-                    for section_name, pattern in section_patterns.items():
-                        if pattern.match(stripped_line):
-                            new_section_title = stripped_line.strip()
-                            break
+                    # 3. Reject if it looks like a page header (is long and very similar to paper title).
+                    title_words = set(title_part.lower().split())
+                    if len(title_words) > 4: # Only check longer titles
+                        paper_title_words = set(clean_paper_title.split())
+                        common_words = title_words.intersection(paper_title_words)
+                        # If more than 4 words in common, likely a page header
+                        if len(common_words) > 4:
+                            continue
                     
-                    # If not a canonical one, check for a generic numbered section
-                    if not new_section_title:
-                        match = generic_section_pattern.match(stripped_line)
-                        if match:
-                            title_part = match.group(3)
-                            
-                            # --- Heuristic Checks to Validate Generic Sections ---
-                            # 1. Reject if it looks like code or has odd characters.
-                            if any(c in title_part for c in ['=', ';', '_', '(', ')', '{', '}']):
-                                continue
-                            
-                            # 2. Reject if the line is excessively long.
-                            if len(stripped_line) > 150:
-                                continue
-
-                            # 3. Reject if it looks like a page header (is long and very similar to paper title).
-                            title_words = set(title_part.lower().split())
-                            if len(title_words) > 4: # Only check longer titles
-                                paper_title_words = set(clean_paper_title.split())
-                                common_words = title_words.intersection(paper_title_words)
-                                # If more than 4 words in common, likely a page header
-                                if len(common_words) > 4:
-                                    continue
-                            
-                            new_section_title = stripped_line.strip()
-
-                    if new_section_title:
-                        if text_buffer:
-                            raw_text = "\n".join(text_buffer)
-                            content[current_section_key] = clean_and_split_into_paragraphs(raw_text)
-                        
-                        text_buffer = []
-                        current_section_key = new_section_title
-                    else:
-                        text_buffer.append(stripped_line)
-
-            if text_buffer:
-                raw_text = "\n".join(text_buffer)
-                content[current_section_key] = clean_and_split_into_paragraphs(raw_text)
+                    new_section_title = stripped_line.strip()
+                    # Subsections ("3.1 ...") stay within their canonical parent section.
+                    new_canonical = current_canonical if match.group(2) else None
+
+            if new_section_title:
+                if text_buffer and keep(current_canonical):
+                    yield current_section_key, clean_and_split_into_paragraphs("\n".join(text_buffer))
+
+                text_buffer = []
+                if whitelist is not None and current_canonical != new_canonical:
+                    remaining.discard(current_canonical)
+                current_section_key = new_section_title
+                current_canonical = new_canonical
+
+                if stop_at_references and new_canonical == "references":
+                    return
+                if whitelist is not None and not remaining:
+                    return
+            elif keep(current_canonical):
+                text_buffer.append(stripped_line)
+
+    if text_buffer and keep(current_canonical):
+        yield current_section_key, clean_and_split_into_paragraphs("\n".join(text_buffer))
+
+
+def extract_structured_content(pdf_path: Path, max_pages: int = None, extractor_name: str = DEFAULT_EXTRACTOR,
+                               stats: dict = None, **section_options) -> dict:
+    """
+    Extracts text from a PDF, structuring it by sections and paragraphs.
+    The raw page text comes from the selected backend in `extractors.py`; any
+    `section_options` (stop_at_references, stop_after_pages, sections, strip_boilerplate)
+    are passed to `iter_sections`, and `stats` receives its boilerplate counters.
+    Raises PageLimitExceeded if the PDF has more than `max_pages` pages.
+    """
+    print(f"-> Processing: {pdf_path.name}")
+    content = {}
+    stats = stats if stats is not None else {}
+
+    try:
+        for section_title, paragraphs in iter_sections(pdf_path, extractor_name=extractor_name, max_pages=max_pages,
+                                                       stats=stats, **section_options):
+            content[section_title] = paragraphs
 
         content = {k: v for k, v in content.items() if v}
 
         print(f"   ... Found sections: {list(content.keys())}")
+        if stats.get("chars_removed"):
+            print(f"   ... Stripped {stats['chars_removed']} boilerplate chars "
+                  f"({stats['chars_removed'] / max(stats['chars_in'], 1):.1%} of the page text)")
         return content
 
+    except PageLimitExceeded:
+        raise
     except Exception as e:
         print(f"   !!! Error processing {pdf_path.name}: {e}")
         return {"error": str(e), "filename": pdf_path.name}
 
 
-def process_directory(input_pdf_dir: Path, output_json_dir: Path):
+def save_structured_content(structured_data: dict, pdf_path: Path, output_json_dir: Path,
+                            bundle: RunBundleWriter = None) -> Path:
+    """
+    Saves extracted content for a PDF and returns where it was written. With a bundle, the
+    content is appended to it as a compact record keyed by the PDF stem; otherwise it is
+    written as '<pdf stem>.json' in the output directory.
+    """
+    if bundle is not None:
+        bundle.add(pdf_path.stem, structured_data)
+        print(f"   -> Added cleaned data to bundle {bundle.path.name}\n")
+        return bundle.path
+
+    output_path = output_json_dir / pdf_path.with_suffix('.json').name
+
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(structured_data, f, indent=4)
+
+    print(f"   -> Saved cleaned data to {output_path}\n")
+    return output_path
+
+
+def _read_rss_mb(pid: int):
+    """Resident set size of a process in MB, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
+
+
+def _guarded_extraction_target(pdf_path: Path, conn, max_pages: int, extractor_name: str, section_options: dict):
+    """Runs inside the worker process and sends (status, payload, stats) back to the supervisor."""
+    stats = {}
+    try:
+        content = extract_structured_content(pdf_path, max_pages=max_pages, extractor_name=extractor_name,
+                                             stats=stats, **section_options)
+        if "error" in content:
+            conn.send(("failed", content["error"], stats))
+        else:
+            conn.send(("ok", content, stats))
+    except PageLimitExceeded as e:
+        conn.send(("page_limit", str(e), stats))
+    except Exception as e:
+        conn.send(("failed", f"{type(e).__name__}: {e}", stats))
+    finally:
+        conn.close()
+
+
+def process_pdf(pdf_path: Path, output_json_dir: Path, timeout: float = EXTRACTION_TIMEOUT,
+                max_rss_mb: float = MAX_WORKER_RSS_MB, max_pages: int = MAX_PDF_PAGES,
+                cache: ExtractionCache = None, extractor_name: str = DEFAULT_EXTRACTOR,
+                section_options: dict = None, bundle: RunBundleWriter = None) -> dict:
+    """
+    Extracts a single PDF in a supervised worker process and saves its structured JSON.
+
+    The worker is killed if it exceeds the wall-clock timeout or the RSS cap. On any
+    failure no JSON is written, so the indexer uses the paper's abstract + TLDR instead.
+    With a cache, a PDF whose content was extracted before is not extracted again.
+
+    Args:
+        pdf_path (Path): The PDF to process.
+        output_json_dir (Path): Directory to save '<pdf stem>.json' in.
+        timeout (float): Wall-clock seconds before the worker is killed.
+        max_rss_mb (float): Resident memory cap for the worker, in MB.
+        max_pages (int): Page cap; longer PDFs are not extracted.
+        cache (ExtractionCache, optional): Persistent cache of extraction results.
+        extractor_name (str): Text backend to use (see `extractors.py`).
+        section_options (dict, optional): Early-termination and whitelist options for
+            `iter_sections` (stop_at_references, stop_after_pages, sections).
+        bundle (RunBundleWriter, optional): Run bundle to append the result to instead of
+            writing a JSON file.
+
+    Returns:
+        dict: 'file', 'status' ('ok', 'cached', 'empty', 'failed', 'timeout', 'memory',
+              'page_limit' or 'crashed'), 'output', 'seconds', 'error', and the boilerplate
+              counters 'chars_in' and 'chars_removed' (0 for cache hits).
+    """
+    start = time.monotonic()
+    pdf_sha256 = None
+    section_options = section_options or {}
+    options = extraction_options(extractor_name, section_options, pdf_path)
+    if cache is not None:
+        pdf_sha256 = file_sha256(pdf_path)
+        cached_content = cache.get(pdf_sha256, EXTRACTOR_VERSION, options)
+        if cached_content is not None:
+            print(f"-> Extraction cache hit: {pdf_path.name}")
+            return {"file": pdf_path.name, "status": "cached",
+                    "output": str(save_structured_content(cached_content, pdf_path, output_json_dir, bundle)),
+                    "seconds": round(time.monotonic() - start, 3), "error": None, "chars_in": 0, "chars_removed": 0}
+
+    mp_context = multiprocessing.get_context(WORKER_START_METHOD)
+    parent_conn, child_conn = mp_context.Pipe(duplex=False)
+    worker = mp_context.Process(target=_guarded_extraction_target,
+                                args=(pdf_path, child_conn, max_pages, extractor_name, section_options), daemon=True)
+    worker.start()
+    child_conn.close()
+
+    status, payload, stats = None, None, {}
+    try:
+        while status is None:
+            # Polling also drains the pipe, so a large result never blocks the worker.
+            if parent_conn.poll(RSS_POLL_INTERVAL):
+                try:
+                    status, payload, stats = parent_conn.recv()
+                except EOFError:
+                    worker.join(1)
+                    status, payload = "crashed", f"worker exited with code {worker.exitcode}"
+                break
+            if time.monotonic() - start > timeout:
+                status, payload = "timeout", f"extraction exceeded {timeout}s"
+                break
+            rss_mb = _read_rss_mb(worker.pid)
+            if max_rss_mb and rss_mb is not None and rss_mb > max_rss_mb:
+                status, payload = "memory", f"worker RSS {rss_mb:.0f} MB exceeded cap of {max_rss_mb} MB"
+    finally:
+        if worker.is_alive():
+            worker.kill()
+        worker.join()
+        parent_conn.close()
+
+    result = {"file": pdf_path.name, "status": status, "output": None,
+              "seconds": round(time.monotonic() - start, 3), "error": None,
+              "chars_in": stats.get("chars_in", 0), "chars_removed": stats.get("chars_removed", 0)}
+    if status == "ok" and payload:
+        result["output"] = str(save_structured_content(payload, pdf_path, output_json_dir, bundle))
+        if cache is not None:
+            cache.put(pdf_sha256, EXTRACTOR_VERSION, options, payload, filename=pdf_path.name)
+    elif status == "ok":
+        result["status"] = "empty"
+        result["error"] = "no text extracted"
+    else:
+        result["error"] = payload
+
+    if result["status"] != "ok":
+        print(f"   !!! {result['status'].upper()} for {pdf_path.name}: {result['error']}. "
+              f"The indexer will fall back to abstract + TLDR.")
+    return result
+
+
+def _process_files(pdf_files: list, output_json_dir: Path, parallel: bool, max_workers: int, cache: ExtractionCache,
+                   extractor_name: str, section_options: dict, bundle: RunBundleWriter) -> list:
+    """Runs `process_pdf` over the files, sequentially or with several supervised workers at once."""
+    if parallel and len(pdf_files) > 1:
+        workers = min(max_workers or available_cpu_count(), len(pdf_files))
+        print(f"Processing in parallel with {workers} worker processes.")
+        results_by_file = {}
+        # Threads only supervise; each PDF is extracted in its own worker process.
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(process_pdf, pdf_path, output_json_dir, cache=cache,
+                                       extractor_name=extractor_name, section_options=section_options,
+                                       bundle=bundle): pdf_path for pdf_path in pdf_files}
+            for future in as_completed(futures):
+                pdf_path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # A failure to even start the worker only fails its own file.
+                    result = {"file": pdf_path.name, "status": "failed", "output": None, "seconds": 0.0,
+                              "error": f"{type(e).__name__}: {e}", "chars_in": 0, "chars_removed": 0}
+                results_by_file[pdf_path.name] = result
+                print(f"   [{len(results_by_file)}/{len(pdf_files)}] {result['status'].upper()} {result['file']} "
+                      f"({result['seconds']:.1f}s)")
+        results = [results_by_file[pdf_path.name] for pdf_path in pdf_files]
+    else:
+        results = [process_pdf(pdf_path, output_json_dir, cache=cache, extractor_name=extractor_name,
+                               section_options=section_options, bundle=bundle) for pdf_path in pdf_files]
+    return results
+
+
+def process_directory(input_pdf_dir: Path, output_json_dir: Path, parallel: bool = False, max_workers: int = None,
+                      cache: ExtractionCache = None, extractor_name: str = DEFAULT_EXTRACTOR,
+                      section_options: dict = None, use_bundle: bool = False,
+                      compression: str = COMPRESSION_NONE) -> list:
     """
     Processes all PDFs in an input directory and saves structured JSONs to an output directory.
+
+    Args:
+        input_pdf_dir (Path): Directory containing the PDFs.
+        output_json_dir (Path): Directory to save the output in. Each PDF maps to
+            '<pdf stem>.json' (or the bundle record '<pdf stem>'), regardless of processing order.
+        parallel (bool): Extract several PDFs at once instead of one at a time. Each PDF
+            runs in its own supervised process (see `process_pdf`), and pdfplumber is
+            CPU-bound, so this scales with the number of cores.
+        max_workers (int, optional): Pool size; defaults to the number of available cores.
+        cache (ExtractionCache, optional): Persistent extraction cache; only PDFs that were
+            never seen before are run through the extractor.
+        extractor_name (str): Text backend for this run: 'pdfplumber' (default), or the faster
+            'pdfminer' or 'pypdfium2'.
+        section_options (dict, optional): Passed to `iter_sections`, e.g.
+            {"stop_at_references": True} or {"sections": CORE_SECTIONS}.
+        use_bundle (bool): Write all papers as compact records into one '<output>/papers.bundle'
+            with an offset index, instead of one indented JSON file per paper.
+        compression (str): 'none' or 'zstd' compression for a new bundle.
+
+    Returns:
+        list: One result dict per PDF (see `process_pdf`), in the sorted order of the input files.
     """
     print("--- Starting PDF Processing Workflow ---")
 
@@ -141,25 +548,49 @@ def process_directory(input_pdf_dir: Path, output_json_dir: Path):
     print(f"Input PDF directory: {input_pdf_dir}")
     print(f"Output JSON directory is: {output_json_dir}")
 
-    pdf_files = list(input_pdf_dir.glob("*.pdf"))
+    pdf_files = sorted(input_pdf_dir.glob("*.pdf"))
     if not pdf_files:
         print(f"Warning: No PDF files found in '{input_pdf_dir}'")
-        return
+        return []
         
-    print(f"Found {len(pdf_files)} PDF(s) to process.\n")
+    print(f"Found {len(pdf_files)} PDF(s) to process with the '{extractor_name}' extractor.\n")
+    start = time.monotonic()
+    bundle = RunBundleWriter(output_json_dir / BUNDLE_NAME, compression=compression) if use_bundle else None
+    try:
+        results = _process_files(pdf_files, output_json_dir, parallel, max_workers, cache, extractor_name,
+                                 section_options, bundle)
+    finally:
+        if bundle is not None:
+            bundle.close()
+            print(f"Bundle saved to: {bundle.path} ({bundle.path.stat().st_size / 1e6:.2f} MB, {len(bundle)} papers)")
 
-    for pdf_path in pdf_files:
-        structured_data = extract_structured_content(pdf_path)
-        
-        json_filename = pdf_path.with_suffix('.json').name
-        output_path = output_json_dir / json_filename
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(structured_data, f, indent=4)
-        
-        print(f"   -> Saved cleaned data to {output_path}\n")
+    elapsed = time.monotonic() - start
+    failed = [r for r in results if r["status"] not in ("ok", "cached")]
+    print(f"Processed {len(results) - len(failed)}/{len(results)} PDF(s) in {elapsed:.1f}s "
+          f"({len(results) / elapsed if elapsed else 0.0:.2f} PDFs/s).")
+    chars_in = sum(r["chars_in"] for r in results)
+    chars_removed = sum(r["chars_removed"] for r in results)
+    if chars_in:
+        extracted = sum(1 for r in results if r["chars_in"])
+        print(f"Boilerplate stripping removed {chars_removed} chars ({chars_removed / chars_in:.1%}), "
+              f"{chars_removed / extracted:.0f} chars per extracted paper.")
+    if cache is not None:
+        hits = sum(1 for r in results if r["status"] == "cached")
+        print(f"Extraction cache: {hits}/{len(results)} hits ({hits / len(results):.0%}) this run, "
+              f"{cache.hit_rate():.0%} across all lookups in this process.")
+    for result in failed:
+        print(f"   !!! Failed: {result['file']}: {result['error']}")
 
     print("--- PDF Processing Workflow Finished ---")
+    return results
+
+
+def available_cpu_count() -> int:
+    """Number of cores this process may run on (respects CPU affinity where supported)."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
 
 
 def main():
@@ -0,0 +1,143 @@
+import queue
+import threading
+import time
+from pathlib import Path
+
+from paper_processing.downloader import download_papers
+from paper_processing.pdf_store import PDFStore
+from paper_processing.extraction_cache import ExtractionCache
+from paper_processing.bundle import BUNDLE_NAME, RunBundleWriter
+from paper_processing.processor import process_pdf, PIPELINE_SECTION_OPTIONS
+from data_indexing.indexer import USE_SHARED_COLLECTION, build_paper_chunks, get_run_collection, run_flag, sync_chunks
+from data_indexing.lexical_index import build_run_bm25_index
+
+# --- Configuration ---
+EXTRACT_WORKERS = 2             # Threads pulling downloaded PDFs off the extraction queue
+QUEUE_SIZE = 8                  # Bound of each hand-off queue; keeps memory flat on large runs
+_DONE = object()                # Sentinel marking the end of a queue
+
+
+def run_streaming_ingestion(papers: list, project_root: Path, run_timestamp: str, store: PDFStore = None,
+                            cache: ExtractionCache = None, extract_workers: int = EXTRACT_WORKERS,
+                            queue_size: int = QUEUE_SIZE) -> dict:
+    """
+    Runs download, processing and indexing (stages 3-5) as one streaming pipeline.
+
+    Each PDF is queued for extraction as soon as its download finishes, and each
+    extracted paper is chunked and added to the run's Chroma collection as soon as
+    it is ready. The queues are bounded, so a fast stage blocks instead of piling
+    up work in memory. Papers without a usable PDF are indexed from their abstract
+    and TLDR, exactly as in `index_run`.
+
+    Args:
+        papers (list): Paper dicts from the literature review.
+        project_root (Path): The project root; outputs use the same layout as the batch stages.
+        run_timestamp (str): Timestamp of the run.
+        store (PDFStore, optional): Global PDF store passed to the downloader.
+        cache (ExtractionCache, optional): Extraction cache passed to the processor.
+        extract_workers (int): Number of concurrent PDF extractions.
+        queue_size (int): Capacity of each hand-off queue.
+
+    Returns:
+        dict: Counts and timings, including 'ready_seconds' (time until the index is complete).
+    """
+    download_dir = project_root / "data" / "papers" / f"lit_review_papers_{run_timestamp}"
+    processed_dir = project_root / "data" / "processed_papers" / f"lit_review_papers_{run_timestamp}"
+    processed_dir.mkdir(parents=True, exist_ok=True)
+
+    papers_by_id = {paper.get("paperId", f"unknown_id_{i}"): (i, paper) for i, paper in enumerate(papers)}
+    extract_queue = queue.Queue(maxsize=queue_size)
+    index_queue = queue.Queue(maxsize=queue_size)
+    stats = {"downloaded": 0, "extracted": 0, "extraction_failed": 0, "extraction_cache_hits": 0,
+             "indexed_papers": 0, "indexed_chunks": 0}
+    stats_lock = threading.Lock()
+
+    def extract_worker():
+        while True:
+            result = extract_queue.get()
+            if result is _DONE:
+                break
+            pdf_path = Path(result["path"]) if result.get("path") else None
+            if pdf_path is not None and pdf_path.exists():
+                try:
+                    outcome = process_pdf(pdf_path, processed_dir, cache=cache,
+                                          section_options=PIPELINE_SECTION_OPTIONS, bundle=bundle)
+                    with stats_lock:
+                        stats["extracted" if outcome["status"] in ("ok", "cached") else "extraction_failed"] += 1
+                        stats["extraction_cache_hits"] += int(outcome["status"] == "cached")
+                except Exception as e:
+                    # The indexer falls back to abstract + TLDR for this paper.
+                    print(f"   !!! Streaming extraction failed for {pdf_path.name}: {e}")
+                    with stats_lock:
+                        stats["extraction_failed"] += 1
+            index_queue.put(result["paper_id"])
+
+    # Created up front so a database error fails fast instead of stalling the queues.
+    collection = get_run_collection(run_timestamp)
+    # Extracted papers go into the run bundle; the indexer reads them back from it.
+    bundle = RunBundleWriter(processed_dir / BUNDLE_NAME)
+
+    def index_worker():
+        while True:
+            paper_id = index_queue.get()
+            if paper_id is _DONE:
+                break
+            # Errors are contained per paper so the queue keeps draining and upstream never blocks.
+            try:
+                index, paper = papers_by_id[paper_id]
+                chunks, metadatas, ids = build_paper_chunks(paper, processed_dir, run_timestamp, index=index,
+                                                            bundle=bundle)
+                # Scoped to the paper, so its stale chunks are removed and unchanged ones are not re-embedded.
+                if USE_SHARED_COLLECTION:
+                    sync_chunks(collection, chunks, metadatas, ids, run_timestamp=run_timestamp,
+                                where={"$and": [{"paper_id": paper_id}, {run_flag(run_timestamp): True}]})
+                else:
+                    sync_chunks(collection, chunks, metadatas, ids, where={"paper_id": paper_id})
+                stats["indexed_papers"] += 1
+                stats["indexed_chunks"] += len(chunks)
+            except Exception as e:
+                print(f"   !!! Streaming indexing failed for paper {paper_id}: {e}")
+
+    def on_download(result: dict):
+        if result["status"] in ("ok", "cached"):
+            stats["downloaded"] += 1
+        # Blocks while the extractors are behind, which keeps the queue bounded.
+        extract_queue.put(result)
+
+    print("\n--- Stages 3-5: Streaming Download, Processing and Indexing ---")
+    print(f"Saving papers to: {download_dir}")
+    print(f"Saving JSON output to: {processed_dir}")
+
+    start = time.monotonic()
+    extractors = [threading.Thread(target=extract_worker, name=f"extract-{i}", daemon=True)
+                  for i in range(max(1, extract_workers))]
+    indexer = threading.Thread(target=index_worker, name="index", daemon=True)
+    for thread in extractors:
+        thread.start()
+    indexer.start()
+
+    try:
+        download_papers(papers, download_dir, store=store, on_result=on_download)
+        download_seconds = time.monotonic() - start
+    finally:
+        for _ in extractors:
+            extract_queue.put(_DONE)
+        for thread in extractors:
+            thread.join()
+        index_queue.put(_DONE)
+        indexer.join()
+        bundle.close()
+
+    # The lexical side of hybrid retrieval, built once all chunks are in the collection.
+    build_run_bm25_index(collection, run_timestamp,
+                         where={run_flag(run_timestamp): True} if USE_SHARED_COLLECTION else None)
+    ready_seconds = time.monotonic() - start
+    stats.update({
+        "papers": len(papers),
+        "download_seconds": round(download_seconds, 3),
+        "ready_seconds": round(ready_seconds, 3),
+    })
+    print(f"\nStreaming ingestion finished: {stats['downloaded']} PDFs, {stats['extracted']} extracted "
+          f"({stats['extraction_cache_hits']} from cache), {stats['indexed_papers']} papers / {stats['indexed_chunks']} chunks indexed. "
+          f"Index ready after {ready_seconds:.1f}s (downloads done after {download_seconds:.1f}s).")
+    return stats
@@ -10,16 +10,21 @@ from main import (
     run_paper_download_stage,
     run_paper_processing_stage,
     run_data_indexing_stage,
+    run_streaming_ingestion_stage,
     run_deduplication_stage,
     state_serializer
 )
 from agentic_workflow.graph import debate_graph
 from agentic_workflow.state import AgentState
 from query_decomp.response_parser import QueryAnalysis, Timeline
+from query_decomp.query_store import QueryLogStore
 
-def run_full_pipeline(query_text: str, ablation_config: dict, project_root: Path) -> str:
+def run_full_pipeline(query_text: str, ablation_config: dict, project_root: Path, query_store: QueryLogStore = None,
+                      streaming: bool = False) -> str:
     """
     Runs the entire research pipeline for a single query and a given ablation configuration.
+    If a query store is given, a precomputed query analysis is used instead of calling the LLM.
+    With `streaming`, stages 3-5 overlap per paper instead of running as strict barriers.
     Returns the run_timestamp for this pipeline run.
     """
     print(f"\n{'='*20}\nRunning pipeline for query: '{query_text[:50]}...'")
@@ -35,7 +40,7 @@ def run_full_pipeline(query_text: str, ablation_config: dict, project_root: Path
             intention="" # Default intention
         )
     else:
-        query_analysis_result = run_query_decomposition_stage(project_root, query_text)
+        query_analysis_result = run_query_decomposition_stage(project_root, query_text, query_store=query_store)
 
 
     # --- Stages 1-5: Pre-computation ---
@@ -52,9 +57,12 @@ def run_full_pipeline(query_text: str, ablation_config: dict, project_root: Path
     run_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     
     save_final_results(project_root, query_analysis_result, final_papers, run_timestamp)
-    run_paper_download_stage(final_papers, project_root, run_timestamp)
-    run_paper_processing_stage(project_root, run_timestamp)
-    run_data_indexing_stage(run_timestamp)
+    if streaming:
+        run_streaming_ingestion_stage(final_papers, project_root, run_timestamp)
+    else:
+        run_paper_download_stage(final_papers, project_root, run_timestamp)
+        run_paper_processing_stage(project_root, run_timestamp)
+        run_data_indexing_stage(run_timestamp)
 
     # --- Stage 6: Agentic Workflow ---
     initial_agent_state: AgentState = {
@@ -1,6 +1,7 @@
 from dataclasses import dataclass, field
 import os
 from dotenv import load_dotenv
+from llm_backends.chat_models import offline_mode_enabled
 
 __all__ = ['LLMConfig', 'PromptTemplates']
 
@@ -12,10 +13,12 @@ class LLMConfig:
     model_name: str = "mistral-medium-latest"  # Changed to a standard Mistral model
     temperature: float = 0.1
     max_tokens: int = 500
+    # Upper bound on in-flight requests when many queries are analyzed at once
+    max_concurrent_requests: int = 4
     api_key: str = field(default_factory=lambda: os.getenv("MISTRAL_API_KEY"))
 
     def __post_init__(self):
-        if not self.api_key:
+        if not self.api_key and not offline_mode_enabled():
             raise ValueError("MISTRAL_API_KEY not found. Please set it in your environment variables or a .env file.")
 
 @dataclass
@@ -1,12 +1,12 @@
 from typing import Dict, Any
-from langchain_mistralai.chat_models import ChatMistralAI
+from llm_backends.chat_models import get_chat_model
 from langchain_core.messages import HumanMessage
 from .config import LLMConfig
 
 class LLMClient:
     def __init__(self, config: LLMConfig):
         self.config = config
-        self.client = ChatMistralAI(
+        self.client = get_chat_model(
             model=self.config.model_name,
             temperature=self.config.temperature,
             max_tokens=self.config.max_tokens,
@@ -1,6 +1,10 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List, Optional
+
 from .config import LLMConfig, PromptTemplates
 from .llm_client import LLMClient
 from .response_parser import ResponseParser, QueryAnalysis
+from .query_store import QueryLogStore
 
 class QueryAnalyzer:
     def __init__(self):
@@ -18,4 +22,49 @@ class QueryAnalyzer:
         llm_response = self.llm_client.generate_response(prompt)
 
         # Parse response
-        return self.parser.parse_response(llm_response, original_query=query)
\ No newline at end of file
+        return self.parser.parse_response(llm_response, original_query=query)
+
+    def analyze_queries(self, queries: List[str], store: Optional[QueryLogStore] = None,
+                        max_workers: Optional[int] = None) -> Dict[str, QueryAnalysis]:
+        """
+        Analyzes a batch of queries concurrently and returns a mapping of query text to analysis.
+
+        Args:
+            queries (list): The raw query texts. Duplicates are analyzed once.
+            store (QueryLogStore, optional): If given, queries already in the store are not
+                re-analyzed and every new analysis is persisted as soon as it completes.
+            max_workers (int, optional): Number of concurrent LLM requests. Defaults to
+                `LLMConfig.max_concurrent_requests`.
+        """
+        unique_queries = list(dict.fromkeys(queries))
+        results: Dict[str, QueryAnalysis] = {}
+
+        pending = []
+        for query in unique_queries:
+            cached = store.get(query) if store is not None else None
+            if cached is not None:
+                results[query] = cached
+            else:
+                pending.append(query)
+
+        print(f"Query decomposition: {len(results)} cached, {len(pending)} to analyze.")
+        if not pending:
+            return results
+
+        workers = max(1, min(max_workers or self.config.max_concurrent_requests, len(pending)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self.analyze_query, query): query for query in pending}
+            for i, future in enumerate(as_completed(futures), start=1):
+                query = futures[future]
+                try:
+                    analysis = future.result()
+                except Exception as e:
+                    print(f"  [{i}/{len(pending)}] FAILED to analyze '{query[:40]}...': {e}")
+                    continue
+
+                results[query] = analysis
+                if store is not None:
+                    store.put(analysis)
+                print(f"  [{i}/{len(pending)}] Analyzed '{query[:40]}...' -> {analysis.topics}")
+
+        return results
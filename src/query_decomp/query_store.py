@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from .response_parser import QueryAnalysis, Timeline
+
+# Default location of the shared query analysis log, next to the other run artifacts.
+QUERY_LOG_STORE_PATH = Path(__file__).resolve().parent.parent.parent / "results" / "query_logs" / "query_analyses.json"
+
+
+def analysis_to_record(analysis: QueryAnalysis) -> dict:
+    """Converts a QueryAnalysis into the JSON record format used in query_logs."""
+    return {
+        "timestamp": datetime.now().isoformat(),
+        "query": analysis.query,
+        "analysis": {
+            "topics": analysis.topics,
+            "timeline": {
+                "start_date": analysis.timeline.start_date,
+                "end_date": analysis.timeline.end_date,
+                "specific_year": analysis.timeline.specific_year
+            },
+            "intention": analysis.intention
+        }
+    }
+
+
+def record_to_analysis(record: dict) -> QueryAnalysis:
+    """Rebuilds a QueryAnalysis from a stored query_logs record."""
+    analysis = record["analysis"]
+    timeline = analysis.get("timeline") or {}
+    return QueryAnalysis(
+        query=record["query"],
+        topics=analysis.get("topics", []),
+        timeline=Timeline(
+            start_date=timeline.get("start_date"),
+            end_date=timeline.get("end_date"),
+            specific_year=timeline.get("specific_year")
+        ),
+        intention=analysis.get("intention", "")
+    )
+
+
+class QueryLogStore:
+    """
+    A persistent, thread-safe store of query analyses keyed by the raw query text.
+
+    All records live in a single JSON file so that experiment sweeps can
+    decompose every query up front and later pipeline stages can start
+    directly from the precomputed analysis.
+    """
+
+    def __init__(self, store_path: Path = QUERY_LOG_STORE_PATH):
+        self.store_path = Path(store_path)
+        self._lock = threading.Lock()
+        self._records: Dict[str, dict] = self._load()
+
+    def _load(self) -> Dict[str, dict]:
+        if not self.store_path.exists():
+            return {}
+        try:
+            with open(self.store_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Warning: Could not load query log store '{self.store_path}'. Starting empty. Error: {e}")
+            return {}
+
+    def _save(self) -> None:
+        # Write to a temporary file first so a crash never leaves a half-written store.
+        self.store_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.store_path.with_suffix(self.store_path.suffix + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._records, f, indent=2)
+        os.replace(tmp_path, self.store_path)
+
+    def __contains__(self, query: str) -> bool:
+        with self._lock:
+            return query in self._records
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._records)
+
+    def get(self, query: str) -> Optional[QueryAnalysis]:
+        """Returns the stored analysis for a query, or None if it has not been analyzed."""
+        with self._lock:
+            record = self._records.get(query)
+        if record is None:
+            return None
+        try:
+            return record_to_analysis(record)
+        except (KeyError, TypeError) as e:
+            print(f"Warning: Ignoring malformed query log record for '{query[:40]}...': {e}")
+            return None
+
+    def put(self, analysis: QueryAnalysis) -> None:
+        """Stores (or replaces) the analysis for its query and persists the store."""
+        with self._lock:
+            self._records[analysis.query] = analysis_to_record(analysis)
+            self._save()